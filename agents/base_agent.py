@@ -1,8 +1,13 @@
 """Base agent class with common functionality."""
+import asyncio
+import threading
 import time
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
 from utils.logger import get_logger
-import google.generativeai as genai
+from utils.rate_limiter import get_rate_limiter, estimate_tokens, is_rate_limit_error
+from utils.cache_manager import get_response_cache, stable_hash
+from utils.gemini_client import get_gemini_registry, make_generation_config
+from utils.structured_output import parse_structured
 import config
 
 class BaseAgent:
@@ -12,13 +17,20 @@ class BaseAgent:
         self.name = name
         self.logger = get_logger()
         
-        # Configure Gemini
-        genai.configure(api_key=config.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel(config.MODEL_NAME)
-        
         self.execution_count = 0
         self.success_count = 0
         self.total_duration = 0.0
+        self.rate_limit_wait = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.api_calls = 0
+        # fan_out runs model calls for one agent on several threads
+        self._stats_lock = threading.Lock()
+    
+    @property
+    def model(self):
+        """Gemini model shared by all agents, created on the first request."""
+        return get_gemini_registry().model(config.MODEL_NAME)
     
     def execute(self, input_data: Any) -> Any:
         """Execute agent logic with logging and error handling."""
@@ -42,10 +54,41 @@ class BaseAgent:
             self.logger.log_agent_error(self.name, str(e))
             raise
     
+    async def aexecute(self, input_data: Any) -> Any:
+        """Asynchronous counterpart of execute()."""
+        self.execution_count += 1
+        start_time = time.time()
+        
+        self.logger.log_agent_start(self.name, input_data)
+        
+        try:
+            result = await self._aprocess(input_data)
+            duration = time.time() - start_time
+            self.total_duration += duration
+            self.success_count += 1
+            
+            self.logger.log_agent_complete(self.name, result, duration)
+            return result
+            
+        except Exception as e:
+            duration = time.time() - start_time
+            self.total_duration += duration
+            self.logger.log_agent_error(self.name, str(e))
+            raise
+    
     def _process(self, input_data: Any) -> Any:
         """Override this method in subclasses."""
         raise NotImplementedError("Subclasses must implement _process method")
     
+    async def _aprocess(self, input_data: Any) -> Any:
+        """
+        Async agent logic.
+        
+        Agents that call Gemini override this with agenerate_with_gemini();
+        the default runs the synchronous _process in a worker thread.
+        """
+        return await asyncio.to_thread(self._process, input_data)
+    
     def get_success_rate(self) -> float:
         """Calculate agent success rate."""
         if self.execution_count == 0:
@@ -60,48 +103,275 @@ class BaseAgent:
             "successes": self.success_count,
             "success_rate": self.get_success_rate(),
             "total_duration": self.total_duration,
-            "avg_duration": self.total_duration / self.execution_count if self.execution_count > 0 else 0
+            "avg_duration": self.total_duration / self.execution_count if self.execution_count > 0 else 0,
+            "rate_limit_wait": self.rate_limit_wait,
+            "api_calls": self.api_calls,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": self.cache_hits / (self.cache_hits + self.cache_misses)
+                              if self.cache_hits + self.cache_misses > 0 else 0.0
         }
     
-    def generate_with_gemini(self, prompt: str, temperature: float = None) -> str:
-        """Generate text using Gemini model with retry logic and rate limiting."""
-        import time
-        
+    def _generation_params(self, temperature: float = None,
+                           response_schema: Optional[Dict] = None) -> Dict[str, Any]:
+        """Generation parameters shared by sync and async calls."""
         temp = temperature if temperature is not None else config.TEMPERATURE
         
-        generation_config = genai.types.GenerationConfig(
-            temperature=temp,
-            max_output_tokens=config.MAX_TOKENS,
-            top_p=0.95,
-            top_k=40
-        )
+        params = {
+            "temperature": temp,
+            "max_output_tokens": config.MAX_TOKENS,
+            "top_p": 0.95,
+            "top_k": 40
+        }
+        if response_schema:
+            # Constrain the response to JSON matching the schema
+            params["response_mime_type"] = "application/json"
+            params["response_schema"] = response_schema
+        return params
+    
+    def _response_cache_key(self, prompt: str, params: Dict[str, Any]) -> str:
+        """Stable key over model name, prompt and generation parameters."""
+        return stable_hash({"model": config.MODEL_NAME, "prompt": prompt, **params})
+    
+    def _cached_response(self, key: str, use_cache: bool):
+        """Look up a cached response, counting hits and misses."""
+        if not (use_cache and config.LLM_CACHE_ENABLED):
+            return None
         
-        max_retries = 3
+        cached = get_response_cache().get(key)
+        with self._stats_lock:
+            if cached is not None:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        return cached
+    
+    def _store_response(self, key: str, text: str, use_cache: bool):
+        """Cache a non-empty response."""
+        if use_cache and config.LLM_CACHE_ENABLED and text:
+            get_response_cache().set(key, text)
+    
+    def _count_api_call(self, rate_limit_wait: float, cancelled: Optional[threading.Event] = None) -> bool:
+        """
+        Record one model request and the time spent waiting for quota.
+        
+        Returns:
+            False, without recording anything, if cancelled is set (checked
+            under the same lock that sets it, so no call is counted afterwards)
+        """
+        with self._stats_lock:
+            if cancelled is not None and cancelled.is_set():
+                return False
+            self.rate_limit_wait += rate_limit_wait
+            self.api_calls += 1
+            return True
+    
+    def _retry_delay(self, error: Exception, attempt: int, max_retries: int) -> float:
+        """Seconds to wait before retrying, or None if the error should be raised."""
+        if is_rate_limit_error(error):
+            wait_time = get_rate_limiter().backoff_delay(error, attempt)
+            self.logger.logger.warning(f"Rate limit hit, waiting {wait_time:.1f}s...")
+            return wait_time
+        elif attempt < max_retries - 1:
+            return get_rate_limiter().backoff_delay(error, attempt)
+        return None
+    
+    def _record_usage(self, response, estimated_tokens: int):
+        """Reconcile the token bucket with the reported prompt size."""
+        usage = getattr(response, "usage_metadata", None)
+        actual_tokens = getattr(usage, "prompt_token_count", None)
+        if isinstance(actual_tokens, int):
+            get_rate_limiter().record_usage(estimated_tokens, actual_tokens)
+    
+    def _chunk_text(self, chunk) -> str:
+        """Text of one streamed chunk; chunks without text parts yield nothing."""
+        try:
+            return chunk.text
+        except ValueError:
+            return ""
+    
+    def generate_with_gemini(self, prompt: str, temperature: float = None, use_cache: bool = True,
+                             stream: bool = False, response_schema: Optional[Dict] = None):
+        """
+        Generate text using Gemini model with caching, retry logic and rate limiting.
+        
+        Args:
+            stream: Return an iterator of text chunks as they arrive instead of the full text
+                (see stream_with_gemini)
+            response_schema: Constrain the response to JSON matching this schema
+                (see generate_structured); streamed chunks join into that JSON
+        """
+        if stream:
+            return self.stream_with_gemini(prompt, temperature, use_cache, response_schema)
+        
+        params = self._generation_params(temperature, response_schema)
+        cache_key = self._response_cache_key(prompt, params)
+        cached = self._cached_response(cache_key, use_cache)
+        if cached is not None:
+            return cached
+        
+        generation_config = make_generation_config(**params)
+        estimated_tokens = estimate_tokens(prompt)
+        
+        max_retries = config.MAX_RETRIES
         for attempt in range(max_retries):
             try:
-                # Add delay to respect rate limits
-                if hasattr(config, 'REQUEST_DELAY'):
-                    time.sleep(config.REQUEST_DELAY)
+                # Wait for request and token quota
+                self._count_api_call(get_rate_limiter().acquire(estimated_tokens))
                 
                 response = self.model.generate_content(
                     prompt,
                     generation_config=generation_config
                 )
+                self._record_usage(response, estimated_tokens)
                 
+                self._store_response(cache_key, response.text, use_cache)
                 return response.text
             except Exception as e:
-                error_str = str(e)
+                wait_time = self._retry_delay(e, attempt, max_retries)
+                if wait_time is None:
+                    raise
+                time.sleep(wait_time)
+        
+        return ""
+    
+    def stream_with_gemini(self, prompt: str, temperature: float = None, use_cache: bool = True,
+                           response_schema: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Yield response text chunks as Gemini produces them.
+        
+        A cached response is yielded as a single chunk, and the joined text is
+        cached once the stream completes. Failures are retried only until the
+        first chunk has been yielded; after that they are raised. With a
+        response_schema the chunks join into JSON matching it.
+        """
+        params = self._generation_params(temperature, response_schema)
+        cache_key = self._response_cache_key(prompt, params)
+        cached = self._cached_response(cache_key, use_cache)
+        if cached is not None:
+            yield cached
+            return
+        
+        generation_config = make_generation_config(**params)
+        estimated_tokens = estimate_tokens(prompt)
+        
+        max_retries = config.MAX_RETRIES
+        for attempt in range(max_retries):
+            chunks = []
+            try:
+                self._count_api_call(get_rate_limiter().acquire(estimated_tokens))
+                
+                response = self.model.generate_content(
+                    prompt,
+                    generation_config=generation_config,
+                    stream=True
+                )
+                for chunk in response:
+                    text = self._chunk_text(chunk)
+                    if text:
+                        chunks.append(text)
+                        yield text
+                self._record_usage(response, estimated_tokens)
+                
+                self._store_response(cache_key, "".join(chunks), use_cache)
+                return
+            except Exception as e:
+                wait_time = self._retry_delay(e, attempt, max_retries) if not chunks else None
+                if wait_time is None:
+                    raise
+                time.sleep(wait_time)
+    
+    async def astream_with_gemini(self, prompt: str, temperature: float = None, use_cache: bool = True,
+                                  response_schema: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Async-iterator counterpart of stream_with_gemini()."""
+        params = self._generation_params(temperature, response_schema)
+        cache_key = self._response_cache_key(prompt, params)
+        cached = self._cached_response(cache_key, use_cache)
+        if cached is not None:
+            yield cached
+            return
+        
+        generation_config = make_generation_config(**params)
+        estimated_tokens = estimate_tokens(prompt)
+        
+        max_retries = config.MAX_RETRIES
+        for attempt in range(max_retries):
+            chunks = []
+            try:
+                self._count_api_call(await get_rate_limiter().aacquire(estimated_tokens))
+                
+                response = await self.model.generate_content_async(
+                    prompt,
+                    generation_config=generation_config,
+                    stream=True
+                )
+                async for chunk in response:
+                    text = self._chunk_text(chunk)
+                    if text:
+                        chunks.append(text)
+                        yield text
+                self._record_usage(response, estimated_tokens)
+                
+                self._store_response(cache_key, "".join(chunks), use_cache)
+                return
+            except Exception as e:
+                wait_time = self._retry_delay(e, attempt, max_retries) if not chunks else None
+                if wait_time is None:
+                    raise
+                await asyncio.sleep(wait_time)
+    
+    async def agenerate_with_gemini(self, prompt: str, temperature: float = None, use_cache: bool = True,
+                                    response_schema: Optional[Dict] = None) -> str:
+        """Generate text without blocking the event loop."""
+        params = self._generation_params(temperature, response_schema)
+        cache_key = self._response_cache_key(prompt, params)
+        cached = self._cached_response(cache_key, use_cache)
+        if cached is not None:
+            return cached
+        
+        generation_config = make_generation_config(**params)
+        estimated_tokens = estimate_tokens(prompt)
+        
+        max_retries = config.MAX_RETRIES
+        for attempt in range(max_retries):
+            try:
+                self._count_api_call(await get_rate_limiter().aacquire(estimated_tokens))
                 
-                # Handle rate limit errors
-                if "429" in error_str or "quota" in error_str.lower():
-                    wait_time = 10 * (attempt + 1)  # Exponential backoff
-                    self.logger.logger.warning(f"Rate limit hit, waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                    continue
-                elif attempt < max_retries - 1:
-                    time.sleep(2 * (attempt + 1))
-                    continue
-                else:
+                response = await self.model.generate_content_async(
+                    prompt,
+                    generation_config=generation_config
+                )
+                self._record_usage(response, estimated_tokens)
+                
+                self._store_response(cache_key, response.text, use_cache)
+                return response.text
+            except Exception as e:
+                wait_time = self._retry_delay(e, attempt, max_retries)
+                if wait_time is None:
                     raise
+                await asyncio.sleep(wait_time)
         
         return ""
+    
+    def generate_structured(self, prompt: str, schema: Dict, temperature: float = None) -> Dict[str, Any]:
+        """
+        One schema-constrained call returning the fields of the JSON response that validate.
+        
+        Invalid or missing fields are left out, and a failed call returns {},
+        so callers apply per-field fallbacks instead of failing the stage.
+        """
+        try:
+            text = self.generate_with_gemini(prompt, temperature=temperature, response_schema=schema)
+        except Exception as e:
+            self.logger.logger.warning(f"{self.name} structured call failed, using fallbacks: {str(e)}")
+            return {}
+        return parse_structured(text, schema)
+    
+    async def agenerate_structured(self, prompt: str, schema: Dict, temperature: float = None) -> Dict[str, Any]:
+        """Async counterpart of generate_structured()."""
+        try:
+            text = await self.agenerate_with_gemini(prompt, temperature=temperature, response_schema=schema)
+        except Exception as e:
+            self.logger.logger.warning(f"{self.name} structured call failed, using fallbacks: {str(e)}")
+            return {}
+        return parse_structured(text, schema)
@@ -1,5 +1,5 @@
 """Evaluator Agent - evaluates exhibition quality."""
-from typing import Dict
+from typing import Dict, List
 from agents.base_agent import BaseAgent
 from tools.fact_checker import FactConsistencyChecker
 from tools.exhibit_formatter import ExhibitFormatter
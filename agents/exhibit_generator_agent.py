@@ -1,7 +1,7 @@
 """Exhibit Generator Agent - creates individual exhibits."""
-from typing import Dict, List
+from typing import AsyncIterator, Dict, Iterator, List
 from agents.base_agent import BaseAgent
-import json
+from utils.json_stream import JSONArrayParser, extract_json_array
 
 class ExhibitGeneratorAgent(BaseAgent):
     """Agent that generates individual museum exhibits."""
@@ -14,25 +14,79 @@ class ExhibitGeneratorAgent(BaseAgent):
         Generate exhibits based on research data.
         
         Args:
-            input_data: Research data and topic information
+            input_data: Research data and topic information; an optional
+                "on_exhibit" callable receives each exhibit as soon as it is parsed
             
         Returns:
             List of exhibit dictionaries
         """
-        topic = input_data.get("topic", "")
-        research_summary = input_data.get("research_summary", "")
-        facts = input_data.get("facts", [])
+        on_exhibit = input_data.get("on_exhibit")
+        exhibits = []
+        for exhibit in self.stream_exhibits(input_data):
+            exhibits.append(exhibit)
+            if on_exhibit:
+                on_exhibit(exhibit)
         
-        # Generate exhibits using Gemini
-        exhibits = self._generate_exhibits(topic, research_summary, facts)
+        return exhibits
+    
+    async def _aprocess(self, input_data: Dict) -> List[Dict]:
+        """Async variant of _process."""
+        on_exhibit = input_data.get("on_exhibit")
+        exhibits = []
+        async for exhibit in self.astream_exhibits(input_data):
+            exhibits.append(exhibit)
+            if on_exhibit:
+                on_exhibit(exhibit)
         
         return exhibits
     
-    def _generate_exhibits(self, topic: str, research_summary: str, facts: List[str]) -> List[Dict]:
-        """Generate multiple exhibits for the topic."""
+    def stream_exhibits(self, input_data: Dict) -> Iterator[Dict]:
+        """
+        Yield exhibits one at a time as each JSON object in the response closes.
+        
+        If no complete exhibit can be read from the stream, the full response
+        goes through the regular parser and its fallbacks.
+        """
+        topic = input_data.get("topic", "")
+        prompt = self._exhibits_prompt(topic, input_data.get("research_summary", ""),
+                                       input_data.get("facts", []))
+        parser = JSONArrayParser()
+        chunks = []
+        streamed = 0
+        for chunk in self.generate_with_gemini(prompt, temperature=0.85, stream=True):
+            chunks.append(chunk)
+            for exhibit in parser.feed(chunk):
+                if isinstance(exhibit, dict):
+                    streamed += 1
+                    yield exhibit
+        
+        if not streamed:
+            yield from self._parse_exhibits("".join(chunks), topic)
+    
+    async def astream_exhibits(self, input_data: Dict) -> AsyncIterator[Dict]:
+        """Async-iterator counterpart of stream_exhibits()."""
+        topic = input_data.get("topic", "")
+        prompt = self._exhibits_prompt(topic, input_data.get("research_summary", ""),
+                                       input_data.get("facts", []))
+        parser = JSONArrayParser()
+        chunks = []
+        streamed = 0
+        async for chunk in self.astream_with_gemini(prompt, temperature=0.85):
+            chunks.append(chunk)
+            for exhibit in parser.feed(chunk):
+                if isinstance(exhibit, dict):
+                    streamed += 1
+                    yield exhibit
+        
+        if not streamed:
+            for exhibit in self._parse_exhibits("".join(chunks), topic):
+                yield exhibit
+    
+    def _exhibits_prompt(self, topic: str, research_summary: str, facts: List[str]) -> str:
+        """Build the exhibit generation prompt."""
         facts_text = "\n".join([f"- {fact}" for fact in facts[:20]])
         
-        prompt = f"""Create exactly 8 museum exhibits for an exhibition about: {topic}
+        return f"""Create exactly 8 museum exhibits for an exhibition about: {topic}
 
 Research Summary:
 {research_summary}
@@ -64,24 +118,12 @@ Format as JSON array with this structure:
 Provide ONLY the JSON array, no other text.
 
 IMPORTANT: Generate exactly 8 exhibits with rich, detailed content."""
-
-        response = self.generate_with_gemini(prompt, temperature=0.85)
-        
-        # Parse JSON response
-        try:
-            # Extract JSON from response
-            json_start = response.find('[')
-            json_end = response.rfind(']') + 1
-            if json_start != -1 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                exhibits = json.loads(json_str)
-                return exhibits
-            else:
-                # Fallback: create basic exhibits
-                return self._create_fallback_exhibits(topic)
-        except json.JSONDecodeError:
-            # Fallback if JSON parsing fails
-            return self._create_fallback_exhibits(topic)
+    
+    def _parse_exhibits(self, response: str, topic: str) -> List[Dict]:
+        """Parse the exhibit JSON array, falling back to basic exhibits."""
+        # Salvages the complete exhibits of a truncated or slightly malformed array
+        exhibits = [e for e in extract_json_array(response) if isinstance(e, dict)]
+        return exhibits or self._create_fallback_exhibits(topic)
     
     def _create_fallback_exhibits(self, topic: str) -> List[Dict]:
         """Create basic exhibits if JSON parsing fails."""
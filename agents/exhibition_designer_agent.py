@@ -26,6 +26,20 @@ class ExhibitionDesignerAgent(BaseAgent):
         # Design room structure
         rooms = self._design_rooms(topic, exhibits, topic_data)
         
+        return self._build_structure(topic, topic_data, rooms)
+    
+    async def _aprocess(self, input_data: Dict) -> Dict:
+        """Async variant of _process."""
+        topic = input_data.get("topic", "")
+        exhibits = input_data.get("exhibits", [])
+        
+        response = await self.agenerate_with_gemini(self._rooms_prompt(topic, exhibits), temperature=0.7)
+        rooms = self._assign_exhibits(self._parse_rooms(response), exhibits)
+        
+        return self._build_structure(topic, input_data.get("topic_data", {}), rooms)
+    
+    def _build_structure(self, topic: str, topic_data: Dict, rooms: List[Dict]) -> Dict:
+        """Assemble the exhibition structure."""
         return {
             "topic": topic,
             "title": topic_data.get("title", topic),
@@ -35,10 +49,19 @@ class ExhibitionDesignerAgent(BaseAgent):
     
     def _design_rooms(self, topic: str, exhibits: List[Dict], topic_data: Dict) -> List[Dict]:
         """Design themed rooms and assign exhibits."""
+        response = self.generate_with_gemini(self._rooms_prompt(topic, exhibits), temperature=0.7)
+        
+        # Parse rooms
+        rooms = self._parse_rooms(response)
+        
+        return self._assign_exhibits(rooms, exhibits)
+    
+    def _rooms_prompt(self, topic: str, exhibits: List[Dict]) -> str:
+        """Build the room design prompt."""
         # Optimize room count based on exhibits
         num_rooms = 4 if len(exhibits) >= 8 else 3
         
-        prompt = f"""Design {num_rooms} themed rooms for a museum exhibition about: {topic}
+        return f"""Design {num_rooms} themed rooms for a museum exhibition about: {topic}
 
 Available exhibits: {len(exhibits)}
 
@@ -55,13 +78,9 @@ DESCRIPTION: [Description]
 ROOM 2: [Title]
 ...
 """
-
-        response = self.generate_with_gemini(prompt, temperature=0.7)
-        
-        # Parse rooms
-        rooms = self._parse_rooms(response)
-        
-        # Assign exhibits to rooms
+    
+    def _assign_exhibits(self, rooms: List[Dict], exhibits: List[Dict]) -> List[Dict]:
+        """Distribute exhibits evenly across rooms."""
         exhibits_per_room = len(exhibits) // len(rooms)
         for i, room in enumerate(rooms):
             start_idx = i * exhibits_per_room
@@ -1,9 +1,15 @@
 """Image Generator Agent - Generates AI images for exhibits using Google Imagen."""
 import os
-import base64
-import requests
-from typing import Dict, List, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Any, Optional, Tuple
 from agents.base_agent import BaseAgent
+from utils.blob_store import get_blob_store
+from utils.gemini_client import get_gemini_registry
+from utils.image_cache import get_image_cache
+from utils.image_processing import image_dimensions, sniff_mime_type
+from utils.rate_limiter import get_rate_limiter, estimate_tokens
 import config
 
 class ImageGeneratorAgent(BaseAgent):
@@ -11,32 +17,96 @@ class ImageGeneratorAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("ImageGeneratorAgent")
-        self.image_dir = "data/generated_images"
+        self.image_dir = config.IMAGE_OUTPUT_DIR
         os.makedirs(self.image_dir, exist_ok=True)
         
     def _process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate images for exhibition exhibits and rooms."""
+        """
+        Generate images for the exhibition poster, room entrances and exhibits.
+        
+        Images are generated concurrently in priority order (poster, then
+        rooms, then exhibits). Images beyond the budget (input 'budget', default
+        IMAGE_BUDGET_PER_EXHIBITION), and those not finished within
+        IMAGE_DEADLINE_SECONDS, are marked skipped.
+        """
         exhibition = input_data.get('exhibition', {})
+        start_time = time.time()
         
-        # Generate exhibition poster
-        poster_prompt = self._create_poster_prompt(exhibition)
-        poster_url = self._generate_image_with_gemini(poster_prompt)
-        exhibition['poster_image'] = poster_url
+        jobs = self._plan_images(exhibition)
+        budget = input_data.get('budget', config.IMAGE_BUDGET_PER_EXHIBITION)
+        for target, key, prompt in jobs[budget:]:
+            target[key] = self._skipped_image(prompt, 'budget')
+        self._run_image_jobs(jobs[:budget], start_time + config.IMAGE_DEADLINE_SECONDS,
+                             input_data.get('max_workers', config.IMAGE_MAX_WORKERS))
         
-        # Generate images for each room and exhibit
+        stats = self._image_stats(jobs, time.time() - start_time)
+        self.logger.logger.info(f"Image generation: {stats}")
+        return {'exhibition': exhibition, 'image_stats': stats}
+    
+    def _plan_images(self, exhibition: Dict) -> List[Tuple[Dict, str, str]]:
+        """
+        Every image the exhibition could use, highest priority first.
+        
+        Returns:
+            (dict to attach the image to, key, prompt) tuples
+        """
+        jobs = [(exhibition, 'poster_image', self._create_poster_prompt(exhibition))]
         rooms = exhibition.get('rooms', [])
         for room in rooms:
-            # Generate room entrance image
-            room_prompt = self._create_room_prompt(room, exhibition.get('topic', ''))
-            room['entrance_image'] = self._generate_image_with_gemini(room_prompt)
-            
-            # Generate images for exhibits in the room
-            exhibits = room.get('exhibits', [])
-            for exhibit in exhibits:
-                exhibit_prompt = self._create_exhibit_prompt(exhibit, room.get('theme', ''))
-                exhibit['generated_image'] = self._generate_image_with_gemini(exhibit_prompt)
+            jobs.append((room, 'entrance_image', self._create_room_prompt(room, exhibition.get('topic', ''))))
+        for room in rooms:
+            for exhibit in room.get('exhibits', []):
+                jobs.append((exhibit, 'generated_image', self._create_exhibit_prompt(exhibit, room.get('theme', ''))))
+        return jobs
+    
+    def _run_image_jobs(self, jobs: List[Tuple[Dict, str, str]], deadline: float, max_workers: int):
+        """Generate images on a bounded pool, skipping whatever misses the deadline."""
+        if not jobs:
+            return
         
-        return {'exhibition': exhibition}
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max(1, min(len(jobs), max_workers)))
+        # Submitted in priority order; the pool starts them first-in, first-out
+        futures = [executor.submit(self._generate_before, prompt, deadline, cancelled) for _, _, prompt in jobs]
+        done, _ = wait(futures, timeout=max(0.0, deadline - time.time()))
+        # Calls already in flight finish in the background, but once cancelled
+        # none is counted or starts, and none stores its image
+        with self._stats_lock:
+            cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        for future, (target, key, prompt) in zip(futures, jobs):
+            target[key] = future.result() if future in done else self._skipped_image(prompt, 'deadline')
+    
+    def _generate_before(self, prompt: str, deadline: float, cancelled: threading.Event) -> Dict:
+        """Generate an image unless the deadline passed while it was queued."""
+        if time.time() >= deadline:
+            return self._skipped_image(prompt, 'deadline')
+        return self._generate_image_with_gemini(prompt, cancelled)
+    
+    def _skipped_image(self, prompt: str, reason: str) -> Dict:
+        return {
+            'prompt': prompt[:100],
+            'status': 'skipped',
+            'reason': reason,
+            'note': 'Image budget exhausted' if reason == 'budget' else 'Image deadline reached'
+        }
+    
+    def _image_stats(self, jobs: List[Tuple[Dict, str, str]], duration: float) -> Dict[str, Any]:
+        """Outcome counts for one exhibition's images."""
+        images = [target.get(key, {}) for target, key, _ in jobs]
+        return {
+            'planned': len(images),
+            'generated': sum(1 for i in images if i.get('status') == 'generated'),
+            'skipped_budget': sum(1 for i in images if i.get('reason') == 'budget'),
+            'skipped_deadline': sum(1 for i in images if i.get('reason') == 'deadline'),
+            'failed': sum(1 for i in images if i.get('status') in ('error', 'no_image')),
+            'duration': duration
+        }
+    
+    def _image_model(self):
+        """Image model client, shared with every other image call in the process."""
+        return get_gemini_registry().model(config.IMAGE_MODEL_NAME)
     
     def _create_poster_prompt(self, exhibition: Dict) -> str:
         """Create prompt for exhibition poster."""
@@ -94,18 +164,13 @@ Lighting: Dramatic spotlighting with soft shadows, museum gallery lighting."""
         
         return prompt
     
-    def _generate_image_with_gemini(self, prompt: str) -> str:
-        """Generate images using Nano Banana (Gemini 2.5 Flash Image model)."""
+    def _generate_image_with_gemini(self, prompt: str, cancelled: Optional[threading.Event] = None) -> str:
+        """
+        Generate images using Nano Banana (Gemini 2.5 Flash Image model).
+        
+        Once cancelled is set the image is neither requested nor stored.
+        """
         try:
-            import google.generativeai as genai
-            import config
-            
-            # Configure Gemini with API key
-            genai.configure(api_key=config.GOOGLE_API_KEY)
-            
-            # Use Nano Banana model for image generation
-            model = genai.GenerativeModel('gemini-2.5-flash-image')
-            
             # Simplify prompt for image generation (Nano Banana has 32K token limit)
             # Extract main subject
             lines = prompt.split('\n')
@@ -117,69 +182,38 @@ Lighting: Dramatic spotlighting with soft shadows, museum gallery lighting."""
             # Keep it concise for better results
             simple_prompt = clean_prompt[:200]
             
-            self.logger.logger.info(f"Generating image with Nano Banana: {simple_prompt[:50]}...")
+            if config.IMAGE_CACHE_ENABLED:
+                image_data = get_image_cache().get_or_generate(
+                    simple_prompt, config.IMAGE_MODEL_NAME, lambda: self._render_image(simple_prompt, cancelled)
+                )
+            else:
+                image_data = self._render_image(simple_prompt, cancelled)
+            
+            if cancelled is not None and cancelled.is_set():
+                return self._skipped_image(prompt, 'deadline')
             
-            # Generate image using Nano Banana
-            response = model.generate_content(simple_prompt)
+            if image_data is None:
+                # If no image in response, log and fallback
+                self.logger.logger.warning("Nano Banana did not return image data")
+                return {
+                    'prompt': simple_prompt,
+                    'status': 'no_image',
+                    'note': 'Nano Banana did not generate an image'
+                }
             
-            # Check if response contains image data
-            if hasattr(response, 'parts') and response.parts:
-                for part in response.parts:
-                    if hasattr(part, 'inline_data') and part.inline_data:
-                        # Compress and resize image for minimal storage
-                        import base64
-                        from PIL import Image
-                        from io import BytesIO
-                        
-                        image_data = part.inline_data.data
-                        
-                        # Open image with PIL
-                        original_image = Image.open(BytesIO(image_data))
-                        original_size = len(image_data)
-                        
-                        # Resize to smaller dimensions (max 400x300 for thumbnails)
-                        max_width = 400
-                        max_height = 300
-                        original_image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-                        
-                        # Convert to RGB if necessary (for JPEG)
-                        if original_image.mode in ('RGBA', 'LA', 'P'):
-                            rgb_image = Image.new('RGB', original_image.size, (255, 255, 255))
-                            if original_image.mode == 'P':
-                                original_image = original_image.convert('RGBA')
-                            rgb_image.paste(original_image, mask=original_image.split()[-1] if original_image.mode == 'RGBA' else None)
-                            original_image = rgb_image
-                        
-                        # Save as compressed JPEG
-                        output = BytesIO()
-                        original_image.save(output, format='JPEG', quality=70, optimize=True)
-                        compressed_data = output.getvalue()
-                        
-                        # Convert to base64 string
-                        image_base64 = base64.b64encode(compressed_data).decode('utf-8')
-                        
-                        compression_ratio = (1 - len(compressed_data) / original_size) * 100
-                        self.logger.logger.info(
-                            f"Image compressed: {original_size} -> {len(compressed_data)} bytes "
-                            f"({compression_ratio:.1f}% reduction), base64: {len(image_base64)} chars"
-                        )
-                        
-                        return {
-                            'prompt': simple_prompt,
-                            'image_base64': image_base64,
-                            'mime_type': 'image/jpeg',
-                            'status': 'generated',
-                            'model': 'nano-banana',
-                            'size': f'{max_width}x{max_height}',
-                            'note': f'Compressed thumbnail ({len(compressed_data)//1024}KB)'
-                        }
+            # Store the original once in the blob store; the exhibition keeps the
+            # digest and displays derive sized renditions from it on demand
+            blob = get_blob_store().put(image_data)
+            width, height = image_dimensions(image_data)
             
-            # If no image in response, log and fallback
-            self.logger.logger.warning("Nano Banana did not return image data")
             return {
                 'prompt': simple_prompt,
-                'status': 'no_image',
-                'note': 'Nano Banana did not generate an image'
+                'blob': blob,
+                'mime_type': sniff_mime_type(image_data) or 'image/png',
+                'status': 'generated',
+                'model': 'nano-banana',
+                'size': f'{width}x{height}',
+                'note': f'Original image ({len(image_data)//1024}KB)'
             }
             
         except Exception as e:
@@ -192,6 +226,23 @@ Lighting: Dramatic spotlighting with soft shadows, museum gallery lighting."""
                 'note': 'Nano Banana generation failed'
             }
     
+    def _render_image(self, simple_prompt: str, cancelled: Optional[threading.Event] = None) -> Optional[bytes]:
+        """Call the image model; returns the encoded image as generated, or None."""
+        self.logger.logger.info(f"Generating image with Nano Banana: {simple_prompt[:50]}...")
+        
+        # Generate image using Nano Banana, sharing the text agents' quota
+        if not self._count_api_call(get_rate_limiter().acquire(estimate_tokens(simple_prompt)), cancelled):
+            return None
+        response = self._image_model().generate_content(simple_prompt)
+        if cancelled is not None and cancelled.is_set():
+            return None  # Finished after the deadline; not cached
+        
+        # Check if response contains image data
+        for part in getattr(response, 'parts', None) or []:
+            if hasattr(part, 'inline_data') and part.inline_data:
+                return part.inline_data.data
+        return None
+    
     def generate_with_imagen(self, prompt: str) -> str:
         """Generate image using Google Imagen API (requires Vertex AI setup)."""
         # Placeholder for Imagen integration
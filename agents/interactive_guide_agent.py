@@ -1,7 +1,57 @@
 """Interactive Guide Agent - Creates interactive elements and questions."""
+import asyncio
 from typing import Dict, List
 from agents.base_agent import BaseAgent
-import json
+from utils.concurrency import fan_out, afan_out
+from utils.json_stream import extract_json_array, extract_json_object
+import config
+
+QUESTION_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "question": {"type": "STRING"},
+        "purpose": {"type": "STRING"},
+        "hint": {"type": "STRING"}
+    },
+    "required": ["question", "purpose", "hint"]
+}
+GUIDE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "rooms": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "title": {"type": "STRING"},
+                    "questions": {"type": "ARRAY", "items": QUESTION_SCHEMA}
+                },
+                "required": ["title", "questions"]
+            }
+        },
+        "quiz": {
+            "type": "OBJECT",
+            "properties": {
+                "title": {"type": "STRING"},
+                "questions": {
+                    "type": "ARRAY",
+                    "items": {
+                        "type": "OBJECT",
+                        "properties": {
+                            "question": {"type": "STRING"},
+                            "options": {"type": "ARRAY", "items": {"type": "STRING"}},
+                            "correct": {"type": "INTEGER"},
+                            "explanation": {"type": "STRING"}
+                        },
+                        "required": ["question", "options", "correct", "explanation"]
+                    }
+                }
+            },
+            "required": ["title", "questions"]
+        }
+    },
+    "required": ["rooms", "quiz"]
+}
 
 class InteractiveGuideAgent(BaseAgent):
     """Agent that creates interactive educational elements."""
@@ -21,9 +71,16 @@ class InteractiveGuideAgent(BaseAgent):
         """
         exhibition = input_data.copy()
         
-        # Add interactive questions for each room
-        for room in exhibition.get("rooms", []):
-            room["interactive_questions"] = self._generate_questions(room)
+        if config.STRUCTURED_OUTPUT:
+            guide = self.generate_structured(self._guide_prompt(exhibition), GUIDE_SCHEMA, temperature=0.7)
+            return self._apply_guide(exhibition, guide)
+        
+        # Add interactive questions for each room (one concurrent call per room)
+        rooms = exhibition.get("rooms", [])
+        questions = fan_out(self._generate_questions, rooms,
+                            fallback=lambda room, error: self._parse_questions(room, ""))
+        for room, room_questions in zip(rooms, questions):
+            room["interactive_questions"] = room_questions
             room["discussion_prompts"] = self._generate_discussion_prompts(room)
         
         # Add overall quiz
@@ -34,41 +91,118 @@ class InteractiveGuideAgent(BaseAgent):
         
         return exhibition
     
+    async def _aprocess(self, input_data: Dict) -> Dict:
+        """Async variant of _process; room questions and the quiz are requested concurrently."""
+        exhibition = input_data.copy()
+        rooms = exhibition.get("rooms", [])
+        
+        if config.STRUCTURED_OUTPUT:
+            guide = await self.agenerate_structured(self._guide_prompt(exhibition), GUIDE_SCHEMA, temperature=0.7)
+            return self._apply_guide(exhibition, guide)
+        
+        async def questions_response(room: Dict) -> str:
+            try:
+                return await self.agenerate_with_gemini(self._questions_prompt(room), temperature=0.8)
+            except Exception:
+                return ""
+        
+        quiz_text, question_texts = await asyncio.gather(
+            self.agenerate_with_gemini(self._quiz_prompt(exhibition), temperature=0.7),
+            afan_out(questions_response, rooms)
+        )
+        
+        for room, response in zip(rooms, question_texts):
+            room["interactive_questions"] = self._parse_questions(room, response)
+            room["discussion_prompts"] = self._generate_discussion_prompts(room)
+        
+        exhibition["quiz"] = self._parse_quiz(exhibition.get("topic", ""), quiz_text)
+        exhibition["challenges"] = self._generate_challenges(exhibition)
+        
+        return exhibition
+    
+    def _guide_prompt(self, exhibition: Dict) -> str:
+        """Build the single prompt covering every room's questions and the quiz."""
+        rooms = "\n".join(f"{i}. {room.get('title', '')} ({room.get('theme', '')})"
+                          for i, room in enumerate(exhibition.get("rooms", []), 1))
+        
+        return f"""Create interactive elements for a museum exhibition about {exhibition.get("topic", "")}.
+
+Rooms:
+{rooms}
+
+Provide:
+- rooms: for each room above, in order, its title and 2 questions for visitors,
+  each with its purpose and a hint
+- quiz: a title and a 5-question multiple choice quiz about the topic. Questions
+  should be educational but fun, mix difficulty levels, be based on exhibition
+  content and have clear correct answers: 4 options each, the index of the
+  correct option and an explanation
+
+Respond with JSON only."""
+    
+    def _apply_guide(self, exhibition: Dict, guide: Dict) -> Dict:
+        """Attach a structured response to the exhibition, with a fallback per missing field."""
+        generated = guide.get("rooms", [])
+        by_title = {room["title"].casefold(): room["questions"] for room in generated}
+        
+        for i, room in enumerate(exhibition.get("rooms", [])):
+            # Match by title; fall back to position if the model renamed the room
+            questions = by_title.get(room.get("title", "").casefold())
+            if questions is None and i < len(generated):
+                questions = generated[i]["questions"]
+            room["interactive_questions"] = questions or self._parse_questions(room, "")
+            room["discussion_prompts"] = self._generate_discussion_prompts(room)
+        
+        quiz = guide.get("quiz")
+        if quiz:
+            # Drop questions whose correct index points outside their options
+            quiz["questions"] = [q for q in quiz["questions"] if 0 <= q["correct"] < len(q["options"])]
+        if not quiz or not quiz["questions"]:
+            quiz = self._parse_quiz(exhibition.get("topic", ""), "")
+        exhibition["quiz"] = quiz
+        exhibition["challenges"] = self._generate_challenges(exhibition)
+        
+        return exhibition
+    
     def _generate_questions(self, room: Dict) -> List[Dict]:
         """Generate interactive questions for a room."""
+        try:
+            response = self.generate_with_gemini(self._questions_prompt(room), temperature=0.8)
+        except Exception:
+            response = ""
+        
+        return self._parse_questions(room, response)
+    
+    def _questions_prompt(self, room: Dict) -> str:
+        """Build the room questions prompt."""
         room_title = room.get("title", "")
         theme = room.get("theme", "")
         
         # Use simpler format to reduce API load
-        prompt = f"""Create 2 questions about: {room_title} ({theme})
+        return f"""Create 2 questions about: {room_title} ({theme})
 Format: Q|purpose|hint (one per line)"""
-
-        try:
-            response = self.generate_with_gemini(prompt, temperature=0.8)
-            
-            questions = []
-            for line in response.split('\n'):
-                if '|' in line:
-                    parts = line.split('|')
-                    if len(parts) >= 3:
-                        questions.append({
-                            "question": parts[0].strip(),
-                            "purpose": parts[1].strip(),
-                            "hint": parts[2].strip()
-                        })
-            
-            if questions:
-                return questions
-        except:
-            pass
+    
+    def _parse_questions(self, room: Dict, response: str) -> List[Dict]:
+        """Parse questions from pipe-separated lines or a JSON array."""
+        room_title = room.get("title", "")
         
-        try:
-            json_start = response.find('[')
-            json_end = response.rfind(']') + 1
-            if json_start != -1:
-                return json.loads(response[json_start:json_end])
-        except:
-            pass
+        questions = []
+        for line in response.split('\n'):
+            if '|' in line:
+                parts = line.split('|')
+                if len(parts) >= 3:
+                    questions.append({
+                        "question": parts[0].strip(),
+                        "purpose": parts[1].strip(),
+                        "hint": parts[2].strip()
+                    })
+        
+        if questions:
+            return questions
+        
+        questions = [q for q in extract_json_array(response) if isinstance(q, dict)]
+        if questions:
+            return questions
         
         return [
             {"question": f"What surprises you most about {room_title}?", "purpose": "Personal reflection", "hint": "Think about your expectations"}
@@ -88,9 +222,14 @@ Format: Q|purpose|hint (one per line)"""
     
     def _generate_quiz(self, exhibition: Dict) -> Dict:
         """Generate an interactive quiz."""
+        response = self.generate_with_gemini(self._quiz_prompt(exhibition), temperature=0.7)
+        return self._parse_quiz(exhibition.get("topic", ""), response)
+    
+    def _quiz_prompt(self, exhibition: Dict) -> str:
+        """Build the quiz prompt."""
         topic = exhibition.get("topic", "")
         
-        prompt = f"""Create a 5-question multiple choice quiz about {topic}.
+        return f"""Create a 5-question multiple choice quiz about {topic}.
 
 Questions should be:
 - Educational but fun
@@ -112,16 +251,12 @@ Format as JSON:
 }}
 
 Provide ONLY the JSON."""
-
-        response = self.generate_with_gemini(prompt, temperature=0.7)
-        
-        try:
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            if json_start != -1:
-                return json.loads(response[json_start:json_end])
-        except:
-            pass
+    
+    def _parse_quiz(self, topic: str, response: str) -> Dict:
+        """Parse the quiz JSON object."""
+        quiz = extract_json_object(response)
+        if quiz:
+            return quiz
         
         return {
             "title": f"Test Your Knowledge: {topic}",
@@ -1,5 +1,5 @@
 """Loop Agent - refines exhibitions based on evaluation."""
-from typing import Dict
+from typing import Dict, List
 from agents.base_agent import BaseAgent
 import config
 
@@ -1,6 +1,28 @@
 """Narrative Agent - creates curator notes and storylines."""
-from typing import Dict
+import asyncio
+from typing import Dict, Optional
 from agents.base_agent import BaseAgent
+from utils.concurrency import fan_out, afan_out
+import config
+
+NARRATIVE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "curator_notes": {"type": "STRING"},
+        "room_narratives": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "title": {"type": "STRING"},
+                    "narrative": {"type": "STRING"}
+                },
+                "required": ["title", "narrative"]
+            }
+        }
+    },
+    "required": ["curator_notes", "room_narratives"]
+}
 
 class NarrativeAgent(BaseAgent):
     """Agent that creates narrative content and curator notes."""
@@ -20,24 +42,109 @@ class NarrativeAgent(BaseAgent):
         """
         exhibition = input_data.copy()
         
+        if config.STRUCTURED_OUTPUT:
+            narrative = self.generate_structured(self._narrative_prompt(exhibition), NARRATIVE_SCHEMA,
+                                                 temperature=0.8)
+            return self._apply_narrative(exhibition, narrative)
+        
         # Generate curator notes
         curator_notes = self._generate_curator_notes(exhibition)
         exhibition["curator_notes"] = curator_notes
         
-        # Add room narratives
-        for room in exhibition.get("rooms", []):
-            room["narrative"] = self._generate_room_narrative(room, exhibition["topic"])
+        # Add room narratives (one concurrent call per room)
+        rooms = exhibition.get("rooms", [])
+        narratives = fan_out(
+            lambda room: self._generate_room_narrative(room, exhibition["topic"]),
+            rooms,
+            fallback=self._fallback_room_narrative
+        )
+        for room, narrative in zip(rooms, narratives):
+            room["narrative"] = narrative
+        
+        return exhibition
+    
+    async def _aprocess(self, input_data: Dict) -> Dict:
+        """Async variant of _process; curator notes and room narratives are awaited concurrently."""
+        exhibition = input_data.copy()
+        rooms = exhibition.get("rooms", [])
+        
+        if config.STRUCTURED_OUTPUT:
+            narrative = await self.agenerate_structured(self._narrative_prompt(exhibition), NARRATIVE_SCHEMA,
+                                                        temperature=0.8)
+            return self._apply_narrative(exhibition, narrative)
+        
+        curator_notes, narratives = await asyncio.gather(
+            self.agenerate_with_gemini(self._curator_notes_prompt(exhibition), temperature=0.85),
+            afan_out(
+                lambda room: self.agenerate_with_gemini(
+                    self._room_narrative_prompt(room, exhibition["topic"]), temperature=0.7
+                ),
+                rooms,
+                fallback=self._fallback_room_narrative
+            )
+        )
+        
+        exhibition["curator_notes"] = curator_notes
+        for room, narrative in zip(rooms, narratives):
+            room["narrative"] = narrative
+        
+        return exhibition
+    
+    def _narrative_prompt(self, exhibition: Dict) -> str:
+        """Build the single prompt covering curator notes and every room narrative."""
+        rooms = []
+        for i, room in enumerate(exhibition.get("rooms", []), 1):
+            exhibit_names = [e.get("name", "") for e in room.get("exhibits", [])[:5]]
+            rooms.append(f"{i}. {room.get('title', '')} (theme: {room.get('theme', '')}; "
+                         f"key exhibits: {', '.join(exhibit_names)})")
+        rooms = "\n".join(rooms)
+        
+        return f"""Write the narrative texts for a museum exhibition about: {exhibition.get("topic", "")}
+
+Overview: {exhibition.get("overview", "")}
+
+Exhibition Rooms:
+{rooms}
+
+Provide:
+- curator_notes: a 4-paragraph curator's introduction that welcomes visitors and
+  introduces the topic, explains why this exhibition matters today, highlights
+  what visitors will discover and provides context for understanding the exhibits.
+  Educational, welcoming, engaging; avoid jargon
+- room_narratives: for each room above, in order, its title and a 2-3 sentence
+  introduction that sets the scene, connects the exhibits to the overall theme
+  and creates anticipation for what visitors will discover
+
+Respond with JSON only."""
+    
+    def _apply_narrative(self, exhibition: Dict, narrative: Dict) -> Dict:
+        """Attach a structured response to the exhibition, with a fallback per missing field."""
+        exhibition["curator_notes"] = (narrative.get("curator_notes") or exhibition.get("overview")
+                                       or f"Welcome to {exhibition.get('title', 'the exhibition')}.")
+        
+        generated = narrative.get("room_narratives", [])
+        by_title = {room["title"].casefold(): room["narrative"] for room in generated}
+        for i, room in enumerate(exhibition.get("rooms", [])):
+            # Match by title; fall back to position if the model renamed the room
+            text = by_title.get(room.get("title", "").casefold())
+            if text is None and i < len(generated):
+                text = generated[i]["narrative"]
+            room["narrative"] = text or self._fallback_room_narrative(room, None)
         
         return exhibition
     
     def _generate_curator_notes(self, exhibition: Dict) -> str:
         """Generate curator's introduction and notes."""
+        return self.generate_with_gemini(self._curator_notes_prompt(exhibition), temperature=0.85)
+    
+    def _curator_notes_prompt(self, exhibition: Dict) -> str:
+        """Build the curator notes prompt."""
         topic = exhibition.get("topic", "")
         overview = exhibition.get("overview", "")
         rooms = exhibition.get("rooms", [])
         room_titles = [r.get("title", "") for r in rooms]
         
-        prompt = f"""Write curator's notes for a museum exhibition about: {topic}
+        return f"""Write curator's notes for a museum exhibition about: {topic}
 
 Overview: {overview}
 
@@ -52,17 +159,23 @@ Write a 4-paragraph curator's introduction that:
 Tone: Educational, welcoming, engaging. Avoid jargon.
 
 Write in a warm, accessible style that makes visitors excited to explore."""
-
-        return self.generate_with_gemini(prompt, temperature=0.85)
     
     def _generate_room_narrative(self, room: Dict, topic: str) -> str:
         """Generate narrative for a specific room."""
+        return self.generate_with_gemini(self._room_narrative_prompt(room, topic), temperature=0.7)
+    
+    def _fallback_room_narrative(self, room: Dict, error: Optional[Exception]) -> str:
+        """Use the room description when its narrative could not be generated."""
+        return room.get("description", "") or f"Welcome to {room.get('title', 'this room')}."
+    
+    def _room_narrative_prompt(self, room: Dict, topic: str) -> str:
+        """Build the room narrative prompt."""
         room_title = room.get("title", "")
         theme = room.get("theme", "")
         exhibits = room.get("exhibits", [])
         exhibit_names = [e.get("name", "") for e in exhibits[:5]]
         
-        prompt = f"""Write a brief narrative introduction for this museum room:
+        return f"""Write a brief narrative introduction for this museum room:
 
 Room: {room_title}
 Theme: {theme}
@@ -75,5 +188,3 @@ Write 2-3 sentences that:
 - Create anticipation for what they'll discover
 
 Tone: Engaging, educational, inviting."""
-
-        return self.generate_with_gemini(prompt, temperature=0.7)
@@ -1,4 +1,5 @@
 """Research Agent - conducts research using search tools."""
+import asyncio
 from typing import Dict, List
 from agents.base_agent import BaseAgent
 from tools.search_tool import GoogleSearchTool
@@ -29,10 +30,7 @@ class ResearchAgent(BaseAgent):
         queries = self._generate_research_queries(topic)
         
         # Conduct searches
-        all_results = []
-        for query in queries[:3]:  # Limit to 3 queries
-            results = self.search_tool.search(query, num_results=3)
-            all_results.extend(results)
+        all_results = self._search(queries)
         
         # Extract facts
         facts = self.search_tool.extract_facts(all_results)
@@ -40,6 +38,35 @@ class ResearchAgent(BaseAgent):
         # Use Gemini to synthesize research
         research_summary = self._synthesize_research(topic, facts)
         
+        return self._build_result(topic, queries, all_results, facts, research_summary)
+    
+    async def _aprocess(self, input_data: Dict) -> Dict[str, any]:
+        """Async variant of _process."""
+        topic = input_data.get("original_topic", "")
+        
+        response = await self.agenerate_with_gemini(self._queries_prompt(topic), temperature=0.5)
+        queries = self._parse_queries(response)
+        
+        all_results = await asyncio.to_thread(self._search, queries)
+        facts = self.search_tool.extract_facts(all_results)
+        
+        research_summary = await self.agenerate_with_gemini(
+            self._synthesis_prompt(topic, facts), temperature=0.6
+        )
+        
+        return self._build_result(topic, queries, all_results, facts, research_summary)
+    
+    def _search(self, queries: List[str]) -> List[Dict]:
+        """Run the search tool for the top queries."""
+        all_results = []
+        for query in queries[:3]:  # Limit to 3 queries
+            results = self.search_tool.search(query, num_results=3)
+            all_results.extend(results)
+        return all_results
+    
+    def _build_result(self, topic: str, queries: List[str], all_results: List[Dict],
+                      facts: List[str], research_summary: str) -> Dict[str, any]:
+        """Assemble research output with a fact consistency report."""
         # Check fact consistency
         consistency_report = self.fact_checker.check_consistency(facts)
         
@@ -55,7 +82,12 @@ class ResearchAgent(BaseAgent):
     
     def _generate_research_queries(self, topic: str) -> List[str]:
         """Generate search queries for the topic."""
-        prompt = f"""Generate 5 specific search queries to research this museum exhibition topic: {topic}
+        response = self.generate_with_gemini(self._queries_prompt(topic), temperature=0.5)
+        return self._parse_queries(response)
+    
+    def _queries_prompt(self, topic: str) -> str:
+        """Build the research query prompt."""
+        return f"""Generate 5 specific search queries to research this museum exhibition topic: {topic}
 
 Queries should cover:
 1. Historical background
@@ -65,16 +97,21 @@ Queries should cover:
 5. Modern relevance
 
 Format: One query per line, no numbering."""
-
-        response = self.generate_with_gemini(prompt, temperature=0.5)
+    
+    def _parse_queries(self, response: str) -> List[str]:
+        """Parse one query per line."""
         queries = [q.strip() for q in response.split('\n') if q.strip()]
         return queries[:5]
     
     def _synthesize_research(self, topic: str, facts: List[str]) -> str:
         """Synthesize research findings into coherent summary."""
+        return self.generate_with_gemini(self._synthesis_prompt(topic, facts), temperature=0.6)
+    
+    def _synthesis_prompt(self, topic: str, facts: List[str]) -> str:
+        """Build the research synthesis prompt."""
         facts_text = "\n".join([f"- {fact}" for fact in facts[:10]])
         
-        prompt = f"""Synthesize these research findings about {topic} into a coherent 3-paragraph summary suitable for a museum exhibition:
+        return f"""Synthesize these research findings about {topic} into a coherent 3-paragraph summary suitable for a museum exhibition:
 
 Facts:
 {facts_text}
@@ -84,5 +121,3 @@ Create an educational, engaging summary that:
 - Highlights cultural significance
 - Maintains factual accuracy
 - Uses accessible language"""
-
-        return self.generate_with_gemini(prompt, temperature=0.6)
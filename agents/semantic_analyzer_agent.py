@@ -1,7 +1,30 @@
 """Semantic Analyzer Agent - Advanced topic analysis and connections."""
+import asyncio
 from typing import Dict, List
 from agents.base_agent import BaseAgent
-import json
+from utils.json_stream import extract_json_array
+import config
+
+ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "connections": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "type": {"type": "STRING"},
+                    "connection": {"type": "STRING"},
+                    "significance": {"type": "STRING"}
+                },
+                "required": ["type", "connection", "significance"]
+            }
+        },
+        "key_concepts": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "thematic_insights": {"type": "STRING"}
+    },
+    "required": ["connections", "key_concepts", "thematic_insights"]
+}
 
 class SemanticAnalyzerAgent(BaseAgent):
     """Agent that performs deep semantic analysis of topics."""
@@ -22,6 +45,11 @@ class SemanticAnalyzerAgent(BaseAgent):
         topic = input_data.get("topic", "")
         research_summary = input_data.get("research_summary", "")
         
+        if config.STRUCTURED_OUTPUT:
+            analysis = self.generate_structured(self._analysis_prompt(topic, research_summary),
+                                                ANALYSIS_SCHEMA, temperature=0.7)
+            return self._structured_result(topic, analysis)
+        
         # Analyze semantic connections
         connections = self._analyze_connections(topic, research_summary)
         
@@ -31,6 +59,39 @@ class SemanticAnalyzerAgent(BaseAgent):
         # Generate thematic insights
         insights = self._generate_insights(topic, connections, concepts)
         
+        return self._build_result(topic, connections, concepts, insights)
+    
+    async def _aprocess(self, input_data: Dict) -> Dict:
+        """Async variant of _process; connections and concepts are requested concurrently."""
+        topic = input_data.get("topic", "")
+        research_summary = input_data.get("research_summary", "")
+        
+        if config.STRUCTURED_OUTPUT:
+            analysis = await self.agenerate_structured(self._analysis_prompt(topic, research_summary),
+                                                       ANALYSIS_SCHEMA, temperature=0.7)
+            return self._structured_result(topic, analysis)
+        
+        async def connections_response() -> str:
+            try:
+                return await self.agenerate_with_gemini(self._connections_prompt(topic), temperature=0.7)
+            except Exception:
+                return ""
+        
+        connections_text, concepts_text = await asyncio.gather(
+            connections_response(),
+            self.agenerate_with_gemini(self._concepts_prompt(topic, research_summary), temperature=0.6)
+        )
+        connections = self._parse_connections(topic, connections_text)
+        concepts = self._parse_concepts(concepts_text)
+        
+        insights = await self.agenerate_with_gemini(
+            self._insights_prompt(topic, connections, concepts), temperature=0.8
+        )
+        
+        return self._build_result(topic, connections, concepts, insights)
+    
+    def _build_result(self, topic: str, connections: List[Dict], concepts: List[str], insights: str) -> Dict:
+        """Assemble the semantic analysis output."""
         return {
             "topic": topic,
             "connections": connections,
@@ -39,43 +100,68 @@ class SemanticAnalyzerAgent(BaseAgent):
             "semantic_score": self._calculate_semantic_score(connections, concepts)
         }
     
+    def _analysis_prompt(self, topic: str, research: str) -> str:
+        """Build the single prompt covering connections, concepts and insights."""
+        return f"""Analyze this museum exhibition topic: {topic}
+
+Research:
+{research[:500]}
+
+Provide:
+- connections: 3 key connections (one historical, one cultural, one conceptual),
+  each with its type, the connection and its significance
+- key_concepts: the 8-10 most important concepts, themes and ideas
+- thematic_insights: 2-3 unique thematic insights that reveal deeper meaning and
+  unexpected connections; thought-provoking and educational
+
+Respond with JSON only."""
+    
+    def _structured_result(self, topic: str, analysis: Dict) -> Dict:
+        """Semantic analysis from a structured response, with a fallback per missing field."""
+        connections = analysis.get("connections") or self._parse_connections(topic, "")
+        concepts = analysis.get("key_concepts", [])[:10]
+        insights = analysis.get("thematic_insights") or "Analysis unavailable"
+        return self._build_result(topic, connections, concepts, insights)
+    
     def _analyze_connections(self, topic: str, research: str) -> List[Dict]:
         """Analyze semantic connections within the topic."""
+        try:
+            response = self.generate_with_gemini(self._connections_prompt(topic), temperature=0.7)
+        except Exception:
+            response = ""
+        
+        return self._parse_connections(topic, response)
+    
+    def _connections_prompt(self, topic: str) -> str:
+        """Build the connections prompt."""
         # Simplified prompt to reduce API calls
-        prompt = f"""List 3 key connections for {topic}:
+        return f"""List 3 key connections for {topic}:
 1. Historical connection
 2. Cultural connection  
 3. Conceptual connection
 
 Format: type|connection|significance (one per line)"""
-
-        try:
-            response = self.generate_with_gemini(prompt, temperature=0.7)
-            
-            # Parse simple format
-            connections = []
-            for line in response.split('\n'):
-                if '|' in line:
-                    parts = line.split('|')
-                    if len(parts) >= 3:
-                        connections.append({
-                            "type": parts[0].strip(),
-                            "connection": parts[1].strip(),
-                            "significance": parts[2].strip()
-                        })
-            
-            if connections:
-                return connections
-        except:
-            pass
+    
+    def _parse_connections(self, topic: str, response: str) -> List[Dict]:
+        """Parse connections from pipe-separated lines or a JSON array."""
+        # Parse simple format
+        connections = []
+        for line in response.split('\n'):
+            if '|' in line:
+                parts = line.split('|')
+                if len(parts) >= 3:
+                    connections.append({
+                        "type": parts[0].strip(),
+                        "connection": parts[1].strip(),
+                        "significance": parts[2].strip()
+                    })
         
-        try:
-            json_start = response.find('[')
-            json_end = response.rfind(']') + 1
-            if json_start != -1 and json_end > json_start:
-                return json.loads(response[json_start:json_end])
-        except:
-            pass
+        if connections:
+            return connections
+        
+        connections = [c for c in extract_json_array(response) if isinstance(c, dict)]
+        if connections:
+            return connections
         
         return [
             {"type": "historical", "connection": f"Historical context of {topic}", "significance": "Provides background"},
@@ -84,24 +170,34 @@ Format: type|connection|significance (one per line)"""
     
     def _extract_concepts(self, topic: str, research: str) -> List[str]:
         """Extract key concepts from the topic."""
-        prompt = f"""Extract 8-10 key concepts from this topic: {topic}
+        response = self.generate_with_gemini(self._concepts_prompt(topic, research), temperature=0.6)
+        return self._parse_concepts(response)
+    
+    def _concepts_prompt(self, topic: str, research: str) -> str:
+        """Build the concept extraction prompt."""
+        return f"""Extract 8-10 key concepts from this topic: {topic}
 
 Research:
 {research[:500]}
 
 List the most important concepts, themes, and ideas.
 Format: One concept per line, no numbering."""
-
-        response = self.generate_with_gemini(prompt, temperature=0.6)
+    
+    def _parse_concepts(self, response: str) -> List[str]:
+        """Parse one concept per line."""
         concepts = [c.strip() for c in response.split('\n') if c.strip() and len(c.strip()) > 3]
         return concepts[:10]
     
     def _generate_insights(self, topic: str, connections: List[Dict], concepts: List[str]) -> str:
         """Generate thematic insights."""
+        return self.generate_with_gemini(self._insights_prompt(topic, connections, concepts), temperature=0.8)
+    
+    def _insights_prompt(self, topic: str, connections: List[Dict], concepts: List[str]) -> str:
+        """Build the thematic insights prompt."""
         connections_text = "\n".join([f"- {c.get('type')}: {c.get('connection')}" for c in connections[:3]])
         concepts_text = ", ".join(concepts[:5])
         
-        prompt = f"""Generate 2-3 unique thematic insights about {topic}.
+        return f"""Generate 2-3 unique thematic insights about {topic}.
 
 Connections:
 {connections_text}
@@ -110,8 +206,6 @@ Key Concepts: {concepts_text}
 
 Write insights that reveal deeper meaning and unexpected connections.
 Make them thought-provoking and educational."""
-
-        return self.generate_with_gemini(prompt, temperature=0.8)
     
     def _calculate_semantic_score(self, connections: List[Dict], concepts: List[str]) -> float:
         """Calculate semantic richness score."""
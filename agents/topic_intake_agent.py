@@ -21,7 +21,18 @@ class TopicIntakeAgent(BaseAgent):
         topic = input_data.strip()
         
         # Generate enriched topic information using Gemini
-        prompt = f"""You are a museum curator analyzing a topic for an exhibition.
+        response = self.generate_with_gemini(self._build_prompt(topic), temperature=0.7)
+        return self._parse_response(topic, response)
+    
+    async def _aprocess(self, input_data: str) -> Dict[str, any]:
+        """Async variant of _process."""
+        topic = input_data.strip()
+        response = await self.agenerate_with_gemini(self._build_prompt(topic), temperature=0.7)
+        return self._parse_response(topic, response)
+    
+    def _build_prompt(self, topic: str) -> str:
+        """Build the topic analysis prompt."""
+        return f"""You are a museum curator analyzing a topic for an exhibition.
 
 Topic: {topic}
 
@@ -36,10 +47,9 @@ OVERVIEW: [2-3 sentence overview of the topic]
 SUGGESTED_ROOMS: [3-5 thematic room titles]
 
 Be specific, educational, and engaging."""
-
-        response = self.generate_with_gemini(prompt, temperature=0.7)
-        
-        # Parse response
+    
+    def _parse_response(self, topic: str, response: str) -> Dict[str, any]:
+        """Parse structured topic data from the model response."""
         result = {
             "original_topic": topic,
             "enriched_data": response,
@@ -2,6 +2,7 @@
 from typing import Dict, List
 from agents.base_agent import BaseAgent
 from tools.search_tool import GoogleSearchTool
+from utils.concurrency import fan_out
 import config
 
 class VisualContextAgent(BaseAgent):
@@ -23,10 +24,10 @@ class VisualContextAgent(BaseAgent):
         """
         exhibition = input_data.copy()
         
-        # Enhance visual references for each exhibit
-        for room in exhibition.get("rooms", []):
-            for exhibit in room.get("exhibits", []):
-                self._enhance_visual_refs(exhibit, exhibition["topic"])
+        # Enhance visual references for each exhibit (one concurrent search per exhibit)
+        exhibits = [exhibit for room in exhibition.get("rooms", []) for exhibit in room.get("exhibits", [])]
+        fan_out(lambda exhibit: self._enhance_visual_refs(exhibit, exhibition["topic"]), exhibits,
+                fallback=self._fallback_visual_refs)
         
         return exhibition
     
@@ -48,3 +49,7 @@ class VisualContextAgent(BaseAgent):
             })
         
         exhibit["visual_refs"] = visual_refs
+    
+    def _fallback_visual_refs(self, exhibit: Dict, error: Exception):
+        """Keep the exhibit's existing visual references when its search failed."""
+        self.logger.logger.warning(f"Visual references unchanged for '{exhibit.get('name', '')}': {str(error)}")
@@ -3,7 +3,8 @@ import streamlit as st
 import json
 from datetime import datetime
 from orchestrator import ExhibitionOrchestrator
-from agents.memory_bank_agent import MemoryBankAgent
+from utils.exhibition_store import get_exhibition_repository
+from utils.renditions import get_rendition
 from tools.knowledge_graph import KnowledgeGraphGenerator
 from tools.ai_docent import AIDocent
 from tools.safe_3d_viz import create_timeline_3d, create_concept_network_3d, create_room_flow_3d
@@ -561,6 +562,18 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Progress lines shown while an exhibition streams in, one per section
+STREAM_LABELS = {
+    'topic': "📋 Topic analyzed",
+    'research': "🔍 Research complete",
+    'exhibit': "🏺 Exhibits drafted",
+    'timeline': "📅 Timeline built",
+    'room': "🚪 Rooms designed",
+    'narrative': "📖 Narratives written",
+    'image': "🎨 Images generated",
+    'evaluation': "⭐ Quality evaluated",
+}
+
 # Initialize session state
 if 'orchestrator' not in st.session_state:
     st.session_state.orchestrator = ExhibitionOrchestrator()
@@ -584,28 +597,20 @@ def display_header():
     </div>
     """, unsafe_allow_html=True)
 
-def display_generated_image(image_data: dict, caption: str = "Generated Image"):
-    """Display AI-generated image with metadata."""
+def display_generated_image(image_data: dict, caption: str = "Generated Image", rendition: str = "card"):
+    """Display AI-generated image with metadata, using the named rendition of stored images."""
     if isinstance(image_data, dict):
         status = image_data.get('status', 'unknown')
         
         if status == 'generated':
-            # Show Nano Banana generated image from base64
-            image_base64 = image_data.get('image_base64', '')
-            if image_base64:
-                import base64
-                from io import BytesIO
-                from PIL import Image
-                
-                # Decode base64 to image
-                image_bytes = base64.b64decode(image_base64)
-                image = Image.open(BytesIO(image_bytes))
-                
+            # Show Nano Banana generated image, sized for the page from the stored original
+            image_bytes = get_rendition(image_data, rendition)
+            if image_bytes:
                 # Display with fixed width for consistency (smaller thumbnails)
-                st.image(image, caption=f"🎨 {caption} (Nano Banana)", width=300)
+                st.image(image_bytes, caption=f"🎨 {caption} (Nano Banana)", width=300)
                 st.caption(f"✨ {image_data.get('note', 'AI-generated thumbnail')}")
             
-            # Fallback to image_path if base64 not available
+            # Fallback to image_path if no stored image is available
             elif 'image_path' in image_data:
                 st.image(image_data['image_path'], caption=f"🎨 {caption} (Nano Banana)", use_container_width=True)
                 st.caption(f"✨ {image_data.get('note', 'AI-generated image')}")
@@ -638,15 +643,9 @@ def display_generated_image(image_data: dict, caption: str = "Generated Image"):
         
         else:
             # If it's an actual image URL or path
-            if 'image_base64' in image_data:
-                # Display base64 image
-                import base64
-                from io import BytesIO
-                from PIL import Image
-                
-                image_bytes = base64.b64decode(image_data['image_base64'])
-                image = Image.open(BytesIO(image_bytes))
-                st.image(image, caption=caption, use_container_width=True)
+            if 'blob' in image_data or 'image_base64' in image_data:
+                # Display stored or inline image
+                st.image(get_rendition(image_data, rendition), caption=caption, use_container_width=True)
             elif 'image_url' in image_data:
                 st.image(image_data['image_url'], caption=caption, use_container_width=True)
             elif 'image_path' in image_data:
@@ -828,6 +827,15 @@ def main():
             placeholder="e.g., Aztec Astronomy, Renaissance Art, Ancient Egypt..."
         )
         
+        profiles = list(config.EXECUTION_PROFILES)
+        profile = st.selectbox(
+            "Generation profile:",
+            profiles,
+            index=profiles.index(config.DEFAULT_PROFILE),
+            format_func=lambda name: f"{name.title()} (~{config.EXECUTION_PROFILES[name]['latency_budget_seconds']}s)",
+            help="Fast skips optional agents and images; Full runs all 14 agents"
+        )
+        
         generate_btn = st.button("🎨 Generate Exhibition", use_container_width=True)
         
         st.markdown("---")
@@ -861,33 +869,58 @@ def main():
         st.markdown("---")
         st.markdown("## 📚 Recent Exhibitions")
         
-        memory_bank = MemoryBankAgent()
-        recent = memory_bank.list_exhibitions(5)
+        repository = get_exhibition_repository()
+        search_query = st.text_input("🔍 Search exhibitions", key="history_search",
+                                     placeholder="e.g. calendar stone")
+        if search_query:
+            recent = repository.search_exhibitions(search_query, limit=5)
+            if not recent:
+                st.caption("No matching exhibitions")
+        else:
+            recent = repository.list_recent(5)
         
+        posters = repository.get_poster_images([ex['id'] for ex in recent])
         for ex in recent:
+            thumbnail = get_rendition(posters[ex['id']], "thumb") if ex['id'] in posters else None
+            if thumbnail:
+                st.image(thumbnail, width=160)
             if st.button(f"📖 {ex['topic'][:30]}...", key=f"load_{ex['id']}"):
-                loaded = memory_bank.retrieve_exhibition(ex['id'])
+                loaded = repository.get(ex['id'])
                 if loaded:
                     st.session_state.current_exhibition = {
                         'exhibition': loaded,
                         'metrics': {'overall_quality_score': ex['quality_score']}
                     }
                     st.rerun()
+            if ex.get('snippet'):
+                st.caption(ex['snippet'])
     
     # Main content
     if generate_btn and topic:
-        with st.spinner("🎨 Curating your exhibition... This may take a minute..."):
+        with st.status("🎨 Curating your exhibition... This may take a minute...", expanded=True) as status:
             try:
-                result = st.session_state.orchestrator.generate_exhibition(topic)
+                result = None
+                seen = set()
+                for event in st.session_state.orchestrator.stream_exhibition(topic, profile=profile):
+                    if event['type'] == 'complete':
+                        result = event['data']
+                    elif event['type'] in STREAM_LABELS and event['type'] not in seen:
+                        seen.add(event['type'])
+                        status.write(f"{STREAM_LABELS[event['type']]} ({event['elapsed']:.0f}s)")
+                status.update(label="🎨 Exhibition curated", state="complete")
                 st.session_state.current_exhibition = result
                 st.session_state.generation_history.append({
                     'topic': topic,
                     'timestamp': datetime.now().isoformat(),
                     'success': True
                 })
-                st.success("✅ Exhibition generated successfully!")
+                if result.get('reused_from'):
+                    st.success(f"♻️ Reused the stored exhibition on \"{result['reused_from']['topic']}\"")
+                else:
+                    st.success("✅ Exhibition generated successfully!")
                 st.rerun()
             except Exception as e:
+                status.update(label="❌ Curation failed", state="error")
                 st.error(f"❌ Error generating exhibition: {str(e)}")
                 st.session_state.generation_history.append({
                     'topic': topic,
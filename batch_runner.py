@@ -0,0 +1,125 @@
+"""Batch exhibition generation draining a persistent job queue."""
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import config
+from orchestrator import ExhibitionOrchestrator, resolve_profile
+from utils.cache_manager import get_response_cache
+from utils.job_queue import JobQueue, DONE, FAILED
+from utils.logger import get_logger
+from utils.rate_limiter import get_rate_limiter
+
+
+class BatchRunner:
+    """
+    Generates every pending topic in a JobQueue with a pool of worker threads.
+
+    Each worker has its own orchestrator; the rate limiter and the LLM
+    response cache are process-wide singletons, so all workers share one
+    API quota and reuse each other's responses. Every exhibition is
+    generated with the same execution profile (default config.DEFAULT_PROFILE).
+    """
+
+    def __init__(self, queue: JobQueue, workers: Optional[int] = None, profile: Optional[str] = None):
+        self.queue = queue
+        self.workers = max(1, workers or config.BATCH_WORKERS)
+        self.profile = resolve_profile(profile)["name"]
+        self.logger = get_logger()
+        self._lock = threading.Lock()
+        self._results = {DONE: 0, FAILED: 0, "retried": 0, "reused": 0, "api_calls": 0}
+
+    def run(self, on_job: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Process jobs until the queue has nothing pending.
+
+        Args:
+            on_job: Called with each finished job's record (status, topic, duration, ...)
+
+        Returns:
+            Throughput summary (see summary())
+        """
+        recovered = self.queue.recover()
+        if recovered:
+            self.logger.logger.info(f"Recovered {recovered} interrupted batch jobs")
+
+        start_time = time.time()
+        threads = [threading.Thread(target=self._work, args=(on_job,), name=f"batch-worker-{i}")
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return self.summary(time.time() - start_time)
+
+    def _work(self, on_job: Optional[Callable[[Dict], None]]):
+        """Worker loop: claim, generate, record."""
+        orchestrator = ExhibitionOrchestrator()
+        while True:
+            job = self.queue.claim()
+            if job is None:
+                return
+
+            # A failed attempt has no result to report its calls; this worker owns
+            # its orchestrator, so the difference in its agents' counters is exact
+            calls_before = orchestrator.api_calls()
+            start_time = time.time()
+            try:
+                result = orchestrator.generate_exhibition(job["topic"], profile=self.profile)
+            except Exception as e:
+                api_calls = orchestrator.api_calls() - calls_before
+                duration = time.time() - start_time
+                self.queue.fail(job["id"], str(e), api_calls, duration)
+                retrying = job["attempts"] < self.queue.max_attempts
+                self.logger.logger.warning(
+                    f"Batch job {job['id']} ('{job['topic']}') failed on attempt {job['attempts']}: {e}"
+                )
+                record = {**job, "status": "retrying" if retrying else FAILED, "error": str(e),
+                          "api_calls": api_calls, "duration": duration}
+                self._count("retried" if retrying else FAILED, api_calls)
+            else:
+                api_calls = result["metrics"]["api_calls"]
+                duration = time.time() - start_time
+                reused = bool(result.get("reused_from"))
+                self.queue.complete(job["id"], result.get("exhibition_id"), api_calls, duration, reused)
+                record = {**job, "status": DONE, "exhibition_id": result.get("exhibition_id"),
+                          "reused": reused, "api_calls": api_calls, "duration": duration,
+                          "quality_score": result["metrics"]["overall_quality_score"]}
+                self._count(DONE, api_calls, reused)
+
+            if on_job:
+                on_job(record)
+
+    def _count(self, outcome: str, api_calls: int, reused: bool = False):
+        with self._lock:
+            self._results[outcome] += 1
+            self._results["api_calls"] += api_calls
+            if reused:
+                self._results["reused"] += 1
+
+    def summary(self, wall_time: float) -> Dict:
+        """
+        Throughput of this run.
+
+        API calls per exhibition counts every model request of the run,
+        including failed attempts, over the exhibitions completed.
+        """
+        with self._lock:
+            results = dict(self._results)
+        completed = results[DONE]
+        return {
+            "completed": completed,
+            "failed": results[FAILED],
+            "retried": results["retried"],
+            "reused": results["reused"],
+            "workers": self.workers,
+            "profile": self.profile,
+            "wall_time": wall_time,
+            "exhibitions_per_hour": completed / wall_time * 3600 if wall_time > 0 else 0.0,
+            "api_calls": results["api_calls"],
+            "api_calls_per_exhibition": results["api_calls"] / completed if completed else 0.0,
+            "rate_limit_wait_seconds": get_rate_limiter().stats()["wait_seconds"],
+            "cache_hit_rate": get_response_cache().stats()["hit_rate"],
+            "queue": self.queue.counts()
+        }
@@ -0,0 +1,64 @@
+"""Count API calls per stage with and without structured output (live Gemini calls)."""
+import argparse
+import sys
+from typing import Dict
+
+import config
+from orchestrator import ExhibitionOrchestrator
+
+STRUCTURED_AGENTS = ["SemanticAnalyzerAgent", "InteractiveGuideAgent", "NarrativeAgent"]
+
+def count_calls(topic: str, structured: bool, profile: str) -> Dict:
+    """
+    Generate topic once with caching disabled.
+
+    Returns:
+        {"calls": {agent name: api_calls}, "total", "duration", "quality"}
+    """
+    config.STRUCTURED_OUTPUT = structured
+    orchestrator = ExhibitionOrchestrator()
+    result = orchestrator.generate_exhibition(topic, reuse=False, profile=profile)
+    return {
+        "calls": {agent.name: agent.get_stats()["api_calls"] for agent in orchestrator.agents},
+        "total": result["metrics"]["api_calls"],
+        "duration": result["duration"],
+        "quality": result["metrics"]["overall_quality_score"]
+    }
+
+def benchmark_calls(topic: str, profile: str) -> bool:
+    """
+    Compare per-stage API calls of the multi-call and structured prompts.
+
+    Returns:
+        True when structured output made fewer calls in total
+    """
+    print("="*70)
+    print(f"📞 COUNTING API CALLS PER STAGE ('{topic}', profile {profile})")
+    print("="*70)
+
+    config.LLM_CACHE_ENABLED = False
+    config.IMAGE_CACHE_ENABLED = False
+    before = count_calls(topic, False, profile)
+    after = count_calls(topic, True, profile)
+
+    print("\n" + "-"*70)
+    print(f"{'Stage':<32}{'Multi-call':>12}{'Structured':>12}")
+    print("-"*70)
+    for name in before["calls"]:
+        marker = "  ⭐" if name in STRUCTURED_AGENTS else ""
+        print(f"{name:<32}{before['calls'][name]:>12}{after['calls'].get(name, 0):>12}{marker}")
+    print("-"*70)
+    print(f"{'Total':<32}{before['total']:>12}{after['total']:>12}")
+    print(f"{'Seconds':<32}{before['duration']:>12.1f}{after['duration']:>12.1f}")
+    print(f"{'Quality':<32}{before['quality']:>12.1%}{after['quality']:>12.1%}")
+
+    ok = after["total"] < before["total"]
+    print(f"\n{'✅' if ok else '❌'} {before['total'] - after['total']} fewer calls with structured output")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("topic", nargs="?", default="Aztec Astronomy")
+    parser.add_argument("--profile", default="full", choices=list(config.EXECUTION_PROFILES))
+    args = parser.parse_args()
+    sys.exit(0 if benchmark_calls(args.topic, args.profile) else 1)
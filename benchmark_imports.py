@@ -0,0 +1,72 @@
+"""Report cold-start import time of the orchestrator (python -X importtime) and catch regressions."""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+# Entry points a cold start imports: the CLI/batch path and the Streamlit helpers
+MODULES = ["orchestrator", "tools.ai_docent", "tools.knowledge_graph", "tools.safe_3d_viz"]
+# Heavy packages only the functions that need them may import
+DEFERRED = ["google.generativeai", "networkx", "matplotlib", "plotly", "pandas", "requests", "numpy", "PIL"]
+BUDGET_MS = 300  # Cumulative import time of MODULES in a fresh interpreter
+
+def import_report(modules: List[str]) -> Dict:
+    """
+    Import modules in a fresh interpreter with -X importtime.
+
+    Returns:
+        {"total_ms", "modules": {name: cumulative_ms}, "loaded": [names in sys.modules afterwards]}
+    """
+    code = f"import sys; import {', '.join(modules)}; print(' '.join(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, check=True, cwd=Path(__file__).parent)
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package", nesting shown by indentation
+        parts = line.partition("import time:")[2].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        cumulative[parts[2].strip()] = int(parts[1]) / 1000
+    top_level = [name for name in cumulative if name in modules]
+    return {
+        "total_ms": sum(cumulative[name] for name in top_level),
+        "modules": cumulative,
+        "loaded": proc.stdout.split()
+    }
+
+def deferred_imports(loaded: List[str]) -> List[str]:
+    """DEFERRED packages that were imported anyway."""
+    return [name for name in DEFERRED if name in loaded]
+
+def benchmark_imports(modules: List[str], budget_ms: float, top: int = 15) -> bool:
+    print("="*70)
+    print(f"⏱️  BENCHMARKING IMPORT TIME ({', '.join(modules)})")
+    print("="*70)
+
+    report = import_report(modules)
+    slowest = sorted(report["modules"].items(), key=lambda item: item[1], reverse=True)[:top]
+
+    print("\n" + "-"*70)
+    print(f"{'Module (cumulative)':<55}{'ms':>15}")
+    print("-"*70)
+    for name, ms in slowest:
+        print(f"{name:<55}{ms:>15.1f}")
+
+    eager = deferred_imports(report["loaded"])
+    print(f"\n📦 Total: {report['total_ms']:.0f} ms (budget {budget_ms:.0f} ms)")
+    if eager:
+        print(f"❌ Imported at startup, should be deferred: {', '.join(eager)}")
+    if report["total_ms"] > budget_ms:
+        print("❌ Over budget")
+    ok = not eager and report["total_ms"] <= budget_ms
+    if ok:
+        print("✅ Cold start within budget")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    args = parser.parse_args()
+    sys.exit(0 if benchmark_imports(args.modules, args.budget_ms) else 1)
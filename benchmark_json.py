@@ -0,0 +1,85 @@
+"""Benchmark tolerant JSON extraction against find/rfind slicing on captured response samples."""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from utils.json_stream import extract_json_array, extract_json_object, iter_json_array
+
+SAMPLES_DIR = Path(__file__).parent / "tests" / "samples"
+CUTS = 50  # Truncation points per sample
+
+def naive_extract(text: str) -> Any:
+    """The slicing the agents used before: first opening to last closing bracket, then json.loads."""
+    start = min(i for i in (text.find("["), text.find("{"), len(text)) if i != -1)
+    closer = "]" if text[start:start + 1] == "[" else "}"
+    try:
+        return json.loads(text[start:text.rfind(closer) + 1])
+    except json.JSONDecodeError:
+        return None
+
+def tolerant_extract(text: str) -> Any:
+    """extract_json_array or extract_json_object, by whichever bracket opens first."""
+    array, obj = text.find("["), text.find("{")
+    if array != -1 and (obj == -1 or array < obj):
+        return extract_json_array(text)
+    return extract_json_object(text)
+
+def _size(value: Any) -> int:
+    """Complete elements recovered: list length, or the length of an object's largest list."""
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, dict):
+        return max([len(v) for v in value.values() if isinstance(v, list)] or [1 if value else 0])
+    return 0
+
+def _per_call_us(extract: Callable[[str], Any], text: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extract(text)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def benchmark_sample(name: str, text: str, repeat: int) -> Dict:
+    """Salvage rate over truncations, plus per-call and per-chunk cost on the whole text."""
+    full = _size(tolerant_extract(text))
+    cuts = [len(text) * (i + 1) // CUTS for i in range(CUTS)]
+    salvage: Dict[str, List[float]] = {"naive": [], "tolerant": []}
+    for cut in cuts:
+        for label, extract in (("naive", naive_extract), ("tolerant", tolerant_extract)):
+            salvage[label].append(_size(extract(text[:cut])) / full if full else 0.0)
+    chunks = [text[i:i + 16] for i in range(0, len(text), 16)]
+    return {
+        "name": name,
+        "naive_salvage": sum(salvage["naive"]) / CUTS,
+        "tolerant_salvage": sum(salvage["tolerant"]) / CUTS,
+        "naive_us": _per_call_us(naive_extract, text, repeat),
+        "tolerant_us": _per_call_us(tolerant_extract, text, repeat),
+        "stream_us": _per_call_us(lambda t: list(iter_json_array(chunks)), text, repeat)
+    }
+
+def benchmark_json(repeat: int) -> bool:
+    print("="*70)
+    print(f"🧩 BENCHMARKING JSON EXTRACTION ({SAMPLES_DIR})")
+    print("="*70)
+
+    rows = [benchmark_sample(path.stem, path.read_text(), repeat) for path in sorted(SAMPLES_DIR.glob("*.txt"))]
+
+    print("\n" + "-"*70)
+    print(f"{'Sample':<26}{'Salvaged (truncated)':>22}{'µs per call (whole)':>22}")
+    print(f"{'':<26}{'naive':>10}{'tolerant':>12}{'naive':>7}{'tolerant':>9}{'stream':>8}")
+    print("-"*70)
+    for row in rows:
+        print(f"{row['name']:<26}{row['naive_salvage']:>10.0%}{row['tolerant_salvage']:>12.0%}"
+              f"{row['naive_us']:>7.0f}{row['tolerant_us']:>9.0f}{row['stream_us']:>8.0f}")
+
+    ok = all(row["tolerant_salvage"] >= row["naive_salvage"] for row in rows)
+    print(f"\n{'✅' if ok else '❌'} Tolerant extraction salvages at least as much as slicing on every sample")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    sys.exit(0 if benchmark_json(args.repeat) else 1)
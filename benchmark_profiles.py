@@ -0,0 +1,45 @@
+"""Benchmark each execution profile against its latency and API-call budget (live Gemini calls)."""
+import argparse
+import sys
+
+import config
+from orchestrator import ExhibitionOrchestrator, resolve_profile
+
+def benchmark_profiles(topic: str, profiles, runs: int = 1) -> bool:
+    """
+    Generate topic with each profile and compare the worst run with the profile's budgets.
+
+    Returns:
+        True when every profile stayed within its budgets
+    """
+    print("="*70)
+    print(f"⏱️  BENCHMARKING EXECUTION PROFILES ('{topic}', {runs} run(s) each)")
+    print("="*70)
+
+    rows = []
+    for name in profiles:
+        profile = resolve_profile(name)
+        orchestrator = ExhibitionOrchestrator()
+        results = [orchestrator.generate_exhibition(topic, reuse=False, profile=name) for _ in range(runs)]
+        duration = max(r["duration"] for r in results)
+        api_calls = max(r["metrics"]["api_calls"] for r in results)
+        ok = duration <= profile["latency_budget_seconds"] and api_calls <= profile["api_call_budget"]
+        quality = min(r["metrics"]["overall_quality_score"] for r in results)
+        rows.append((name, duration, profile["latency_budget_seconds"], api_calls, profile["api_call_budget"],
+                     quality, ok))
+
+    print("\n" + "-"*70)
+    print(f"{'Profile':<12}{'Seconds':>10}{'Budget':>9}{'API calls':>12}{'Budget':>9}{'Quality':>10}")
+    print("-"*70)
+    for name, duration, latency_budget, api_calls, call_budget, quality, ok in rows:
+        print(f"{name:<12}{duration:>10.1f}{latency_budget:>9}{api_calls:>12}{call_budget:>9}{quality:>10.1%}"
+              f"  {'✅' if ok else '❌'}")
+    return all(row[-1] for row in rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("topic", nargs="?", default="Aztec Astronomy")
+    parser.add_argument("--profiles", nargs="+", default=list(config.EXECUTION_PROFILES))
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(0 if benchmark_profiles(args.topic, args.profiles, args.runs) else 1)
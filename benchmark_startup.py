@@ -0,0 +1,50 @@
+"""Benchmark the cost of starting a session: constructing the orchestrator and the AI docent."""
+import sys
+import time
+import tracemalloc
+
+def build_session():
+    """What app.py builds for every new Streamlit session."""
+    from orchestrator import ExhibitionOrchestrator
+    from tools.ai_docent import AIDocent
+    return ExhibitionOrchestrator(), AIDocent()
+
+def measure(sessions: int):
+    """Time and traced memory of the first session and of each later one."""
+    samples = []
+    keep = []  # Sessions stay alive, as they do in a Streamlit server
+    tracemalloc.start()
+    for _ in range(sessions):
+        before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        keep.append(build_session())
+        samples.append(((time.perf_counter() - started) * 1000,
+                        (tracemalloc.get_traced_memory()[0] - before) / 1024))
+    tracemalloc.stop()
+    return samples
+
+def benchmark_startup(sessions: int = 20):
+    print("="*70)
+    print(f"⏱️  BENCHMARKING SESSION STARTUP ({sessions} sessions)")
+    print("="*70)
+
+    started = time.perf_counter()
+    import orchestrator, tools.ai_docent  # noqa: F401
+    print(f"\n📦 Imports: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    samples = measure(sessions)
+    later = samples[1:] or samples
+    results = {
+        "first session (ms)": samples[0][0],
+        "first session (KiB)": samples[0][1],
+        "later session, median (ms)": sorted(s[0] for s in later)[len(later) // 2],
+        "later session, median (KiB)": sorted(s[1] for s in later)[len(later) // 2],
+    }
+
+    print("\n" + "-"*70)
+    for name, value in results.items():
+        print(f"{name:<40}{value:>15.1f}")
+    return results
+
+if __name__ == "__main__":
+    benchmark_startup(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
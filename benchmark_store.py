@@ -0,0 +1,103 @@
+"""Benchmark list, filter and search latency of the exhibitions store."""
+import itertools
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from utils.blob_store import BlobStore
+from utils.exhibition_store import ExhibitionRepository, _insert
+
+TOPICS = [f"Topic {i}" for i in range(500)]
+SYLLABLES = ["ka", "lo", "mi", "ten", "zu", "ra", "pe", "shi", "no", "qua", "tl", "xo",
+             "ba", "de", "fi", "gu", "ho", "ja", "ke", "li", "mo", "nu", "pa", "ri", "so", "ti", "vu", "we"]
+VOCABULARY = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]  # 21,952 words
+# Word frequencies follow Zipf's law, as in natural-language text
+ZIPF_WEIGHTS = list(itertools.accumulate(1 / rank ** 1.07 for rank in range(1, len(VOCABULARY) + 1)))
+
+def synthetic_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(VOCABULARY, cum_weights=ZIPF_WEIGHTS, k=words))
+
+def synthetic_exhibition(i: int) -> dict:
+    """A small exhibition with two rooms, three exhibits and an image placeholder."""
+    rng = random.Random(i)
+    return {
+        "topic": TOPICS[i % len(TOPICS)],
+        "title": f"Exhibition {i}",
+        "overview": "Synthetic exhibition for benchmarking. " * 5,
+        "curator_notes": synthetic_text(rng, 60),
+        "poster_image": {"status": "success", "image_base64": "x" * 2000},
+        "rooms": [
+            {"title": f"Room {r}", "theme": "Theme", "narrative": synthetic_text(rng, 30), "exhibits": [
+                {"name": f"Exhibit {i}-{r}-{e}", "description": synthetic_text(rng, 25),
+                 "facts": [synthetic_text(rng, 8), synthetic_text(rng, 8)]}
+                for e in range(2 if r == 0 else 1)
+            ]}
+            for r in range(2)
+        ]
+    }
+
+def populate(repository: ExhibitionRepository, count: int, batch_size: int = 1000):
+    """Insert count exhibitions in batched transactions."""
+    conn = repository._connection()
+    for start in range(0, count, batch_size):
+        with conn:
+            for i in range(start, min(start + batch_size, count)):
+                created_at = f"2025-01-01T00:00:{i:08d}"
+                _insert(conn, synthetic_exhibition(i), random.random(), created_at,
+                        blob_store=repository.blob_store)
+
+def timed(func, repeat: int = 20) -> float:
+    """Median latency of func in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+def benchmark_store(count: int):
+    """Populate a temporary store and report query latencies."""
+    print("="*70)
+    print(f"⏱️  BENCHMARKING EXHIBITION STORE ({count:,} exhibitions)")
+    print("="*70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = ExhibitionRepository(str(Path(tmp) / "exhibitions.db"), BlobStore(str(Path(tmp) / "blobs")))
+
+        started = time.perf_counter()
+        populate(repository, count)
+        print(f"\n📦 Populated in {time.perf_counter() - started:.1f}s")
+
+        conn = repository._connection()
+        results = {
+            "list_recent(10)": timed(lambda: repository.list_recent(10)),
+            "find_exhibitions(topic)": timed(lambda: repository.find_exhibitions(topic="topic 42")),
+            "find_exhibitions(min_score=0.99)": timed(lambda: repository.find_exhibitions(min_score=0.99)),
+            "get_exhibits(id)": timed(lambda: repository.get_exhibits(count // 2)),
+            "get(id)": timed(lambda: repository.get(count // 2)),
+            # Words by frequency rank in the synthetic corpus; rank 10 appears in most exhibitions
+            "search_exhibitions(rank 200 word)": timed(lambda: repository.search_exhibitions(VOCABULARY[200])),
+            "search_exhibitions(rank 50 + 500)": timed(
+                lambda: repository.search_exhibitions(f"{VOCABULARY[50]} {VOCABULARY[500]}")),
+            "search_exhibitions(topic)": timed(lambda: repository.search_exhibitions("topic 42")),
+            "search_exhibitions(rank 10 word)": timed(lambda: repository.search_exhibitions(VOCABULARY[10])),
+            # Same queries without indexes, as the single-table schema ran them
+            "unindexed list": timed(lambda: conn.execute(
+                "SELECT id FROM exhibitions NOT INDEXED ORDER BY created_at DESC LIMIT 10").fetchall(), repeat=5),
+            "unindexed topic filter": timed(lambda: conn.execute(
+                "SELECT id FROM exhibitions NOT INDEXED WHERE topic = ? COLLATE NOCASE "
+                "ORDER BY created_at DESC LIMIT 10", ("topic 42",)).fetchall(), repeat=5)
+        }
+        repository.close()
+
+    print("\n" + "-"*70)
+    print(f"{'Query':<40}{'Median (ms)':>15}")
+    print("-"*70)
+    for name, latency in results.items():
+        print(f"{name:<40}{latency:>15.3f}")
+
+    return results
+
+if __name__ == "__main__":
+    benchmark_store(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -1,7 +1,7 @@
 """Check what's stored in the SQLite database."""
 import sqlite3
-import json
 from pathlib import Path
+from utils.exhibition_store import ExhibitionRepository
 import config
 
 def check_database():
@@ -66,9 +66,8 @@ def check_database():
         print("MOST RECENT EXHIBITION (Detailed)")
         print("-"*70)
         
-        cursor.execute("SELECT data FROM exhibitions ORDER BY created_at DESC LIMIT 1")
-        data = cursor.fetchone()[0]
-        exhibition = json.loads(data)
+        cursor.execute("SELECT id FROM exhibitions ORDER BY created_at DESC LIMIT 1")
+        exhibition = ExhibitionRepository(db_path).get(cursor.fetchone()[0])
         
         print(f"\nTopic: {exhibition.get('topic')}")
         print(f"Title: {exhibition.get('title', 'N/A')}")
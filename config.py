@@ -11,7 +11,14 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 MODEL_NAME = "gemini-2.5-flash"  # Latest stable model with high quota
 TEMPERATURE = 0.8  # Increased for more creative outputs
 MAX_TOKENS = 8192
-REQUEST_DELAY = 1.0  # Delay between API calls to avoid rate limits
+
+# Rate Limiting (token buckets shared by all agents)
+REQUESTS_PER_MINUTE = 60  # Request quota for MODEL_NAME
+TOKENS_PER_MINUTE = 1_000_000  # Input token quota for MODEL_NAME
+RATE_LIMIT_STATE_FILE = None  # e.g. "data/rate_limit.json" to share quota across processes
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 2.0  # Seconds; backoff grows exponentially with full jitter
+RETRY_MAX_DELAY = 60.0
 
 # Agent Configuration
 MAX_RESEARCH_RESULTS = 15  # Increased for better research
@@ -21,11 +28,37 @@ MAX_REFINEMENT_LOOPS = 3  # Increased refinement attempts
 
 # Performance Mode
 FAST_MODE = False  # Disable fast mode - use all features
-SKIP_OPTIONAL_AGENTS = False  # Run all 14 agents
+SKIP_OPTIONAL_AGENTS = False  # Run all 14 agents (either flag makes "fast" the default profile)
+FAN_OUT_MAX_WORKERS = 4  # Concurrent per-room / per-exhibit calls within an agent
+STRUCTURED_OUTPUT = True  # One JSON-schema-constrained call per semantic/interactive/narrative agent
+BATCH_WORKERS = 2  # Exhibitions generated concurrently by run.py --batch
+BATCH_QUEUE_PATH = "data/batch_jobs.db"  # Persistent batch job queue
+BATCH_MAX_ATTEMPTS = 2  # Attempts per topic before a job is marked failed
+PROCESS_POOL_WORKERS = min(4, os.cpu_count() or 1)  # CPU-bound post-processing workers (0 = inline)
 
 # Storage Configuration
 DATABASE_PATH = "data/exhibitions.db"
+DB_STATEMENT_CACHE_SIZE = 128  # Prepared statements kept per pooled connection
+BLOB_STORE_DIR = "data/blobs"  # Generated image bytes, stored once per SHA-256 digest
+BLOB_GC_GRACE_SECONDS = 3600  # Unreferenced blobs younger than this are kept
+TOPIC_INDEX_PATH = "data/topic_index.npz"  # Persisted topic embeddings
+TOPIC_INDEX_DIM = 512  # Hashed embedding dimensions
+TOPIC_INDEX_TOPIC_WEIGHT = 3.0  # Weight of the topic relative to the overview
+TOPIC_REUSE_ENABLED = True  # Return a stored exhibition for a near-identical topic
+TOPIC_REUSE_THRESHOLD = 0.8  # Minimum cosine similarity to reuse
+TOPIC_REUSE_CANDIDATES = 5  # Matches checked for one generated with a complete enough profile
 CACHE_DIR = "data/cache"
+CACHE_BACKEND = "sqlite"  # "sqlite" (single indexed file) or "directory" (one .pkl per entry)
+CACHE_BATCH_SIZE = 64  # Buffered writes per SQLite transaction
+CACHE_FLUSH_INTERVAL = 1.0  # Seconds before buffered writes are flushed
+CACHE_COMPACTION_INTERVAL = 600  # Seconds between expired-row compactions
+CACHE_MAX_ENTRIES = 2000  # Memory tier LRU bound per cache
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # Approximate memory tier budget per cache
+CACHE_SWEEP_INTERVAL = 60  # Seconds between proactive expiry sweeps
+CACHE_STALE_TTL = 300  # Seconds an expired entry may be served while one caller refreshes it
+LLM_CACHE_DIR = "data/cache/llm"
+LLM_CACHE_ENABLED = True  # Reuse responses for identical model/prompt/generation config
+LLM_CACHE_TTL = 7 * 24 * 3600  # Seconds
 LOGS_DIR = "logs"
 EXHIBITIONS_DIR = "exhibitions"
 
@@ -44,3 +77,48 @@ IMAGE_GENERATION_SERVICE = "gemini"  # Options: "gemini", "imagen", "dalle", "st
 IMAGE_OUTPUT_DIR = "data/generated_images"
 IMAGE_QUALITY = "standard"  # Options: "standard", "hd"
 IMAGE_SIZE = "1792x1024"  # Landscape format for museum displays
+IMAGE_MODEL_NAME = "gemini-2.5-flash-image"  # Nano Banana
+IMAGE_MAX_WORKERS = 4  # Concurrent image generation calls per exhibition
+IMAGE_BUDGET_PER_EXHIBITION = 13  # Poster first, then rooms, then exhibits
+IMAGE_DEADLINE_SECONDS = 120  # Images not finished by then are skipped
+IMAGE_CACHE_ENABLED = True  # Reuse images for identical (normalized) prompts
+IMAGE_CACHE_PATH = "data/cache/images.db"
+IMAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Least recently used images are evicted beyond this
+IMAGE_RENDITIONS = {  # name: (max width, max height, format, quality), derived from the stored original
+    "thumb": (160, 120, "WEBP", 70),  # Sidebar and list previews
+    "card": (480, 360, "WEBP", 80),  # Exhibition page
+    "print": (1600, 1200, "JPEG", 85),  # PDF export
+}
+
+# Execution Profiles (pick per call: generate_exhibition(topic, profile="fast"), run.py --profile fast)
+OPTIONAL_STAGES = ["semantic_analyzer", "interactive_guide", "multimedia_curator", "accessibility", "image_generator"]
+EXECUTION_PROFILES = {
+    "fast": {
+        "stages": [],  # Optional stages that run
+        "max_refinement_loops": 0,
+        "image_budget": 0,
+        "pipeline_max_workers": 2,  # Timeline beside the design chain
+        "image_max_workers": 1,  # No images
+        "latency_budget_seconds": 60,  # Verified by benchmark_profiles.py
+        "api_call_budget": 8,  # With STRUCTURED_OUTPUT
+    },
+    "balanced": {
+        "stages": ["semantic_analyzer", "interactive_guide", "image_generator"],
+        "max_refinement_loops": 1,
+        "image_budget": 5,  # Poster and room entrances
+        "pipeline_max_workers": 3,  # Plus semantic analysis
+        "image_max_workers": 3,  # Five images in two rounds
+        "latency_budget_seconds": 120,
+        "api_call_budget": 16,
+    },
+    "full": {
+        "stages": OPTIONAL_STAGES,
+        "max_refinement_loops": MAX_REFINEMENT_LOOPS,
+        "image_budget": IMAGE_BUDGET_PER_EXHIBITION,
+        "pipeline_max_workers": 3,  # Widest point of the stage graph
+        "image_max_workers": 5,  # Thirteen images in three rounds
+        "latency_budget_seconds": 180,
+        "api_call_budget": 30,
+    },
+}
+DEFAULT_PROFILE = "fast" if FAST_MODE or SKIP_OPTIONAL_AGENTS else "full"
@@ -0,0 +1,23 @@
+"""Delete generated images no stored exhibition references."""
+import sys
+from utils.exhibition_store import get_exhibition_repository
+
+def gc_blobs(grace_seconds: float = None):
+    """Collect orphaned blobs and report what was freed."""
+    print("="*70)
+    print("🧹 COLLECTING ORPHANED IMAGE BLOBS")
+    print("="*70)
+
+    repository = get_exhibition_repository()
+    before = repository.blob_store.stats()
+    print(f"\n📍 Blob store: {repository.blob_store.root}")
+    print(f"📦 Before: {before['blobs']} blobs, {before['bytes'] / 1024:.1f} KB")
+
+    deleted = repository.collect_garbage(grace_seconds)
+    after = repository.blob_store.stats()
+
+    print(f"\n✅ Deleted {deleted} orphaned blobs ({(before['bytes'] - after['bytes']) / 1024:.1f} KB freed)")
+    print(f"📦 After: {after['blobs']} blobs, {after['bytes'] / 1024:.1f} KB")
+
+if __name__ == "__main__":
+    gc_blobs(float(sys.argv[1]) if len(sys.argv) > 1 else None)
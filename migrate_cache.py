@@ -0,0 +1,31 @@
+"""Import a pickle-per-file cache directory into the configured cache backend."""
+import sys
+from pathlib import Path
+from utils.cache_manager import CacheManager, migrate_directory_cache
+import config
+
+def migrate_cache(source_dir: str, target_dir: str):
+    """Copy unexpired .pkl entries from source_dir into a SQLite-backed cache at target_dir."""
+    print("="*70)
+    print("🗃️  MIGRATING CACHE")
+    print("="*70)
+
+    pkl_files = list(Path(source_dir).glob("*.pkl"))
+    print(f"\n📍 Source: {source_dir} ({len(pkl_files)} .pkl entries)")
+    print(f"📍 Target: {Path(target_dir) / 'cache.db'}")
+
+    target = CacheManager(target_dir, backend="sqlite")
+    if target_dir == config.LLM_CACHE_DIR:
+        target.cache_ttl = config.LLM_CACHE_TTL
+
+    imported = migrate_directory_cache(source_dir, target)
+    target.backend.close()
+
+    print(f"\n✅ Imported {imported} entries ({len(pkl_files) - imported} expired or unreadable skipped)")
+    print("\n💡 Once verified, the .pkl files can be deleted:")
+    print(f"   rm {source_dir}/*.pkl")
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else config.CACHE_DIR
+    target = sys.argv[2] if len(sys.argv) > 2 else source
+    migrate_cache(source, target)
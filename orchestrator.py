@@ -1,205 +1,555 @@
 """Main orchestrator for multi-agent exhibition generation."""
+import asyncio
+import copy
+import functools
+import importlib
+import queue
+import threading
 import time
-from typing import Dict, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
 
-from agents.topic_intake_agent import TopicIntakeAgent
-from agents.research_agent import ResearchAgent
-from agents.exhibit_generator_agent import ExhibitGeneratorAgent
-from agents.exhibition_designer_agent import ExhibitionDesignerAgent
-from agents.narrative_agent import NarrativeAgent
-from agents.visual_context_agent import VisualContextAgent
-from agents.evaluator_agent import EvaluatorAgent
-from agents.loop_agent import LoopAgent
-from agents.memory_bank_agent import MemoryBankAgent
-from agents.semantic_analyzer_agent import SemanticAnalyzerAgent
-from agents.interactive_guide_agent import InteractiveGuideAgent
-from agents.multimedia_curator_agent import MultimediaCuratorAgent
-from agents.accessibility_agent import AccessibilityAgent
-from agents.image_generator_agent import ImageGeneratorAgent
 from tools.timeline_generator import TimelineGenerator
 from utils.logger import get_logger
+from utils.scheduler import DAGScheduler, Stage
+from utils.rate_limiter import get_rate_limiter
+from utils.image_cache import get_image_cache
 import config
 
+# Agent attribute -> (module, class). Agents are imported and constructed on
+# first use, so a new orchestrator (one per Streamlit session) costs nothing
+# and agents a run skips are never built.
+AGENTS = {
+    "topic_intake": ("agents.topic_intake_agent", "TopicIntakeAgent"),
+    "research": ("agents.research_agent", "ResearchAgent"),
+    "exhibit_generator": ("agents.exhibit_generator_agent", "ExhibitGeneratorAgent"),
+    "exhibition_designer": ("agents.exhibition_designer_agent", "ExhibitionDesignerAgent"),
+    "narrative": ("agents.narrative_agent", "NarrativeAgent"),
+    "visual_context": ("agents.visual_context_agent", "VisualContextAgent"),
+    "evaluator": ("agents.evaluator_agent", "EvaluatorAgent"),
+    "loop": ("agents.loop_agent", "LoopAgent"),
+    "memory_bank": ("agents.memory_bank_agent", "MemoryBankAgent"),
+    # Advanced agents (NEW!)
+    "semantic_analyzer": ("agents.semantic_analyzer_agent", "SemanticAnalyzerAgent"),
+    "interactive_guide": ("agents.interactive_guide_agent", "InteractiveGuideAgent"),
+    "multimedia_curator": ("agents.multimedia_curator_agent", "MultimediaCuratorAgent"),
+    "accessibility": ("agents.accessibility_agent", "AccessibilityAgent"),
+    "image_generator": ("agents.image_generator_agent", "ImageGeneratorAgent"),
+}
+
+def resolve_profile(name: Optional[str] = None) -> Dict:
+    """
+    Settings of an execution profile (see config.EXECUTION_PROFILES).
+    
+    Args:
+        name: "fast", "balanced" or "full"; defaults to config.DEFAULT_PROFILE
+    """
+    name = name or config.DEFAULT_PROFILE
+    if name not in config.EXECUTION_PROFILES:
+        raise ValueError(f"Unknown execution profile '{name}'; expected one of {list(config.EXECUTION_PROFILES)}")
+    return {"name": name, **config.EXECUTION_PROFILES[name]}
+
+def profile_covers(stored: Optional[str], requested: Dict) -> bool:
+    """
+    Whether an exhibition generated with the stored profile has everything the requested one would produce.
+    
+    Exhibitions stored before profiles were recorded (stored is None) cover nothing.
+    """
+    settings = config.EXECUTION_PROFILES.get(stored) if stored else None
+    if settings is None:
+        return False
+    return (set(requested["stages"]) <= set(settings["stages"])
+            and settings["image_budget"] >= requested["image_budget"]
+            and settings["max_refinement_loops"] >= requested["max_refinement_loops"])
+
 class ExhibitionOrchestrator:
     """Orchestrates multi-agent workflow for exhibition generation."""
     
     def __init__(self):
         self.logger = get_logger()
-        
-        # Initialize core agents
-        self.topic_intake = TopicIntakeAgent()
-        self.research = ResearchAgent()
-        self.exhibit_generator = ExhibitGeneratorAgent()
-        self.exhibition_designer = ExhibitionDesignerAgent()
-        self.narrative = NarrativeAgent()
-        self.visual_context = VisualContextAgent()
-        self.evaluator = EvaluatorAgent()
-        self.loop = LoopAgent()
-        self.memory_bank = MemoryBankAgent()
-        
-        # Initialize advanced agents (NEW!)
-        self.semantic_analyzer = SemanticAnalyzerAgent()
-        self.interactive_guide = InteractiveGuideAgent()
-        self.multimedia_curator = MultimediaCuratorAgent()
-        self.accessibility = AccessibilityAgent()
-        self.image_generator = ImageGeneratorAgent()
+        self._agents_lock = threading.Lock()
         
         # Tools
         self.timeline_generator = TimelineGenerator()
         
-        self.agents = [
-            self.topic_intake,
-            self.research,
-            self.exhibit_generator,
-            self.exhibition_designer,
-            self.narrative,
-            self.visual_context,
-            self.evaluator,
-            self.loop,
-            self.memory_bank,
-            self.semantic_analyzer,
-            self.interactive_guide,
-            self.multimedia_curator,
-            self.accessibility,
-            self.image_generator
-        ]
+        self.last_schedule_report = {}
+    
+    def __getattr__(self, name: str):
+        """Import and construct an agent on first access."""
+        if name not in AGENTS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        with self._agents_lock:
+            agent = self.__dict__.get(name)
+            if agent is None:
+                module, cls = AGENTS[name]
+                agent = getattr(importlib.import_module(module), cls)()
+                setattr(self, name, agent)
+        return agent
     
-    def generate_exhibition(self, topic: str) -> Dict:
+    @property
+    def agents(self) -> List:
+        """Agents constructed so far, in pipeline order."""
+        return [self.__dict__[name] for name in AGENTS if name in self.__dict__]
+    
+    def generate_exhibition(self, topic: str, reuse: bool = True,
+                            on_event: Optional[Callable[[Dict], None]] = None,
+                            profile: Optional[str] = None) -> Dict:
         """
         Generate complete exhibition using multi-agent workflow.
         
         Args:
             topic: Exhibition topic
+            reuse: Return a stored exhibition on a near-identical topic instead of regenerating
+            on_event: Called with progress events as stages finish (see stream_exhibition)
+            profile: Execution profile deciding which optional stages run and the
+                refinement, image and concurrency budgets (default config.DEFAULT_PROFILE)
             
         Returns:
             Complete exhibition with metadata
         """
+        settings = resolve_profile(profile)
         start_time = time.time()
         
-        self.logger.logger.info(f"Starting exhibition generation for: {topic}")
+        if reuse:
+            reused = self._reuse_similar(topic, start_time, settings)
+            if reused:
+                return reused
         
-        # Step 1: Topic Intake (Sequential)
-        topic_data = self.topic_intake.execute(topic)
+        self.logger.logger.info(f"Starting exhibition generation for: {topic} ({settings['name']} profile)")
         
-        # Step 2: Research & Visual Context (Parallel)
-        research_data, visual_prep = self._parallel_research_phase(topic_data)
+        # Run the stage graph; independent stages overlap on the worker pool
+        calls_before = self.api_calls()
+        on_complete, on_exhibit = self._event_publisher(on_event, start_time)
+        scheduler = DAGScheduler(self._build_pipeline(on_exhibit=on_exhibit, profile=settings),
+                                 max_workers=settings["pipeline_max_workers"])
+        values = scheduler.run({"topic": topic}, on_complete=on_complete)
+        self.last_schedule_report = scheduler.last_report
         
-        # Step 3: Generate Exhibits (Sequential)
-        exhibits = self.exhibit_generator.execute(research_data)
+        return self._finish_generation(topic, values, time.time() - start_time,
+                                       settings, self.api_calls() - calls_before)
+    
+    def api_calls(self) -> int:
+        """Model requests made so far by this orchestrator's agents."""
+        return sum(agent.api_calls for agent in self.agents)
+    
+    def _finish_generation(self, topic: str, values: Dict, duration: float,
+                           profile: Dict, api_calls: int) -> Dict:
+        """Log completion, check the profile's budgets and package the pipeline outputs."""
+        final_exhibition = values["final_exhibition"]
+        evaluation = values["evaluation"]
+        storage_result = values["storage_result"]
         
-        # Step 4: Design Exhibition (Sequential)
-        exhibition_structure = self.exhibition_designer.execute({
-            "topic": topic_data.get("original_topic", topic),
-            "exhibits": exhibits,
-            "topic_data": topic_data
-        })
+        # Log completion
+        self.logger.log_exhibition_created(
+            topic,
+            str(storage_result.get("exhibition_id", "unknown"))
+        )
         
-        # Step 5: Add Narrative (Sequential)
-        exhibition_with_narrative = self.narrative.execute(exhibition_structure)
+        # Calculate metrics
+        metrics = self._calculate_metrics(evaluation, duration)
+        metrics["api_calls"] = api_calls
+        metrics["within_budget"] = (api_calls <= profile["api_call_budget"]
+                                    and duration <= profile["latency_budget_seconds"])
+        self.logger.log_metrics(metrics)
+        if not metrics["within_budget"]:
+            self.logger.logger.warning(
+                f"Exhibition over the {profile['name']} profile budget: {duration:.1f}s "
+                f"(budget {profile['latency_budget_seconds']}s), {api_calls} API calls "
+                f"(budget {profile['api_call_budget']})"
+            )
         
-        # Step 6: Enhance Visual Context (Sequential)
-        exhibition_with_visuals = self.visual_context.execute(exhibition_with_narrative)
+        return {
+            "exhibition": final_exhibition,
+            "evaluation": evaluation,
+            "metrics": metrics,
+            "exhibition_id": storage_result.get("exhibition_id"),
+            "duration": duration,
+            "schedule": self.last_schedule_report,
+            "profile": profile["name"]
+        }
+    
+    async def agenerate_exhibition(self, topic: str, reuse: bool = True,
+                                   on_event: Optional[Callable[[Dict], None]] = None,
+                                   profile: Optional[str] = None) -> Dict:
+        """
+        Asynchronous counterpart of generate_exhibition().
         
-        # Step 7: Generate Timeline
-        timeline = self.timeline_generator.generate_timeline(exhibits)
-        exhibition_with_visuals["timeline"] = timeline
+        Agents are awaited on the running event loop, so many exhibitions can be
+        generated concurrently without a thread per request.
         
-        # Step 8: Semantic Analysis (NEW!) - with error handling
-        try:
-            semantic_analysis = self.semantic_analyzer.execute({
-                "topic": topic_data.get("original_topic", topic),
-                "research_summary": research_data.get("research_summary", "")
-            })
-            exhibition_with_visuals["semantic_analysis"] = semantic_analysis
-        except Exception as e:
-            self.logger.logger.warning(f"Semantic analysis skipped: {str(e)}")
-            exhibition_with_visuals["semantic_analysis"] = {
-                "key_concepts": [],
-                "connections": [],
-                "thematic_insights": "Analysis unavailable",
-                "semantic_score": 0.5
-            }
+        Args:
+            topic: Exhibition topic
+            reuse: Return a stored exhibition on a near-identical topic instead of regenerating
+            on_event: Called with progress events as stages finish (see stream_exhibition)
+            profile: Execution profile (see generate_exhibition)
+            
+        Returns:
+            Complete exhibition with metadata
+        """
+        settings = resolve_profile(profile)
+        start_time = time.time()
         
-        # Step 9: Add Interactive Elements (NEW!) - with error handling
-        try:
-            exhibition_with_interactive = self.interactive_guide.execute(exhibition_with_visuals)
-        except Exception as e:
-            self.logger.logger.warning(f"Interactive elements skipped: {str(e)}")
-            exhibition_with_interactive = exhibition_with_visuals
-            exhibition_with_interactive["quiz"] = {"title": "Quiz unavailable", "questions": []}
-            exhibition_with_interactive["challenges"] = []
+        if reuse:
+            reused = await asyncio.to_thread(self._reuse_similar, topic, start_time, settings)
+            if reused:
+                return reused
+        
+        self.logger.logger.info(f"Starting async exhibition generation for: {topic} ({settings['name']} profile)")
+        
+        calls_before = self.api_calls()
+        on_complete, on_exhibit = self._event_publisher(on_event, start_time)
+        scheduler = DAGScheduler(self._build_pipeline(use_async=True, on_exhibit=on_exhibit, profile=settings),
+                                 max_workers=settings["pipeline_max_workers"])
+        values = await scheduler.arun({"topic": topic}, on_complete=on_complete)
+        self.last_schedule_report = scheduler.last_report
+        
+        return self._finish_generation(topic, values, time.time() - start_time,
+                                       settings, self.api_calls() - calls_before)
+    
+    def stream_exhibition(self, topic: str, reuse: bool = True,
+                          profile: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Generate an exhibition, yielding events as its stages finish.
         
-        # Step 10: Add Multimedia Recommendations (NEW!)
-        exhibition_with_multimedia = self.multimedia_curator.execute(exhibition_with_interactive)
+        Each event is a dict with "type", "data", "elapsed" (seconds since the
+        start) and, for per-item events, "index". Types in pipeline order:
+        topic, research, exhibit, room, curator_notes, narrative, timeline,
+        image, evaluation and finally complete, whose data is the same result
+        generate_exhibition() returns. Errors are raised from the iterator.
         
-        # Step 11: Add Accessibility Features (NEW!)
-        exhibition_with_accessibility = self.accessibility.execute(exhibition_with_multimedia)
+        Args:
+            topic: Exhibition topic
+            reuse: Return a stored exhibition on a near-identical topic instead of regenerating
+            profile: Execution profile (see generate_exhibition)
+        """
+        events = queue.Queue()
+        done = object()
+        
+        def produce():
+            try:
+                result = self.generate_exhibition(topic, reuse=reuse, on_event=events.put, profile=profile)
+                events.put({"type": "complete", "data": result, "elapsed": result["duration"]})
+            except BaseException as e:
+                events.put(e)
+            finally:
+                events.put(done)
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        while True:
+            event = events.get()
+            if event is done:
+                break
+            if isinstance(event, BaseException):
+                raise event
+            yield event
+        producer.join()
+    
+    async def astream_exhibition(self, topic: str, reuse: bool = True,
+                                 profile: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Async-iterator counterpart of stream_exhibition()."""
+        events = asyncio.Queue()
+        generation = asyncio.ensure_future(self.agenerate_exhibition(topic, reuse=reuse, on_event=events.put_nowait,
+                                                                     profile=profile))
+        generation.add_done_callback(lambda _: events.put_nowait(None))
         
-        # Step 12: Generate AI Images (NEW!)
         try:
-            exhibition_with_images = self.image_generator.execute({
-                "exhibition": exhibition_with_accessibility
-            })
-            final_exhibition_data = exhibition_with_images.get("exhibition", exhibition_with_accessibility)
-        except Exception as e:
-            self.logger.logger.warning(f"Image generation skipped: {str(e)}")
-            final_exhibition_data = exhibition_with_accessibility
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            result = generation.result()
+            yield {"type": "complete", "data": result, "elapsed": result["duration"]}
+        finally:
+            if not generation.done():
+                generation.cancel()
+    
+    def _event_publisher(self, on_event: Optional[Callable[[Dict], None]], start_time: float):
+        """
+        Callbacks translating pipeline progress into events.
         
-        # Step 13: Evaluate (Sequential)
-        evaluation = self.evaluator.execute(final_exhibition_data)
+        Returns:
+            (on_complete, on_exhibit): the scheduler callback for finished stages and the
+            exhibit generator callback for exhibits parsed mid-response; (None, None)
+            without on_event
+        """
+        if on_event is None:
+            return None, None
+        streamed = []
         
-        # Step 14: Refinement Loop (if needed)
-        final_exhibition = self._refinement_loop(final_exhibition_data, evaluation)
+        def emit(event: Dict):
+            event["elapsed"] = time.time() - start_time
+            on_event(event)
         
-        # Step 15: Store in Memory Bank
-        storage_result = self.memory_bank.execute({
-            "exhibition": final_exhibition,
-            "evaluation": evaluation
-        })
+        def on_exhibit(exhibit: Dict):
+            streamed.append(exhibit)
+            emit({"type": "exhibit", "index": len(streamed) - 1, "data": copy.deepcopy(exhibit)})
         
-        duration = time.time() - start_time
+        def on_complete(stage: Stage, value):
+            events = self._stage_events(stage.output, value)
+            if stage.output == "exhibits":
+                # Exhibits parsed while the response was streaming are already out
+                events = events[len(streamed):]
+            for event in events:
+                emit(event)
         
-        # Log completion
-        self.logger.log_exhibition_created(
-            topic,
-            str(storage_result.get("exhibition_id", "unknown"))
-        )
+        return on_complete, on_exhibit
+    
+    def _stage_events(self, output: str, value) -> List[Dict]:
+        """
+        Events for one finished stage output.
         
-        # Calculate metrics
+        Data is deep-copied because later stages keep enriching the same
+        exhibition dict while the consumer renders it.
+        """
+        value = copy.deepcopy(value)
+        if output == "topic_data":
+            return [{"type": "topic", "data": value}]
+        if output == "research_data":
+            return [{"type": "research", "data": value}]
+        if output == "exhibits":
+            return [{"type": "exhibit", "index": i, "data": exhibit} for i, exhibit in enumerate(value)]
+        if output == "exhibition_structure":
+            return [{"type": "room", "index": i, "data": room} for i, room in enumerate(value.get("rooms", []))]
+        if output == "exhibition_with_narrative":
+            events = [{"type": "curator_notes", "data": value.get("curator_notes", "")}]
+            events.extend({"type": "narrative", "index": i, "data": {"room": room.get("title", ""),
+                                                                    "narrative": room.get("narrative", "")}}
+                          for i, room in enumerate(value.get("rooms", [])))
+            return events
+        if output == "timeline":
+            return [{"type": "timeline", "data": value}]
+        if output == "exhibition_with_images":
+            return self._image_events(value)
+        if output == "evaluation":
+            return [{"type": "evaluation", "data": value}]
+        return []
+    
+    def _image_events(self, exhibition: Dict) -> List[Dict]:
+        """One image event per generated poster, room entrance and exhibit image."""
+        events = []
+        if exhibition.get("poster_image"):
+            events.append({"target": "poster", "title": exhibition.get("title", ""),
+                           "image": exhibition["poster_image"]})
+        for room in exhibition.get("rooms", []):
+            if room.get("entrance_image"):
+                events.append({"target": "room", "title": room.get("title", ""), "image": room["entrance_image"]})
+            for exhibit in room.get("exhibits", []):
+                if exhibit.get("generated_image"):
+                    events.append({"target": "exhibit", "title": exhibit.get("name", ""),
+                                   "image": exhibit["generated_image"]})
+        return [{"type": "image", "index": i, "data": data} for i, data in enumerate(events)]
+    
+    def _reuse_similar(self, topic: str, start_time: float, profile: Dict) -> Optional[Dict]:
+        """
+        Look up a stored exhibition whose topic is semantically near-identical
+        and whose profile covers the requested one (see profile_covers).
+        
+        Returns:
+            A result shaped like generate_exhibition()'s, or None to generate
+        """
+        if not config.TOPIC_REUSE_ENABLED:
+            return None
+        
+        from utils.topic_index import get_topic_index, topic_similarity
+        for exhibition_id, similarity in get_topic_index().similar(topic, limit=config.TOPIC_REUSE_CANDIDATES):
+            summary = self.memory_bank.repository.get_summary(exhibition_id)
+            # Re-score the stored topic itself, in case the index is out of step with the database
+            if (summary and profile_covers(summary["profile"], profile)
+                    and topic_similarity(topic, summary["topic"] or "") >= config.TOPIC_REUSE_THRESHOLD):
+                break
+        else:
+            return None
+        exhibition = self.memory_bank.retrieve_exhibition(exhibition_id)
+        if not exhibition:
+            return None
+        
+        self.logger.logger.info(
+            f"Reusing {summary['profile']} exhibition {exhibition_id} ('{summary['topic']}') for '{topic}' "
+            f"(similarity {similarity:.2f})"
+        )
+        quality_score = summary["quality_score"] or 0.0
+        evaluation = {
+            "overall_score": quality_score,
+            "meets_threshold": quality_score >= config.MIN_QUALITY_SCORE
+        }
+        duration = time.time() - start_time
         metrics = self._calculate_metrics(evaluation, duration)
-        self.logger.log_metrics(metrics)
+        metrics["api_calls"] = 0
+        metrics["within_budget"] = duration <= profile["latency_budget_seconds"]
         
         return {
-            "exhibition": final_exhibition,
+            "exhibition": exhibition,
             "evaluation": evaluation,
             "metrics": metrics,
-            "exhibition_id": storage_result.get("exhibition_id"),
-            "duration": duration
+            "exhibition_id": exhibition_id,
+            "duration": duration,
+            "schedule": {},
+            "profile": summary["profile"],
+            "reused_from": {
+                "exhibition_id": exhibition_id,
+                "topic": summary["topic"],
+                "requested_topic": topic,
+                "similarity": similarity
+            }
         }
     
-    def _parallel_research_phase(self, topic_data: Dict) -> tuple:
-        """Execute research and visual prep in parallel."""
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            # Submit parallel tasks
-            research_future = executor.submit(self.research.execute, topic_data)
-            visual_future = executor.submit(lambda: {"status": "prepared"})
-            
-            # Wait for completion
-            research_data = research_future.result()
-            visual_prep = visual_future.result()
+    def _build_pipeline(self, use_async: bool = False,
+                        on_exhibit: Optional[Callable[[Dict], None]] = None,
+                        profile: Optional[Dict] = None) -> List[Stage]:
+        """
+        Declare the generation workflow as stages with named inputs and outputs.
         
-        return research_data, visual_prep
+        Args:
+            on_exhibit: Receives each exhibit as soon as the generator has parsed it
+            profile: Resolved execution profile; optional stages it leaves out pass
+                their input through (or a placeholder) without running their agent
+        """
+        profile = profile or resolve_profile()
+        exhibit_input = (lambda research_data: {**research_data, "on_exhibit": on_exhibit}) if on_exhibit else None
+        refinement = self._arefinement_loop if use_async else self._refinement_loop
+        
+        def stage(name, inputs, output, prepare=None, finish=None, fallback=None, skip=None):
+            if name in config.OPTIONAL_STAGES and name not in profile["stages"]:
+                skip = skip or (lambda **values: values[inputs[0]])
+                return Stage(name, skip, inputs, output)
+            return self._agent_stage(name, inputs, output, use_async, prepare, finish, fallback)
+        
+        return [
+            stage("topic_intake", ["topic"], "topic_data"),
+            stage("research", ["topic_data"], "research_data"),
+            stage("exhibit_generator", ["research_data"], "exhibits", prepare=exhibit_input),
+            stage("exhibition_designer", ["topic", "topic_data", "exhibits"],
+                  "exhibition_structure", prepare=self._design_input),
+            stage("narrative", ["exhibition_structure"], "exhibition_with_narrative"),
+            stage("visual_context", ["exhibition_with_narrative"], "exhibition_with_visuals"),
+            Stage("timeline", self.timeline_generator.generate_timeline, ["exhibits"], "timeline"),
+            stage("semantic_analyzer", ["topic", "topic_data", "research_data"],
+                  "semantic_analysis", prepare=self._semantic_input, fallback=self._semantic_fallback,
+                  skip=lambda **values: self._no_semantic_analysis()),
+            stage("interactive_guide", ["exhibition_with_visuals"],
+                  "exhibition_with_interactive", fallback=self._interactive_fallback),
+            stage("multimedia_curator", ["exhibition_with_interactive"], "exhibition_with_multimedia"),
+            stage("accessibility", ["exhibition_with_multimedia"], "exhibition_with_accessibility"),
+            stage("image_generator", ["exhibition_with_accessibility"],
+                  "exhibition_with_images", prepare=functools.partial(self._image_input, profile=profile),
+                  finish=self._image_output, fallback=self._image_fallback),
+            Stage("assemble", self._assemble_stage,
+                  ["exhibition_with_images", "timeline", "semantic_analysis"], "final_exhibition_data"),
+            stage("evaluator", ["final_exhibition_data"], "evaluation"),
+            Stage("refinement", functools.partial(refinement, max_loops=profile["max_refinement_loops"]),
+                  ["final_exhibition_data", "evaluation"], "final_exhibition"),
+            stage("memory_bank", ["final_exhibition", "evaluation"], "storage_result",
+                  prepare=functools.partial(self._store_input, profile=profile))
+        ]
+    
+    def _agent_stage(self, name: str, inputs: List[str], output: str, use_async: bool,
+                     prepare=None, finish=None, fallback=None) -> Stage:
+        """
+        Wrap the agent of the same name as a pipeline stage.
+        
+        The agent is looked up when the stage runs, so stages that never
+        run never construct their agent.
+        
+        Args:
+            prepare: Builds the agent input from the stage inputs (defaults to the single input)
+            finish: Maps the agent result to the stage output (defaults to the result itself)
+        """
+        prepare = prepare or (lambda **values: values[inputs[0]])
+        finish = finish or (lambda result, **values: result)
+        
+        if use_async:
+            async def run(**values):
+                return finish(await getattr(self, name).aexecute(prepare(**values)), **values)
+        else:
+            def run(**values):
+                return finish(getattr(self, name).execute(prepare(**values)), **values)
+        
+        return Stage(name, run, inputs, output, fallback)
+    
+    def _design_input(self, topic: str, topic_data: Dict, exhibits: List[Dict]) -> Dict:
+        """Designer input: topic, exhibits and enriched topic data."""
+        return {
+            "topic": topic_data.get("original_topic", topic),
+            "exhibits": exhibits,
+            "topic_data": topic_data
+        }
+    
+    def _semantic_input(self, topic: str, topic_data: Dict, research_data: Dict) -> Dict:
+        """Semantic analysis only needs the research summary."""
+        return {
+            "topic": topic_data.get("original_topic", topic),
+            "research_summary": research_data.get("research_summary", "")
+        }
     
-    def _refinement_loop(self, exhibition: Dict, evaluation: Dict) -> Dict:
-        """Refine exhibition if quality below threshold."""
-        current_exhibition = exhibition
+    def _semantic_fallback(self, error: Exception, **inputs) -> Dict:
+        """Placeholder analysis used when semantic analysis fails."""
+        self.logger.logger.warning(f"Semantic analysis skipped: {str(error)}")
+        return self._no_semantic_analysis()
+    
+    def _no_semantic_analysis(self) -> Dict:
+        """Placeholder analysis for runs without the semantic analyzer."""
+        return {
+            "key_concepts": [],
+            "connections": [],
+            "thematic_insights": "Analysis unavailable",
+            "semantic_score": 0.5
+        }
+    
+    def _interactive_fallback(self, error: Exception, exhibition_with_visuals: Dict) -> Dict:
+        """Continue without interactive elements."""
+        self.logger.logger.warning(f"Interactive elements skipped: {str(error)}")
+        exhibition = exhibition_with_visuals
+        exhibition["quiz"] = {"title": "Quiz unavailable", "questions": []}
+        exhibition["challenges"] = []
+        return exhibition
+    
+    def _image_input(self, exhibition_with_accessibility: Dict, profile: Dict) -> Dict:
+        """Image generator input, with the profile's image budget and concurrency."""
+        return {
+            "exhibition": exhibition_with_accessibility,
+            "budget": profile["image_budget"],
+            "max_workers": profile["image_max_workers"]
+        }
+    
+    def _image_output(self, result: Dict, exhibition_with_accessibility: Dict) -> Dict:
+        """Unwrap the illustrated exhibition."""
+        return result.get("exhibition", exhibition_with_accessibility)
+    
+    def _image_fallback(self, error: Exception, exhibition_with_accessibility: Dict) -> Dict:
+        """Continue without generated images."""
+        self.logger.logger.warning(f"Image generation skipped: {str(error)}")
+        return exhibition_with_accessibility
+    
+    def _assemble_stage(self, exhibition_with_images: Dict, timeline: List[Dict],
+                        semantic_analysis: Dict) -> Dict:
+        """Attach the independently computed timeline and semantic analysis."""
+        exhibition = exhibition_with_images
+        exhibition["timeline"] = timeline
+        exhibition["semantic_analysis"] = semantic_analysis
+        return exhibition
+    
+    def _store_input(self, final_exhibition: Dict, evaluation: Dict, profile: Dict) -> Dict:
+        """Memory bank input."""
+        return {
+            "exhibition": final_exhibition,
+            "evaluation": evaluation,
+            "profile": profile["name"]
+        }
+    
+    def get_critical_path_report(self) -> Dict:
+        """Per-stage timings and critical path of the most recent generation."""
+        return self.last_schedule_report
+    
+    def _refinement_loop(self, final_exhibition_data: Dict, evaluation: Dict, max_loops: int) -> Dict:
+        """Refine exhibition if quality below threshold, at most max_loops times."""
+        current_exhibition = final_exhibition_data
         current_evaluation = evaluation
         loops = 0
         
         # More aggressive refinement threshold
         while (current_evaluation.get("overall_score", 0) < 0.80 
-               and loops < config.MAX_REFINEMENT_LOOPS):
+               and loops < max_loops):
             
             self.logger.logger.info(f"Refinement loop {loops + 1}")
             
@@ -220,11 +570,37 @@ class ExhibitionOrchestrator:
         
         return current_exhibition
     
+    async def _arefinement_loop(self, final_exhibition_data: Dict, evaluation: Dict, max_loops: int) -> Dict:
+        """Async counterpart of _refinement_loop."""
+        current_exhibition = final_exhibition_data
+        current_evaluation = evaluation
+        loops = 0
+        
+        while (current_evaluation.get("overall_score", 0) < 0.80 
+               and loops < max_loops):
+            
+            self.logger.logger.info(f"Refinement loop {loops + 1}")
+            
+            loop_result = await self.loop.aexecute({
+                "exhibition": current_exhibition,
+                "evaluation": current_evaluation
+            })
+            
+            if not loop_result.get("refined", False):
+                break
+            
+            current_exhibition = loop_result["exhibition"]
+            current_evaluation = await self.evaluator.aexecute(current_exhibition)
+            loops += 1
+        
+        return current_exhibition
+    
     def _calculate_metrics(self, evaluation: Dict, duration: float) -> Dict:
         """Calculate overall system metrics."""
         # Agent success rates
         agent_stats = [agent.get_stats() for agent in self.agents]
-        total_success_rate = sum(s["success_rate"] for s in agent_stats) / len(agent_stats)
+        total_success_rate = (sum(s["success_rate"] for s in agent_stats) / len(agent_stats)
+                              if agent_stats else 0.0)
         
         return {
             "overall_quality_score": evaluation.get("overall_score", 0.0),
@@ -249,7 +625,10 @@ class ExhibitionOrchestrator:
             "overall_success_rate": overall_success_rate,
             "total_executions": total_executions,
             "total_successes": total_successes,
+            "total_api_calls": sum(s["api_calls"] for s in agent_stats),
             "agent_stats": agent_stats,
             "target_success_rate": config.TARGET_SUCCESS_RATE,
-            "meets_target": overall_success_rate >= config.TARGET_SUCCESS_RATE
+            "meets_target": overall_success_rate >= config.TARGET_SUCCESS_RATE,
+            "rate_limiter": get_rate_limiter().stats(),
+            "image_cache": get_image_cache().stats()
         }
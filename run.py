@@ -1,26 +1,132 @@
 """Simple CLI runner for testing the system."""
 import sys
 from orchestrator import ExhibitionOrchestrator
+import config
 import json
 
+def print_event(event: dict):
+    """Print one streamed section as soon as it arrives."""
+    kind = event["type"]
+    data = event["data"]
+    stamp = f"[{event['elapsed']:6.1f}s]"
+    
+    if kind == "topic":
+        print(f"{stamp} 📋 {data.get('title', '')} ({data.get('category', '')}, {data.get('time_period', '')})")
+    elif kind == "research":
+        print(f"{stamp} 🔍 Research complete")
+    elif kind == "exhibit":
+        print(f"{stamp} 🏺 Exhibit {event['index'] + 1}: {data.get('name', 'Untitled')}")
+    elif kind == "room":
+        print(f"{stamp} 🚪 Room {event['index'] + 1}: {data.get('title', 'Untitled')} "
+              f"({len(data.get('exhibits', []))} exhibits)")
+    elif kind == "curator_notes":
+        print(f"{stamp} ✍️  Curator's notes: {data[:120]}...")
+    elif kind == "narrative":
+        print(f"{stamp} 📖 {data['room']}: {data['narrative'][:100]}...")
+    elif kind == "timeline":
+        print(f"{stamp} 📅 Timeline: {len(data)} events")
+    elif kind == "image":
+        print(f"{stamp} 🎨 Image for {data['target']} '{data['title']}': {data['image'].get('status', 'unknown')}")
+    elif kind == "evaluation":
+        print(f"{stamp} ⭐ Quality score: {data.get('overall_score', 0):.1%}")
+
+def run_batch(topics_file: str, workers: int = None, profile: str = None):
+    """Queue every topic in topics_file and generate them, resuming any earlier run."""
+    from batch_runner import BatchRunner
+    from utils.job_queue import JobQueue
+    
+    with open(topics_file, encoding='utf-8') as f:
+        topics = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    
+    queue = JobQueue()
+    added = queue.enqueue(topics)
+    counts = queue.counts()
+    
+    print(f"\n🏛️  AI Museum Curator - Batch Mode")
+    print(f"{'=' * 60}")
+    print(f"Topics file: {topics_file} ({len(topics)} topics, {added} newly queued)")
+    print(f"Queue: {queue.db_path} ({counts['pending'] + counts['running']} to do, "
+          f"{counts['done']} done, {counts['failed']} failed)")
+    print(f"{'=' * 60}\n")
+    
+    def report(job: dict):
+        if job['status'] == 'done':
+            source = "♻️  reused" if job['reused'] else f"{job['quality_score']:.0%} quality"
+            print(f"✅ [{job['id']}] {job['topic']} → exhibition {job['exhibition_id']} "
+                  f"({source}, {job['api_calls']} API calls, {job['duration']:.1f}s)")
+        else:
+            icon = "🔁" if job['status'] == 'retrying' else "❌"
+            print(f"{icon} [{job['id']}] {job['topic']} (attempt {job['attempts']}): {job['error']}")
+    
+    summary = BatchRunner(queue, workers, profile).run(on_job=report)
+    
+    print(f"\n{'=' * 60}")
+    print("BATCH SUMMARY")
+    print(f"{'=' * 60}")
+    print(f"Completed: {summary['completed']} ({summary['reused']} reused)")
+    print(f"Failed: {summary['failed']} (plus {summary['retried']} retried attempts)")
+    print(f"Workers: {summary['workers']} ({summary['profile']} profile)")
+    print(f"Wall Time: {summary['wall_time']:.1f}s")
+    print(f"Throughput: {summary['exhibitions_per_hour']:.1f} exhibitions/hour")
+    print(f"API Calls per Exhibition: {summary['api_calls_per_exhibition']:.1f}")
+    print(f"Rate Limit Wait: {summary['rate_limit_wait_seconds']:.1f}s")
+    print(f"Cache Hit Rate: {summary['cache_hit_rate']:.1%}")
+    print(f"Queue: {summary['queue']['done']} done, {summary['queue']['failed']} failed, "
+          f"{summary['queue']['pending']} pending")
+    
+    if summary['queue']['failed']:
+        sys.exit(1)
+
 def main():
     """Run exhibition generation from command line."""
-    if len(sys.argv) < 2:
-        print("Usage: python run.py <topic>")
-        print("Example: python run.py 'Aztec Astronomy'")
+    args = sys.argv[1:]
+    profile = None
+    if "--profile" in args:
+        i = args.index("--profile")
+        profile = args[i + 1] if i + 1 < len(args) else None
+        args = args[:i] + args[i + 2:]
+        if profile not in config.EXECUTION_PROFILES:
+            print(f"Unknown profile. Choose one of: {', '.join(config.EXECUTION_PROFILES)}")
+            sys.exit(1)
+    
+    if "--batch" in args:
+        try:
+            topics_file = args[args.index("--batch") + 1]
+            workers = int(args[args.index("--workers") + 1]) if "--workers" in args else None
+        except (IndexError, ValueError):
+            print("Usage: python run.py --batch <topics.txt> [--workers N] [--profile fast|balanced|full]")
+            sys.exit(1)
+        run_batch(topics_file, workers, profile)
+        return
+    
+    stream = "--stream" in args
+    args = [arg for arg in args if arg != "--stream"]
+    if not args:
+        print("Usage: python run.py [--stream] [--profile fast|balanced|full] <topic>")
+        print("       python run.py --batch <topics.txt> [--workers N] [--profile fast|balanced|full]")
+        print("Example: python run.py --stream --profile fast 'Aztec Astronomy'")
         sys.exit(1)
     
-    topic = " ".join(sys.argv[1:])
+    topic = " ".join(args)
     
     print(f"\n🏛️  AI Museum Curator")
     print(f"{'=' * 60}")
     print(f"Generating exhibition for: {topic}")
+    print(f"Profile: {profile or config.DEFAULT_PROFILE}")
     print(f"{'=' * 60}\n")
     
     orchestrator = ExhibitionOrchestrator()
     
     try:
-        result = orchestrator.generate_exhibition(topic)
+        if stream:
+            result = None
+            for event in orchestrator.stream_exhibition(topic, profile=profile):
+                if event["type"] == "complete":
+                    result = event["data"]
+                else:
+                    print_event(event)
+        else:
+            result = orchestrator.generate_exhibition(topic, profile=profile)
         
         print("\n✅ Exhibition Generated Successfully!\n")
         print(f"{'=' * 60}")
@@ -34,6 +140,8 @@ def main():
         print(f"Factual Quality: {metrics['factual_quality']:.1%}")
         print(f"Cultural Sensitivity: {metrics['cultural_sensitivity']:.1%}")
         print(f"Duration: {metrics['total_duration_seconds']:.2f}s")
+        if 'api_calls' in metrics:
+            print(f"API Calls: {metrics['api_calls']}")
         
         print(f"\n{'=' * 60}")
         print("EXHIBITION")
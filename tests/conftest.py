@@ -0,0 +1,174 @@
+"""Shared test fixtures, including an in-process fake Gemini model."""
+import asyncio
+import json
+import threading
+import time
+import pytest
+import google.generativeai as genai
+import config
+from utils import rate_limiter, cache_manager, gemini_client, logger
+
+FAKE_EXHIBITS = [
+    {
+        "name": f"Artifact {i}",
+        "description": f"Artifact {i} was carved in {1400 + i * 10} CE and used in ceremonies.",
+        "time_period": f"{1400 + i * 10} CE",
+        "cultural_significance": "Shows how observation shaped daily life.",
+        "facts": [f"Fact {i}a", f"Fact {i}b"],
+        "visual_refs": ["Stone carving"],
+        "tags": ["astronomy"]
+    }
+    for i in range(8)
+]
+
+def fake_reply(prompt: str) -> str:
+    """Return a canned response shaped like the one each agent expects."""
+    if "thematic_insights:" in prompt:
+        return json.dumps({
+            "connections": [{"type": "historical", "connection": "Calendars", "significance": "Timekeeping"},
+                            {"type": "cultural", "connection": "Rituals", "significance": "Ceremony"}],
+            "key_concepts": ["Calendars", "Rituals", "Observation"],
+            "thematic_insights": "The sky ordered daily life."
+        })
+    if "- quiz:" in prompt:
+        question = {"question": "What did they see?", "purpose": "Observation", "hint": "Look up"}
+        return json.dumps({
+            "rooms": [{"title": f"Gallery {i}", "questions": [question]} for i in range(1, 5)],
+            "quiz": {"title": "Quiz", "questions": [
+                {"question": "Q1", "options": ["A", "B", "C", "D"], "correct": 0, "explanation": "E"}
+            ]}
+        })
+    if "room_narratives:" in prompt:
+        return json.dumps({
+            "curator_notes": " ".join(["word"] * 250),
+            "room_narratives": [{"title": f"Gallery {i}", "narrative": f"Step into gallery {i}."}
+                                for i in range(1, 5)]
+        })
+    if "structured analysis" in prompt:
+        return ("TITLE: Skywatchers\nCATEGORY: Scientific\nTIME_PERIOD: 1300-1521 CE\n"
+                "OVERVIEW: How a civilization read the heavens.")
+    if "search queries" in prompt:
+        return "history of the topic\ncultural role\nkey artifacts\ntimeline\nmodern relevance"
+    if "museum exhibits" in prompt:
+        return json.dumps(FAKE_EXHIBITS)
+    if "themed rooms" in prompt:
+        return "\n\n".join(
+            f"ROOM {i}: Gallery {i}\nTHEME: Theme {i}\nDESCRIPTION: Room {i} description."
+            for i in range(1, 5)
+        )
+    if "questions about" in prompt:
+        return "What did they see?|Observation|Look up\nWhy did it matter?|Meaning|Think about calendars"
+    if "multiple choice quiz" in prompt:
+        return json.dumps({"title": "Quiz", "questions": [
+            {"question": "Q1", "options": ["A", "B", "C", "D"], "correct": 0, "explanation": "E"}
+        ]})
+    if "key connections" in prompt:
+        return "historical|Calendars|Timekeeping\ncultural|Rituals|Ceremony"
+    if "curator's notes" in prompt:
+        return " ".join(["word"] * 250)
+    return "Generated text about the exhibition."
+
+
+class FakeResponse:
+    """Minimal stand-in for a Gemini response."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.parts = []
+
+
+def fake_chunks(text: str, size: int) -> list:
+    return [FakeResponse(text[i:i + size]) for i in range(0, len(text), size)]
+
+
+class FakeStream:
+    """Streamed response: iterable chunks, sleeping chunk_latency before each."""
+
+    def __init__(self, chunks: list, chunk_latency: float):
+        self.chunks = chunks
+        self.chunk_latency = chunk_latency
+        self.usage_metadata = None
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            time.sleep(self.chunk_latency)
+            yield chunk
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.chunk_latency)
+            yield chunk
+
+
+class FakeGemini:
+    """Records calls made through fake GenerativeModel instances."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.chunk_size = 64
+        self.chunk_latency = 0.0
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def model(self, model_name: str = None, **kwargs):
+        return FakeGenerativeModel(self, model_name)
+
+    def record(self, model_name: str, prompt: str, mode: str):
+        with self.lock:
+            self.calls.append({"model": model_name, "prompt": prompt, "mode": mode})
+
+    def count(self, mode: str = None, model: str = None) -> int:
+        return len([c for c in self.calls
+                    if (mode is None or c["mode"] == mode) and (model is None or c["model"] == model)])
+
+
+class FakeGenerativeModel:
+    """In-process replacement for genai.GenerativeModel."""
+
+    def __init__(self, fake: FakeGemini, model_name: str):
+        self.fake = fake
+        self.model_name = model_name
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        self.fake.record(self.model_name, prompt, "sync")
+        time.sleep(self.fake.latency)
+        if stream:
+            return FakeStream(fake_chunks(fake_reply(prompt), self.fake.chunk_size), self.fake.chunk_latency)
+        return FakeResponse(fake_reply(prompt))
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False, **kwargs):
+        self.fake.record(self.model_name, prompt, "async")
+        await asyncio.sleep(self.fake.latency)
+        if stream:
+            return FakeStream(fake_chunks(fake_reply(prompt), self.fake.chunk_size), self.fake.chunk_latency)
+        return FakeResponse(fake_reply(prompt))
+
+
+@pytest.fixture(autouse=True)
+def isolated_storage(monkeypatch, tmp_path):
+    """Point every data, cache and log path at tmp_path so no test writes to data/ or logs/."""
+    monkeypatch.setattr(config, "LOGS_DIR", str(tmp_path / "logs"))
+    monkeypatch.setattr(logger, "_logger_instance", None)
+    monkeypatch.setattr(config, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(cache_manager, "_cache_instance", None)
+    monkeypatch.setattr(config, "LLM_CACHE_DIR", str(tmp_path / "llm_cache"))
+    monkeypatch.setattr(cache_manager, "_response_cache_instance", None)
+    monkeypatch.setattr(config, "DATABASE_PATH", str(tmp_path / "exhibitions.db"))
+    monkeypatch.setattr(config, "EXHIBITIONS_DIR", str(tmp_path / "exhibitions"))
+    monkeypatch.setattr(config, "BLOB_STORE_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setattr(config, "TOPIC_INDEX_PATH", str(tmp_path / "topic_index.npz"))
+    monkeypatch.setattr(config, "IMAGE_CACHE_PATH", str(tmp_path / "images.db"))
+    monkeypatch.setattr(config, "IMAGE_OUTPUT_DIR", str(tmp_path / "generated_images"))
+    monkeypatch.setattr(config, "BATCH_QUEUE_PATH", str(tmp_path / "batch_jobs.db"))
+    monkeypatch.setattr(config, "RATE_LIMIT_STATE_FILE", None)
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """Replace Gemini with an in-process fake (storage is isolated by isolated_storage)."""
+    fake = FakeGemini()
+    monkeypatch.setattr(genai, "GenerativeModel", fake.model)
+    monkeypatch.setattr(genai, "configure", lambda **kwargs: None)
+    monkeypatch.setattr(gemini_client, "_registry_instance", None)
+    monkeypatch.setattr(rate_limiter, "_limiter_instance", rate_limiter.RateLimiter(100000, 10 ** 9))
+    return fake
@@ -0,0 +1,64 @@
+"""Tests for the persistent job queue and batch runner."""
+from batch_runner import BatchRunner
+from utils.job_queue import JobQueue
+from utils.exhibition_store import get_exhibition_repository
+
+TOPICS = ["Aztec Astronomy", "Roman Aqueducts", "Ming Dynasty Porcelain"]
+
+def test_enqueue_is_idempotent_and_claims_in_order(tmp_path):
+    """Re-queueing a topics file only adds new topics; jobs are claimed oldest first."""
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+
+    assert queue.enqueue(TOPICS[:2]) == 2
+    assert queue.enqueue(TOPICS + ["  ", ""]) == 1
+    assert [queue.claim()["topic"] for _ in TOPICS] == TOPICS
+    assert queue.claim() is None
+    assert queue.counts()["running"] == 3
+
+def test_failed_jobs_retry_until_max_attempts(tmp_path):
+    """A failure returns the job to pending until its attempts are used up."""
+    queue = JobQueue(str(tmp_path / "jobs.db"), max_attempts=2)
+    queue.enqueue(["Aztec Astronomy"])
+
+    queue.fail(queue.claim()["id"], "timeout")
+    assert queue.counts()["pending"] == 1
+
+    job = queue.claim()
+    assert job["attempts"] == 2
+    queue.fail(job["id"], "timeout again")
+    assert queue.counts()["failed"] == 1
+    assert queue.jobs("failed")[0]["error"] == "timeout again"
+
+    assert queue.retry_failed() == 1
+    assert queue.claim()["attempts"] == 1
+
+def test_batch_resumes_after_crash(fake_gemini, tmp_path):
+    """Jobs left running by a crashed process are picked up by the next run."""
+    db_path = str(tmp_path / "jobs.db")
+    crashed = JobQueue(db_path)
+    crashed.enqueue(TOPICS)
+    crashed.claim()  # The process dies while generating this one
+    crashed.close()
+
+    queue = JobQueue(db_path)
+    finished = []
+    summary = BatchRunner(queue, workers=2).run(on_job=finished.append)
+
+    assert sorted(job["topic"] for job in finished) == sorted(TOPICS)
+    assert queue.counts() == {"pending": 0, "running": 0, "done": 3, "failed": 0}
+    assert all(job["exhibition_id"] for job in queue.jobs())
+    assert summary["completed"] == 3
+    assert summary["api_calls"] == fake_gemini.count()
+    assert summary["api_calls_per_exhibition"] == fake_gemini.count() / 3
+    assert summary["exhibitions_per_hour"] > 0
+
+def test_batch_uses_the_requested_profile(fake_gemini, tmp_path):
+    """Every batch exhibition is generated with the runner's profile."""
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue(TOPICS[:2])
+
+    summary = BatchRunner(queue, workers=1, profile="balanced").run()
+
+    repository = get_exhibition_repository()
+    assert summary["profile"] == "balanced"
+    assert {repository.get_summary(job["exhibition_id"])["profile"] for job in queue.jobs()} == {"balanced"}
@@ -0,0 +1,65 @@
+"""Tests for the content-addressed image blob store."""
+import base64
+import hashlib
+from io import BytesIO
+from PIL import Image
+from utils.blob_store import BlobStore, load_image_bytes
+from utils.exhibition_store import ExhibitionRepository
+from utils.pdf_generator import ExhibitionPDFGenerator
+from utils import process_pool
+
+def test_put_is_content_addressed_and_deduplicated(tmp_path):
+    """The same bytes are stored once under their SHA-256 digest."""
+    store = BlobStore(str(tmp_path))
+    first = store.put(b"jpeg bytes")
+    second = store.put(b"jpeg bytes")
+
+    assert first == second == hashlib.sha256(b"jpeg bytes").hexdigest()
+    assert store.get(first) == b"jpeg bytes"
+    assert store.stats() == {"blobs": 1, "bytes": len(b"jpeg bytes")}
+
+def test_exhibitions_store_references_not_bytes(tmp_path):
+    """Inline images are moved out of the database and loaded on demand."""
+    store = BlobStore(str(tmp_path / "blobs"))
+    repository = ExhibitionRepository(str(tmp_path / "exhibitions.db"), store)
+    image = {"status": "generated", "image_base64": base64.b64encode(b"thumbnail").decode()}
+    exhibition_id = repository.store({"topic": "Aztec Astronomy", "poster_image": image,
+                                      "rooms": [{"title": "Gallery", "entrance_image": image}]}, {})
+
+    stored = repository.get(exhibition_id)
+    raw = " ".join(row[0] for row in repository._connection().execute("SELECT data FROM exhibition_images"))
+
+    assert "image_base64" not in raw
+    assert stored["poster_image"]["blob"] == stored["rooms"][0]["entrance_image"]["blob"]
+    assert load_image_bytes(stored["poster_image"], store) == b"thumbnail"
+    assert store.stats()["blobs"] == 1
+
+def test_gc_removes_only_orphans(tmp_path):
+    """Blobs no exhibition references are collected."""
+    store = BlobStore(str(tmp_path / "blobs"))
+    repository = ExhibitionRepository(str(tmp_path / "exhibitions.db"), store)
+    kept = store.put(b"referenced")
+    orphan = store.put(b"orphan")
+    repository.store({"topic": "Aztec Astronomy", "poster_image": {"status": "generated", "blob": kept}}, {})
+
+    assert repository.collect_garbage(grace_seconds=3600) == 0  # Too young
+    assert repository.collect_garbage(grace_seconds=0) == 1
+    assert store.exists(kept)
+    assert not store.exists(orphan)
+
+def test_html_export_embeds_stored_images(fake_gemini, monkeypatch):
+    """The HTML export embeds the print rendition of referenced blobs."""
+    # Inline pool: spawned workers would not see the isolated storage paths
+    monkeypatch.setattr(process_pool, "_process_pool_instance", process_pool.ProcessPool(max_workers=0))
+    from utils.blob_store import get_blob_store
+    from utils.renditions import rendition_data_uri
+    png = BytesIO()
+    Image.new("RGB", (64, 48), "navy").save(png, format="PNG")
+    image = {"status": "generated", "blob": get_blob_store().put(png.getvalue()), "mime_type": "image/png"}
+
+    html = ExhibitionPDFGenerator().generate_pdf({"title": "Skywatchers", "poster_image": image})
+
+    assert rendition_data_uri(image, "print") in html
+    assert "data:image/jpeg;base64," in html
+    assert "<img" not in ExhibitionPDFGenerator(include_images=False).generate_pdf(
+        {"title": "Skywatchers", "poster_image": image})
@@ -0,0 +1,262 @@
+"""Tests for caching."""
+import threading
+import time
+import config
+from utils import cache_manager
+from utils.cache_manager import CacheManager, migrate_directory_cache
+from utils.cache_backends import SQLiteBackend
+from agents.topic_intake_agent import TopicIntakeAgent
+from orchestrator import ExhibitionOrchestrator
+
+def test_identical_prompt_is_served_from_cache(fake_gemini):
+    """A repeated prompt with the same generation config makes one API call."""
+    agent = TopicIntakeAgent()
+    agent.execute("Aztec Astronomy")
+    agent.execute("Aztec Astronomy")
+
+    stats = agent.get_stats()
+    assert fake_gemini.count() == 1
+    assert stats["cache_hits"] == 1
+    assert stats["cache_misses"] == 1
+
+def test_cache_key_includes_generation_config(fake_gemini):
+    """A different temperature is a different cache entry."""
+    agent = TopicIntakeAgent()
+    agent.generate_with_gemini("Describe the Sun Stone", temperature=0.2)
+    agent.generate_with_gemini("Describe the Sun Stone", temperature=0.9)
+
+    assert fake_gemini.count() == 2
+
+def test_cache_bypass(fake_gemini, monkeypatch):
+    """Caching can be bypassed per call or globally."""
+    agent = TopicIntakeAgent()
+    agent.generate_with_gemini("Describe the Sun Stone", use_cache=False)
+    agent.generate_with_gemini("Describe the Sun Stone", use_cache=False)
+    assert fake_gemini.count() == 2
+
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", False)
+    agent.generate_with_gemini("Describe the Sun Stone")
+    assert fake_gemini.count() == 3
+
+def test_regenerating_topic_makes_no_text_calls(fake_gemini):
+    """A second run of the same topic is answered entirely from the cache."""
+    orchestrator = ExhibitionOrchestrator()
+    orchestrator.generate_exhibition("Aztec Astronomy")
+    first_run = fake_gemini.count(model=config.MODEL_NAME)
+
+    orchestrator.generate_exhibition("Aztec Astronomy", reuse=False)
+
+    assert first_run > 0
+    assert fake_gemini.count(model=config.MODEL_NAME) == first_run
+
+def test_regenerating_topic_with_reuse_returns_stored_exhibition(fake_gemini):
+    """With reuse on (the default), the same topic is answered by topic reuse before the response cache."""
+    orchestrator = ExhibitionOrchestrator()
+    first = orchestrator.generate_exhibition("Aztec Astronomy")
+    calls = fake_gemini.count()
+
+    second = orchestrator.generate_exhibition("Aztec Astronomy")
+
+    assert second["reused_from"]["exhibition_id"] == first["exhibition_id"]
+    assert fake_gemini.count() == calls
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    """The memory tier is bounded by entry count with LRU order."""
+    cache = CacheManager(str(tmp_path), max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert list(cache.memory_cache) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("b") == 2  # still on disk
+
+def test_memory_tier_respects_byte_budget(tmp_path):
+    """Large values push older entries out of the memory tier."""
+    cache = CacheManager(str(tmp_path), max_bytes=10_000)
+    for i in range(5):
+        cache.set(f"key{i}", "x" * 3000)
+
+    stats = cache.stats()
+    assert stats["memory_bytes"] <= 10_000
+    assert stats["memory_entries"] == 3
+    assert stats["evictions"] == 2
+
+def test_expired_entries_are_swept(tmp_path, monkeypatch):
+    """Expired entries leave the memory tier without being read."""
+    monkeypatch.setattr(config, "CACHE_SWEEP_INTERVAL", 0)
+    cache = CacheManager(str(tmp_path))
+    cache.stale_ttl = 0
+    cache.set("old", "value", ttl=0.05)
+    time.sleep(0.06)
+    cache.set("new", "value")
+
+    assert list(cache.memory_cache) == ["new"]
+    assert cache.stats()["expirations"] == 1
+
+def test_ttl_is_stored_per_entry(tmp_path):
+    """Each entry keeps the TTL it was written with, in memory and on disk."""
+    cache = CacheManager(str(tmp_path))
+    cache.stale_ttl = 0
+    cache.set("short", "value", ttl=0.05)
+    cache.set("long", "value", ttl=60)
+    time.sleep(0.06)
+
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+    assert cache.cache_ttl == 3600
+
+    cache.backend.close()
+    reopened = CacheManager(str(tmp_path))
+    reopened.stale_ttl = 0
+    assert reopened.get("short") is None
+    assert reopened.get("long") == "value"
+
+def test_cached_decorator_does_not_change_default_ttl(tmp_path):
+    """Decorated functions honor their own TTL without touching cache_ttl."""
+    cache = CacheManager(str(tmp_path))
+    calls = []
+
+    @cache.cached(ttl=5)
+    def lookup(name):
+        calls.append(name)
+        return name.upper()
+
+    assert lookup("sun") == "SUN"
+    assert lookup("sun") == "SUN"
+    assert calls == ["sun"]
+    assert cache.cache_ttl == 3600
+    assert cache.memory_cache['lookup:[["sun"], {}]'][1] - time.time() <= 5
+
+def test_stale_value_is_served_while_refreshing(tmp_path):
+    """An expired entry inside the stale window returns at once and refreshes in the background."""
+    cache = CacheManager(str(tmp_path))
+    cache.set("topic", "old", ttl=0.01)
+    time.sleep(0.02)
+    refreshed = threading.Event()
+
+    def compute():
+        refreshed.set()
+        return "new"
+
+    assert cache.get_or_compute("topic", compute, ttl=60) == "old"
+    assert refreshed.wait(1)
+    time.sleep(0.05)
+    assert cache.get_or_compute("topic", compute, ttl=60) == "new"
+
+    stats = cache.stats()
+    assert stats["stale_hits"] == 1
+    assert stats["refreshes"] == 1
+
+def test_concurrent_misses_make_one_call(tmp_path):
+    """Single-flight: simultaneous misses on one key share a single computation."""
+    cache = CacheManager(str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["value"] * 10
+    assert cache.stats()["coalesced"] == 9
+
+def test_concurrent_callers_share_one_response_cache(monkeypatch):
+    """Threads racing on the first lookup build a single cache."""
+    built = []
+
+    class SlowCacheManager(CacheManager):
+        def __init__(self, *args, **kwargs):
+            built.append(1)
+            time.sleep(0.05)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(cache_manager, "CacheManager", SlowCacheManager)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache_manager.get_response_cache()))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
+    assert all(cache is results[0] for cache in results)
+    assert results[0].cache_ttl == config.LLM_CACHE_TTL
+
+def test_stats_count_hits_and_misses(tmp_path):
+    """Hits and misses are counted per tier."""
+    cache = CacheManager(str(tmp_path))
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_stale_lookup_is_counted_once(tmp_path):
+    """An expired entry is a miss for get() and a stale hit for get_or_compute(), never both."""
+    cache = CacheManager(str(tmp_path))
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["memory_hits"], stats["misses"]) == (0, 0, 1)
+
+    assert cache.get_or_compute("a", lambda: 2) == 1
+    stats = cache.stats()
+    assert (stats["stale_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+
+def test_sqlite_backend_persists_in_one_file(tmp_path):
+    """Entries survive a restart and live in a single database file."""
+    cache = CacheManager(str(tmp_path), backend="sqlite")
+    for i in range(100):
+        cache.set(f"prompt {i}", f"response {i}")
+    cache.backend.close()
+
+    reopened = CacheManager(str(tmp_path), backend="sqlite")
+    assert reopened.get("prompt 42") == "response 42"
+    assert not list(tmp_path.glob("*.pkl"))
+    assert reopened.backend.count() == 100
+
+def test_sqlite_backend_compacts_expired_rows(tmp_path):
+    """Compaction removes rows past their expiry."""
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    backend.set("live", b"1", time.time() + 60)
+    backend.set("dead", b"2", time.time() - 1)
+    backend.flush()
+
+    assert backend.compact() == 1
+    assert backend.get("live") == b"1"
+    assert backend.get("dead") is None
+
+def test_directory_backend_still_supported(tmp_path):
+    """The pickle-per-file layout remains available."""
+    cache = CacheManager(str(tmp_path), backend="directory")
+    cache.set("a", {"x": 1})
+
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+    assert CacheManager(str(tmp_path), backend="directory").get("a") == {"x": 1}
+
+def test_migrate_directory_cache(tmp_path):
+    """Existing .pkl entries are imported into the SQLite backend."""
+    legacy = CacheManager(str(tmp_path / "legacy"), backend="directory")
+    legacy.set("narrative prompt", "Welcome to the gallery")
+
+    target = CacheManager(str(tmp_path / "new"), backend="sqlite")
+    assert migrate_directory_cache(str(tmp_path / "legacy"), target) == 1
+    assert target.get("narrative prompt") == "Welcome to the gallery"
@@ -0,0 +1,104 @@
+"""Tests for the fan-out helpers."""
+import asyncio
+import logging
+import threading
+import time
+import config
+from utils.concurrency import fan_out, afan_out
+from agents.narrative_agent import NarrativeAgent
+from agents.visual_context_agent import VisualContextAgent
+
+def test_fan_out_preserves_order_and_isolates_failures():
+    """Results keep input order and one failure does not abort the rest."""
+    def work(n):
+        time.sleep(0.01 * (5 - n))
+        if n == 2:
+            raise RuntimeError("room failed")
+        return n * 10
+
+    results = fan_out(work, range(5), max_workers=3, fallback=lambda n, error: -1)
+    assert results == [0, 10, -1, 30, 40]
+
+def test_fan_out_respects_worker_bound():
+    """No more than max_workers items run at once."""
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work(n):
+        with lock:
+            active.append(n)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.remove(n)
+
+    fan_out(work, range(8), max_workers=2)
+    assert max(peak) == 2
+
+def test_afan_out_preserves_order():
+    """The async helper returns results in input order."""
+    async def work(n):
+        await asyncio.sleep(0.01 * (3 - n))
+        if n == 1:
+            raise ValueError("bad")
+        return n
+
+    results = asyncio.run(afan_out(work, range(3), fallback=lambda n, error: None))
+    assert results == [0, None, 2]
+
+def test_narrative_room_failure_uses_fallback(fake_gemini, monkeypatch):
+    """A failed room narrative falls back without losing the other rooms."""
+    monkeypatch.setattr(config, "STRUCTURED_OUTPUT", False)
+    agent = NarrativeAgent()
+    original = agent._generate_room_narrative
+
+    def flaky(room, topic):
+        if room["title"] == "Broken":
+            raise RuntimeError("timeout")
+        return original(room, topic)
+
+    monkeypatch.setattr(agent, "_generate_room_narrative", flaky)
+    exhibition = {
+        "topic": "Aztec Astronomy",
+        "rooms": [
+            {"title": "Sky", "description": "Stars", "exhibits": []},
+            {"title": "Broken", "description": "Calendar stones", "exhibits": []}
+        ]
+    }
+
+    result = agent.execute(exhibition)
+    assert result["rooms"][0]["narrative"] == "Generated text about the exhibition."
+    assert result["rooms"][1]["narrative"] == "Calendar stones"
+
+def test_agent_counters_are_exact_under_fan_out(fake_gemini):
+    """Calls made from fan_out worker threads are all counted."""
+    agent = NarrativeAgent()
+
+    fan_out(lambda i: agent.generate_with_gemini(f"Prompt {i}", use_cache=False), range(200), max_workers=16)
+
+    assert agent.api_calls == fake_gemini.count() == 200
+
+def test_visual_context_failure_is_logged_and_leaves_exhibit(monkeypatch, caplog):
+    """A failed visual search keeps the exhibit as it was and says so in the log."""
+    agent = VisualContextAgent()
+
+    def search(query, num_results=3):
+        if "Broken" in query:
+            raise RuntimeError("search quota")
+        return [{"title": "Sun Stone", "link": "https://example.org/sun-stone"}]
+
+    monkeypatch.setattr(agent.search_tool, "search", search)
+    refs = [{"description": "Carved calendar", "type": "artifact"}]
+    exhibition = {
+        "topic": "Aztec Astronomy",
+        "rooms": [{"title": "Sky", "exhibits": [{"name": "Sun Stone"}, {"name": "Broken", "visual_refs": list(refs)}]}]
+    }
+
+    with caplog.at_level(logging.WARNING):
+        result = agent.execute(exhibition)
+
+    sun_stone, broken = result["rooms"][0]["exhibits"]
+    assert sun_stone["visual_refs"][0]["source"] == "https://example.org/sun-stone"
+    assert broken["visual_refs"] == refs
+    assert "Visual references unchanged for 'Broken': search quota" in caplog.text
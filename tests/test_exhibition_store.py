@@ -0,0 +1,174 @@
+"""Tests for the exhibition repository."""
+import json
+import sqlite3
+import threading
+from utils.exhibition_store import ExhibitionRepository, get_exhibition_repository, SCHEMA_VERSION
+from utils.blob_store import BlobStore
+from agents.memory_bank_agent import MemoryBankAgent
+
+EXHIBITION = {
+    "topic": "Aztec Astronomy",
+    "title": "Skywatchers",
+    "poster_image": {"status": "no_image", "note": "Nano Banana did not generate an image"},
+    "timeline": [{"year": "1479", "event": "Sun Stone carved"}],
+    "rooms": [
+        {
+            "title": "Gallery 1",
+            "theme": "Calendars",
+            "entrance_image": {"status": "error", "error": "quota"},
+            "exhibits": [
+                {"name": "Sun Stone", "time_period": "1479 CE", "generated_image": {"status": "success"}},
+                {"name": "Codex", "time_period": "1500 CE"}
+            ]
+        },
+        {"title": "Gallery 2", "theme": "Temples", "exhibits": [{"name": "Templo Mayor model"}]}
+    ]
+}
+
+def make_repository(tmp_path) -> ExhibitionRepository:
+    return ExhibitionRepository(str(tmp_path / "exhibitions.db"), BlobStore(str(tmp_path / "blobs")))
+
+def test_store_and_retrieve(tmp_path):
+    """Stored exhibitions round-trip and list newest first."""
+    repository = make_repository(tmp_path)
+    first = repository.store({"topic": "Aztec Astronomy", "title": "Skywatchers"}, {"overall_score": 0.8})
+    second = repository.store({"topic": "Roman Roads", "title": "All Roads"}, {"overall_score": 0.9})
+
+    assert repository.get(first)["title"] == "Skywatchers"
+    assert repository.get(999) is None
+    assert [e["id"] for e in repository.list_recent(5)] == [second, first]
+
+def test_connection_is_pooled_per_thread(tmp_path):
+    """Each thread reuses one WAL-mode connection."""
+    repository = make_repository(tmp_path)
+    conn = repository._connection()
+
+    assert repository._connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    others = []
+    thread = threading.Thread(target=lambda: others.append(repository._connection()))
+    thread.start()
+    thread.join()
+    assert others[0] is not conn
+
+def test_concurrent_writers(tmp_path):
+    """Writes from many threads all land."""
+    repository = make_repository(tmp_path)
+
+    def write(i):
+        for j in range(10):
+            repository.store({"topic": f"Topic {i}-{j}"}, {"overall_score": 0.5})
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(repository.list_recent(100)) == 80
+
+def test_history_browsing_needs_no_agent(fake_gemini):
+    """The agent and the shared repository see the same store."""
+    agent = MemoryBankAgent()
+    result = agent.execute({"exhibition": {"topic": "Aztec Astronomy"}, "evaluation": {"overall_score": 0.7}})
+
+    repository = get_exhibition_repository()
+    assert repository is agent.repository
+    assert repository.get(result["exhibition_id"])["topic"] == "Aztec Astronomy"
+
+def test_normalized_round_trip(tmp_path):
+    """Rooms, exhibits and images are split into child tables and reassembled."""
+    repository = make_repository(tmp_path)
+    exhibition_id = repository.store(EXHIBITION, {"overall_score": 0.8})
+    conn = repository._connection()
+
+    assert repository.get(exhibition_id) == EXHIBITION
+    assert "rooms" not in conn.execute("SELECT data FROM exhibitions").fetchone()[0]
+    assert conn.execute("SELECT COUNT(*) FROM exhibition_exhibits").fetchone()[0] == 3
+    assert conn.execute("SELECT COUNT(*) FROM exhibition_images").fetchone()[0] == 3
+    assert [e["name"] for e in repository.get_exhibits(exhibition_id, room_index=0)] == ["Sun Stone", "Codex"]
+    assert repository.get_exhibits(exhibition_id)[0]["generated_image"] == {"status": "success"}
+
+def test_find_exhibitions_uses_indexes(tmp_path):
+    """Topic and score filters are served by indexes."""
+    repository = make_repository(tmp_path)
+    repository.store(EXHIBITION, {"overall_score": 0.8})
+    repository.store({"topic": "Roman Roads"}, {"overall_score": 0.5})
+
+    assert [e["topic"] for e in repository.find_exhibitions(topic="aztec astronomy")] == ["Aztec Astronomy"]
+    assert [e["topic"] for e in repository.find_exhibitions(min_score=0.6)] == ["Aztec Astronomy"]
+    assert repository.list_recent(1)[0]["exhibit_count"] == 0
+
+    conn = repository._connection()
+    plan = " ".join(str(r) for r in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM exhibitions WHERE topic = ? COLLATE NOCASE ORDER BY created_at DESC",
+        ("x",)))
+    assert "idx_exhibitions_topic" in plan
+
+def test_migrates_single_table_database(tmp_path):
+    """A database written by the original layout is upgraded in place."""
+    db_path = str(tmp_path / "exhibitions.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE exhibitions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, topic TEXT NOT NULL, title TEXT,
+            created_at TEXT, quality_score REAL, data TEXT NOT NULL
+        )
+    """)
+    legacy = dict(EXHIBITION, poster_image={"status": "generated", "image_base64": "cG9zdGVy"})
+    conn.execute("INSERT INTO exhibitions (topic, title, created_at, quality_score, data) VALUES (?, ?, ?, ?, ?)",
+                 ("Aztec Astronomy", "Skywatchers", "2025-01-01T00:00:00", 0.8, json.dumps(legacy)))
+    conn.commit()
+    conn.close()
+
+    repository = ExhibitionRepository(db_path, BlobStore(str(tmp_path / "blobs")))
+    migrated = repository.get(1)
+    poster = migrated.pop("poster_image")
+
+    assert repository.schema_version() == SCHEMA_VERSION
+    assert [r["id"] for r in repository.search_exhibitions("Sun Stone")] == [1]
+    assert {k: v for k, v in EXHIBITION.items() if k != "poster_image"} == migrated
+    assert "image_base64" not in poster
+    assert repository.blob_store.get(poster["blob"]) == b"poster"
+    assert repository.list_recent(1)[0]["exhibit_count"] == 3
+
+def test_search_ranks_and_highlights(tmp_path):
+    """Title matches outrank body matches and results carry a snippet."""
+    repository = make_repository(tmp_path)
+    body_match = repository.store({
+        "topic": "Roman Roads",
+        "rooms": [{"narrative": "Travellers followed the calendar of festivals.",
+                   "exhibits": [{"name": "Milestone", "description": "A stone marker.",
+                                 "facts": ["Carved with distances"]}]}]
+    }, {})
+    title_match = repository.store({"topic": "Aztec Astronomy", "title": "The Calendar Stone"}, {})
+    repository.store({"topic": "Jazz Age"}, {})
+
+    results = repository.search_exhibitions("calendars")
+
+    assert [r["id"] for r in results] == [title_match, body_match]
+    assert "[Calendar]" in results[0]["snippet"]
+    assert [r["id"] for r in repository.search_exhibitions("distances carved")] == [body_match]
+    assert repository.search_exhibitions("calendar", limit=1, offset=1)[0]["id"] == body_match
+
+def test_search_ranks_every_match(tmp_path):
+    """The oldest exhibition still ranks first when it matches best, and offsets page through all matches."""
+    repository = make_repository(tmp_path)
+    best = repository.store({"topic": "Calendar", "title": "Calendar Calendar"}, {})
+    newer = [repository.store({"topic": f"Topic {i}", "curator_notes": f"A calendar among {i} other words here."},
+                              {}) for i in range(40)]
+
+    results = repository.search_exhibitions("calendar", limit=100)
+
+    assert results[0]["id"] == best
+    assert sorted(r["id"] for r in results) == [best] + newer
+    assert len(repository.search_exhibitions("calendar", limit=10, offset=35)) == 6
+
+def test_search_treats_input_as_text(tmp_path):
+    """FTS5 operators and punctuation in user input are not query syntax."""
+    repository = make_repository(tmp_path)
+    repository.store({"topic": "Aztec Astronomy", "curator_notes": "NOT a quiet (sky)"}, {})
+
+    assert len(repository.search_exhibitions('NOT "sky')) == 1
+    assert repository.search_exhibitions("*:()") == []
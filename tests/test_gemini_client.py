@@ -0,0 +1,22 @@
+"""Tests for the shared Gemini client registry."""
+import config
+from orchestrator import ExhibitionOrchestrator
+from tools.ai_docent import AIDocent
+from utils.gemini_client import get_gemini_registry
+
+def test_construction_creates_no_models(fake_gemini):
+    """Orchestrators and docents configure nothing until the first call."""
+    ExhibitionOrchestrator()
+    AIDocent()
+
+    assert get_gemini_registry().stats() == {"configured": False, "models": []}
+
+def test_agents_share_one_model_per_name(fake_gemini):
+    """Every agent and session gets the same handle for a model."""
+    first, second = ExhibitionOrchestrator(), ExhibitionOrchestrator()
+
+    assert first.research.model is second.exhibit_generator.model is AIDocent().model
+    assert first.image_generator._image_model() is second.image_generator._image_model()
+    assert get_gemini_registry().stats() == {
+        "configured": True, "models": sorted({config.MODEL_NAME, config.IMAGE_MODEL_NAME})
+    }
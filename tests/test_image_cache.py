@@ -0,0 +1,72 @@
+"""Tests for the persistent image cache."""
+import threading
+import time
+from io import BytesIO
+from types import SimpleNamespace
+from PIL import Image
+from agents.image_generator_agent import ImageGeneratorAgent
+from utils import process_pool
+from utils.image_cache import ImageCache, get_image_cache
+
+def test_normalized_prompts_share_an_entry(tmp_path):
+    """Case, whitespace and surrounding quotes do not change the key; the model does."""
+    cache = ImageCache(str(tmp_path / "images.db"))
+    cache.put('"Aztec Sun Stone".', "image-model", b"jpeg")
+
+    assert cache.get("aztec  sun stone", "image-model") == b"jpeg"
+    assert cache.get("Aztec Sun Stone", "other-model") is None
+    assert cache.stats()["hit_rate"] == 0.5
+
+def test_least_recently_used_entries_are_evicted_by_bytes(tmp_path):
+    """Once the total size exceeds max_bytes, the stalest entries go first."""
+    cache = ImageCache(str(tmp_path / "images.db"), max_bytes=250)
+    cache.put("first", "m", b"1" * 100)
+    time.sleep(0.01)
+    cache.put("second", "m", b"2" * 100)
+    time.sleep(0.01)
+    cache.get("first", "m")
+    cache.put("third", "m", b"3" * 100)
+
+    assert cache.get("second", "m") is None
+    assert cache.get("first", "m") is not None
+    assert cache.stats()["bytes"] == 200
+    assert cache.stats()["evictions"] == 1
+
+def test_concurrent_requests_for_one_prompt_generate_once(tmp_path):
+    """Callers asking while the image is being generated wait for that result."""
+    cache = ImageCache(str(tmp_path / "images.db"))
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.05)
+        return b"jpeg"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_generate("Sun Stone", "m", generate)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [b"jpeg"] * 4
+
+def test_repeated_artifacts_are_generated_once(fake_gemini, monkeypatch):
+    """The same exhibit in two exhibitions costs one image model call."""
+    monkeypatch.setattr(process_pool, "_process_pool_instance", process_pool.ProcessPool(max_workers=0))
+    png = BytesIO()
+    Image.new("RGB", (800, 600), "orange").save(png, format="PNG")
+    response = SimpleNamespace(parts=[SimpleNamespace(inline_data=SimpleNamespace(data=png.getvalue()))])
+    calls = []
+    agent = ImageGeneratorAgent()
+    model = SimpleNamespace(generate_content=lambda prompt: calls.append(prompt) or response)
+    agent._image_model = lambda: model
+
+    images = [agent._generate_image_with_gemini(agent._create_exhibit_prompt({"name": "Aztec Sun Stone"}, theme))
+              for theme in ("Calendars", "Cosmology")]
+
+    assert len(calls) == 1
+    assert images[0]["blob"] == images[1]["blob"]
+    assert get_image_cache().stats()["hits"] == 1
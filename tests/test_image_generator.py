@@ -0,0 +1,108 @@
+"""Tests for the concurrent image generation pipeline."""
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+from PIL import Image
+import config
+from agents.image_generator_agent import ImageGeneratorAgent
+from utils.image_cache import get_image_cache
+
+def make_exhibition(rooms: int = 4, exhibits_per_room: int = 2) -> dict:
+    return {
+        "topic": "Aztec Astronomy",
+        "title": "Skywatchers",
+        "rooms": [
+            {"title": f"Gallery {r}", "theme": f"Theme {r}",
+             "exhibits": [{"name": f"Artifact {r}-{e}"} for e in range(exhibits_per_room)]}
+            for r in range(rooms)
+        ]
+    }
+
+def slow_generator(agent: ImageGeneratorAgent, latency: float) -> list:
+    """Replace the model call with a sleep, recording start order and peak concurrency."""
+    started, active, lock = [], [0, 0], threading.Lock()
+
+    def generate(prompt: str, cancelled=None) -> dict:
+        with lock:
+            started.append(prompt.split("\n")[0])
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(latency)
+        with lock:
+            active[0] -= 1
+        return {"prompt": prompt[:100], "status": "generated"}
+
+    agent._generate_image_with_gemini = generate
+    return started, active
+
+def test_images_generate_concurrently_in_priority_order(fake_gemini, monkeypatch):
+    """Poster, then rooms, then exhibits; the budget cuts the lowest-priority images."""
+    monkeypatch.setattr(config, "IMAGE_MAX_WORKERS", 4)
+    monkeypatch.setattr(config, "IMAGE_BUDGET_PER_EXHIBITION", 9)
+    agent = ImageGeneratorAgent()
+    started, active = slow_generator(agent, 0.05)
+
+    start = time.time()
+    result = agent.execute({"exhibition": make_exhibition()})
+    elapsed = time.time() - start
+    exhibition = result["exhibition"]
+
+    assert "poster" in started[0]
+    assert all("gallery room" in prompt for prompt in started[1:5])
+    assert active[1] == 4
+    assert elapsed < 9 * 0.05 / 2
+    assert exhibition["poster_image"]["status"] == "generated"
+    assert exhibition["rooms"][3]["exhibits"][1]["generated_image"]["reason"] == "budget"
+    assert result["image_stats"]["generated"] == 9
+    assert result["image_stats"]["skipped_budget"] == 4
+
+def test_images_past_the_deadline_are_skipped(fake_gemini, monkeypatch):
+    """The agent returns at the deadline, keeping what finished in time."""
+    monkeypatch.setattr(config, "IMAGE_MAX_WORKERS", 1)
+    monkeypatch.setattr(config, "IMAGE_DEADLINE_SECONDS", 0.25)
+    agent = ImageGeneratorAgent()
+    slow_generator(agent, 0.1)
+
+    start = time.time()
+    result = agent.execute({"exhibition": make_exhibition()})
+
+    assert time.time() - start < 0.4
+    assert result["exhibition"]["poster_image"]["status"] == "generated"
+    assert result["image_stats"]["generated"] == 2
+    assert result["image_stats"]["skipped_deadline"] == 11
+
+def test_calls_finishing_after_the_deadline_are_not_counted_or_stored(fake_gemini, monkeypatch):
+    """Once the stage returns, in-flight calls change neither the call count nor the caches."""
+    monkeypatch.setattr(config, "IMAGE_MAX_WORKERS", 2)
+    monkeypatch.setattr(config, "IMAGE_DEADLINE_SECONDS", 0.1)
+    png = BytesIO()
+    Image.new("RGB", (64, 48), "orange").save(png, format="PNG")
+    response = SimpleNamespace(parts=[SimpleNamespace(inline_data=SimpleNamespace(data=png.getvalue()))])
+    agent = ImageGeneratorAgent()
+    requests = []
+    model = SimpleNamespace(generate_content=lambda prompt: requests.append(prompt) or time.sleep(0.2) or response)
+    agent._image_model = lambda: model
+    # The first call gets quota at once; the second is still waiting for it at the deadline
+    waits = iter([0.0, 0.15, 0.15, 0.15])
+    limiter = SimpleNamespace(acquire=lambda tokens: time.sleep(next(waits)) or 0.0)
+    monkeypatch.setattr("agents.image_generator_agent.get_rate_limiter", lambda: limiter)
+
+    result = agent.execute({"exhibition": make_exhibition(rooms=1)})
+    calls_at_return = agent.api_calls
+    time.sleep(0.3)  # In-flight calls finish
+
+    assert result["image_stats"]["skipped_deadline"] == 4
+    assert calls_at_return == agent.api_calls == len(requests) == 1
+    assert get_image_cache().stats()["entries"] == 0
+    assert not any(path.is_file() for path in Path(config.BLOB_STORE_DIR).rglob("*"))
+
+def test_image_model_is_created_once(fake_gemini):
+    """All image calls share one model client."""
+    agent = ImageGeneratorAgent()
+    agent.execute({"exhibition": make_exhibition(rooms=1)})
+
+    assert agent._image_model() is agent._image_model()
+    assert fake_gemini.count(model=config.IMAGE_MODEL_NAME) == 4
+    assert agent.api_calls == 4
@@ -0,0 +1,89 @@
+"""Tests for the incremental JSON array parser and tolerant extraction."""
+import json
+import random
+from pathlib import Path
+from utils.json_stream import JSONArrayParser, iter_json_array, extract_json_array, extract_json_object
+from agents.exhibit_generator_agent import ExhibitGeneratorAgent
+
+# Model responses with the usual quirks: fences, prose with brackets, trailing commas
+SAMPLES = {path.stem: path.read_text() for path in (Path(__file__).parent / "samples").glob("*.txt")}
+
+ITEMS = [
+    {"name": "Sun [stone]", "facts": ["a \"quoted\" fact", "brace } inside"], "year": 1479},
+    {"name": "Codex", "nested": {"rooms": [[1, 2], []]}},
+    "plain string, with comma",
+    42,
+    None,
+]
+
+def test_items_match_json_loads_for_any_chunking():
+    """Splitting the text anywhere yields the same elements as json.loads."""
+    text = "Here are the exhibits:\n```json\n" + json.dumps(ITEMS, indent=2) + "\n```\nEnjoy!"
+    for size in (1, 2, 3, 7, 64, len(text)):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert list(iter_json_array(chunks)) == ITEMS
+
+def test_objects_are_emitted_as_soon_as_they_close():
+    """An object is returned by the feed() call that delivers its closing brace."""
+    parser = JSONArrayParser()
+
+    assert parser.feed('[{"name": "A"') == []
+    assert parser.feed('}, {"name": ') == [{"name": "A"}]
+    assert parser.feed('"B"}') == [{"name": "B"}]
+    assert parser.feed(']') == []
+    assert parser.done
+
+def test_malformed_elements_are_dropped():
+    """An element that is not valid JSON is skipped without losing its neighbours."""
+    items = list(iter_json_array(['[{"a": 1}, {"b": oops}, {"c": 3}]']))
+
+    assert items == [{"a": 1}, {"c": 3}]
+
+def test_samples_are_fully_extracted():
+    assert [e["name"] for e in extract_json_array(SAMPLES["exhibits_fenced"])] == [
+        "The Sun Stone", "Skywatchers of Tenochtitlan", "Templo Mayor Alignments"]
+    assert extract_json_array(SAMPLES["exhibits_trailing_commas"])[0]["tags"] == ["venus"]
+    assert len(extract_json_array(SAMPLES["connections_json"])) == 3
+    assert len(extract_json_object(SAMPLES["quiz_with_prose"])["questions"]) == 3
+    assert len(extract_json_object(SAMPLES["analysis_structured"])["key_concepts"]) == 8
+
+def test_exhibit_parser_salvages_truncated_response(fake_gemini):
+    """A response cut off mid-exhibit keeps the exhibits that completed instead of the canned fallback."""
+    text = SAMPLES["exhibits_fenced"]
+    exhibits = ExhibitGeneratorAgent()._parse_exhibits(text[:text.index("Templo Mayor")], "Aztec Astronomy")
+
+    assert [e["name"] for e in exhibits] == ["The Sun Stone", "Skywatchers of Tenochtitlan"]
+
+def test_truncated_object_keeps_complete_members():
+    text = '{"title": "Quiz", "questions": [{"question": "Q1", "correct": 0}, {"question": "Q2", "corr'
+
+    assert extract_json_object(text) == {"title": "Quiz", "questions": [{"question": "Q1", "correct": 0},
+                                                                        {"question": "Q2"}]}
+    assert extract_json_object('{"title": "Qu') == {}
+
+def test_fuzz_truncation_and_chunking():
+    """Any cut salvages a prefix of the full result; any chunking matches the whole-text result."""
+    rng = random.Random(0)
+    for name, text in SAMPLES.items():
+        full = extract_json_array(text)
+        full_object = extract_json_object(text)
+        for _ in range(200):
+            cut = rng.randrange(len(text) + 1)
+            salvaged = extract_json_array(text[:cut])
+            assert salvaged == full[:len(salvaged)], (name, cut)
+            assert isinstance(extract_json_object(text[:cut]), dict)
+
+            size = rng.randint(1, 40)
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            assert list(iter_json_array(chunks)) == full, (name, size)
+        assert extract_json_object(text + "\n\nHope this helps {really}!") == full_object
+
+def test_fuzz_corruption_never_raises():
+    """Deleting or duplicating characters degrades the result instead of raising."""
+    rng = random.Random(1)
+    for text in SAMPLES.values():
+        for _ in range(200):
+            i = rng.randrange(len(text))
+            mutated = text[:i] + text[i + 1:] if rng.random() < 0.5 else text[:i] + text[i] + text[i:]
+            assert isinstance(extract_json_array(mutated), list)
+            assert isinstance(extract_json_object(mutated), dict)
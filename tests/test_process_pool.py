@@ -0,0 +1,44 @@
+"""Tests for the CPU-bound post-processing pool."""
+import asyncio
+import os
+from io import BytesIO
+import pytest
+from PIL import Image
+from utils.image_processing import compress_image
+from utils.process_pool import ProcessPool, Task
+
+def test_tasks_run_in_worker_processes():
+    """Tasks execute outside the calling process and workers are reused."""
+    pool = ProcessPool(max_workers=1)
+    try:
+        first = pool.run(Task(os.getpid))
+        assert first != os.getpid()
+        assert asyncio.run(pool.arun(Task(os.getpid))) == first
+        assert pool.stats()["submitted"] == 2
+    finally:
+        pool.shutdown()
+
+def test_zero_workers_runs_inline_and_propagates_errors():
+    """With no workers, tasks run on the calling thread; task errors are raised."""
+    pool = ProcessPool(max_workers=0)
+
+    assert pool.run(Task(os.getpid)) == os.getpid()
+    with pytest.raises(ValueError):
+        pool.run(Task(int, "not a number"))
+    assert pool.stats()["inline"] == 2
+
+def test_compress_image_fits_bounds_and_flattens_alpha():
+    """Large transparent images become small RGB JPEGs."""
+    source = BytesIO()
+    Image.new("RGBA", (1200, 900), (200, 120, 40, 128)).save(source, format="PNG")
+
+    pool = ProcessPool(max_workers=1)
+    try:
+        compressed = pool.run(Task(compress_image, source.getvalue(), 400, 300))
+    finally:
+        pool.shutdown()
+    image = Image.open(BytesIO(compressed))
+
+    assert image.format == "JPEG"
+    assert image.mode == "RGB"
+    assert image.size == (400, 300)
@@ -0,0 +1,73 @@
+"""Tests for execution profiles."""
+import pytest
+import config
+from orchestrator import ExhibitionOrchestrator, resolve_profile
+
+@pytest.mark.parametrize("profile", list(config.EXECUTION_PROFILES))
+def test_profiles_stay_within_api_call_budgets(fake_gemini, profile):
+    """Each profile's documented API-call budget holds for a full run."""
+    result = ExhibitionOrchestrator().generate_exhibition("Aztec Astronomy", reuse=False, profile=profile)
+
+    assert result["profile"] == profile
+    assert result["metrics"]["api_calls"] == fake_gemini.count()
+    assert result["metrics"]["api_calls"] <= config.EXECUTION_PROFILES[profile]["api_call_budget"]
+
+def test_fast_profile_skips_optional_agents(fake_gemini):
+    """Optional stages left out of a profile never construct or call their agent."""
+    orchestrator = ExhibitionOrchestrator()
+    exhibition = orchestrator.generate_exhibition("Aztec Astronomy", reuse=False, profile="fast")["exhibition"]
+
+    built = {type(agent).__name__ for agent in orchestrator.agents}
+    assert not built & {"SemanticAnalyzerAgent", "InteractiveGuideAgent", "MultimediaCuratorAgent",
+                        "AccessibilityAgent", "ImageGeneratorAgent"}
+    assert "poster_image" not in exhibition and "quiz" not in exhibition
+    assert exhibition["semantic_analysis"]["thematic_insights"] == "Analysis unavailable"
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_profile("turbo")
+    assert resolve_profile()["name"] == config.DEFAULT_PROFILE
+
+def test_reuse_requires_a_profile_at_least_as_complete(fake_gemini):
+    """A fast exhibition is not reused for a full request; a full one is reused for a balanced request."""
+    orchestrator = ExhibitionOrchestrator()
+    fast = orchestrator.generate_exhibition("Aztec Astronomy", profile="fast")
+
+    full = orchestrator.generate_exhibition("Aztec Astronomy", profile="full")
+    assert "reused_from" not in full
+    assert full["exhibition_id"] != fast["exhibition_id"]
+
+    reused = orchestrator.generate_exhibition("Aztec Astronomy", profile="balanced")
+    assert reused["reused_from"]["exhibition_id"] == full["exhibition_id"]
+    assert reused["profile"] == "full"
+    assert reused["metrics"]["api_calls"] == 0
+    assert orchestrator.memory_bank.repository.get_summary(fast["exhibition_id"])["profile"] == "fast"
+
+@pytest.mark.parametrize("profile", list(config.EXECUTION_PROFILES))
+def test_profile_sets_stage_and_image_concurrency(fake_gemini, monkeypatch, profile):
+    """The stage scheduler and image pool are sized by the requested profile."""
+    import orchestrator as orchestrator_module
+    from agents.image_generator_agent import ImageGeneratorAgent
+    # Every profile runs at least one image so its image pool is exercised
+    settings = dict(config.EXECUTION_PROFILES[profile])
+    settings["stages"] = list(dict.fromkeys(settings["stages"] + ["image_generator"]))
+    settings["image_budget"] = max(1, settings["image_budget"])
+    monkeypatch.setitem(config.EXECUTION_PROFILES, profile, settings)
+    stage_workers, image_workers = [], []
+
+    class RecordingScheduler(orchestrator_module.DAGScheduler):
+        def __init__(self, stages, max_workers=4):
+            stage_workers.append(max_workers)
+            super().__init__(stages, max_workers)
+
+    run_image_jobs = ImageGeneratorAgent._run_image_jobs
+    def record_image_jobs(self, jobs, deadline, max_workers):
+        image_workers.append(max_workers)
+        return run_image_jobs(self, jobs, deadline, max_workers)
+
+    monkeypatch.setattr(orchestrator_module, "DAGScheduler", RecordingScheduler)
+    monkeypatch.setattr(ImageGeneratorAgent, "_run_image_jobs", record_image_jobs)
+    ExhibitionOrchestrator().generate_exhibition("Aztec Astronomy", reuse=False, profile=profile)
+
+    assert stage_workers == [settings["pipeline_max_workers"]]
+    assert image_workers == [settings["image_max_workers"]]
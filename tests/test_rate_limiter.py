@@ -0,0 +1,70 @@
+"""Tests for the token-bucket rate limiter."""
+import time
+
+import pytest
+
+import config
+from utils import rate_limiter
+from utils.rate_limiter import RateLimiter, retry_after_hint, is_rate_limit_error
+
+def test_requests_go_out_immediately_below_quota():
+    """No waiting while the request bucket has capacity."""
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=100000)
+
+    started = time.time()
+    for _ in range(10):
+        limiter.acquire(tokens=100)
+
+    assert time.time() - started < 0.05
+    assert limiter.stats()["throttled"] == 0
+
+def test_exhausted_bucket_waits_for_refill():
+    """Once the burst is spent callers wait for the refill rate."""
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10 ** 9)
+    for _ in range(600):
+        limiter.acquire()
+
+    waited = limiter.acquire()
+    stats = limiter.stats()
+
+    assert 0.05 < waited < 0.2
+    assert stats["throttled"] == 1
+    assert stats["wait_seconds"] == waited
+
+def test_token_bucket_limits_large_prompts():
+    """The tokens-per-minute bucket throttles independently of request count."""
+    limiter = RateLimiter(requests_per_minute=10000, tokens_per_minute=6000)
+    limiter.acquire(tokens=6000)
+
+    assert limiter.acquire(tokens=100) > 0.5
+
+def test_retry_after_hint_parsing():
+    """Server retry hints are honored."""
+    error = Exception("429 Resource exhausted. retry_delay {\n  seconds: 37\n}")
+    assert retry_after_hint(error) == 37.0
+    assert retry_after_hint(Exception("Please retry in 4.5s")) == 4.5
+    assert retry_after_hint(Exception("500 internal")) is None
+    assert is_rate_limit_error(error)
+
+def test_rate_limit_backoff_blocks_other_callers(monkeypatch):
+    """A 429 with a retry hint pauses every caller sharing the limiter."""
+    # Deterministic jitter: always the largest value, kept small
+    monkeypatch.setattr(config, "RETRY_BASE_DELAY", 0.05)
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda low, high: high)
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=10 ** 9)
+    delay = limiter.backoff_delay(Exception("429 quota exceeded, retry in 0.2s"), attempt=0)
+
+    assert delay == pytest.approx(0.25)
+    assert limiter.acquire() > 0.15
+    assert limiter.stats()["rate_limit_errors"] == 1
+
+def test_state_file_shares_quota_across_limiters(tmp_path):
+    """Limiters backed by the same state file draw from one bucket."""
+    state_file = str(tmp_path / "rate_limit.json")
+    first = RateLimiter(requests_per_minute=60, tokens_per_minute=10 ** 9, state_file=state_file)
+    second = RateLimiter(requests_per_minute=60, tokens_per_minute=10 ** 9, state_file=state_file)
+
+    for _ in range(60):
+        first.acquire()
+
+    assert second.acquire() > 0.5
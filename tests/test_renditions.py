@@ -0,0 +1,79 @@
+"""Tests for image renditions derived from stored originals."""
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from utils import process_pool
+from utils.blob_store import BlobStore
+from utils.exhibition_store import ExhibitionRepository
+from utils.process_pool import ProcessPool
+from utils.renditions import get_rendition, prune_renditions, rendition_path
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(process_pool, "_process_pool_instance", ProcessPool(max_workers=0))
+    return BlobStore(str(tmp_path / "blobs"))
+
+
+def make_png(size=(1024, 768)) -> bytes:
+    png = BytesIO()
+    Image.new("RGB", size, "teal").save(png, format="PNG")
+    return png.getvalue()
+
+
+def test_rendition_is_made_once_and_cached(store):
+    """The first request encodes the rendition; later ones read the cached file."""
+    image = {"status": "generated", "blob": store.put(make_png())}
+
+    card = get_rendition(image, "card", store)
+    path = rendition_path(store, image["blob"], "card")
+
+    assert path.read_bytes() == card
+    with Image.open(BytesIO(card)) as rendered:
+        assert rendered.format == "WEBP"
+        assert rendered.size == (480, 360)
+    path.write_bytes(b"cached")
+    assert get_rendition(image, "card", store) == b"cached"
+
+
+def test_renditions_use_their_configured_format(store):
+    """Screen renditions are WebP and the print rendition is JPEG."""
+    image = {"status": "generated", "blob": store.put(make_png((200, 100)))}
+
+    with Image.open(BytesIO(get_rendition(image, "thumb", store))) as thumb:
+        assert (thumb.format, thumb.size) == ("WEBP", (160, 80))
+    with Image.open(BytesIO(get_rendition(image, "print", store))) as printed:
+        # Never upscaled past the original
+        assert (printed.format, printed.size) == ("JPEG", (200, 100))
+    with pytest.raises(ValueError):
+        get_rendition(image, "poster", store)
+
+
+def test_prune_removes_renditions_of_collected_blobs(store):
+    """Renditions go away with their original."""
+    kept = {"status": "generated", "blob": store.put(make_png((64, 48)))}
+    dropped = {"status": "generated", "blob": store.put(make_png((48, 64)))}
+    for image in (kept, dropped):
+        get_rendition(image, "thumb", store)
+
+    store.gc({kept["blob"]}, grace_seconds=0)
+
+    assert prune_renditions(store) == 1
+    assert rendition_path(store, kept["blob"], "thumb").exists()
+    assert not rendition_path(store, dropped["blob"], "thumb").exists()
+
+
+def test_history_previews_use_poster_thumbnails(store, tmp_path):
+    """The sidebar loads every listed poster in one query and shows its thumb rendition."""
+    repository = ExhibitionRepository(str(tmp_path / "exhibitions.db"), store)
+    poster = {"status": "generated", "blob": store.put(make_png()), "mime_type": "image/png"}
+    with_poster = repository.store({"topic": "Aztec Astronomy", "poster_image": poster}, {})
+    without_poster = repository.store({"topic": "Roman Roads"}, {})
+
+    posters = repository.get_poster_images([with_poster, without_poster])
+
+    assert list(posters) == [with_poster]
+    with Image.open(BytesIO(get_rendition(posters[with_poster], "thumb", store))) as thumb:
+        assert thumb.size == (160, 120)
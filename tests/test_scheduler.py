@@ -0,0 +1,68 @@
+"""Tests for the pipeline DAG scheduler."""
+import time
+import pytest
+from utils.scheduler import DAGScheduler, Stage
+
+def test_independent_stages_overlap():
+    """Stages whose inputs are ready run concurrently."""
+    def slow(start):
+        time.sleep(0.2)
+        return start + 1
+
+    stages = [
+        Stage("a", slow, ["start"], "a"),
+        Stage("b", slow, ["start"], "b"),
+        Stage("sum", lambda a, b: a + b, ["a", "b"], "total")
+    ]
+
+    started = time.time()
+    values = DAGScheduler(stages, max_workers=2).run({"start": 1})
+
+    assert values["total"] == 4
+    assert time.time() - started < 0.35
+
+def test_fallback_replaces_failed_stage():
+    """A failing stage with a fallback does not abort the run."""
+    def fail(x):
+        raise RuntimeError("boom")
+
+    stages = [
+        Stage("flaky", fail, ["x"], "y", fallback=lambda error, x: "fallback"),
+        Stage("after", lambda y: y.upper(), ["y"], "z")
+    ]
+
+    values = DAGScheduler(stages).run({"x": 1})
+    assert values["z"] == "FALLBACK"
+
+def test_cycle_is_rejected():
+    """Dependency cycles are detected up front."""
+    stages = [
+        Stage("a", lambda b: b, ["b"], "a"),
+        Stage("b", lambda a: a, ["a"], "b")
+    ]
+
+    with pytest.raises(ValueError):
+        DAGScheduler(stages)
+
+def test_critical_path_report():
+    """The report follows the slowest dependency chain."""
+    def wait(seconds):
+        def run(**inputs):
+            time.sleep(seconds)
+            return seconds
+        return run
+
+    stages = [
+        Stage("root", wait(0.01), ["topic"], "root"),
+        Stage("fast", wait(0.01), ["root"], "fast"),
+        Stage("slow", wait(0.15), ["root"], "slow"),
+        Stage("join", wait(0.01), ["fast", "slow"], "join")
+    ]
+
+    scheduler = DAGScheduler(stages, max_workers=2)
+    scheduler.run({"topic": "Aztec Astronomy"})
+    report = scheduler.last_report
+
+    assert report["critical_path"] == ["root", "slow", "join"]
+    assert report["bottleneck"] == "slow"
+    assert len(report["stages"]) == 4
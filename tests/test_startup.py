@@ -0,0 +1,21 @@
+"""Tests for cold-start cost: deferred imports and lazily constructed agents."""
+from benchmark_imports import MODULES, deferred_imports, import_report
+from orchestrator import ExhibitionOrchestrator
+
+def test_cold_import_defers_heavy_packages():
+    """Importing the orchestrator and app tools loads no SDK, plotting or numeric packages."""
+    report = import_report(MODULES)
+
+    assert deferred_imports(report["loaded"]) == []
+    assert "agents.research_agent" not in report["loaded"]
+
+def test_agents_are_constructed_on_first_use(fake_gemini):
+    """A new orchestrator builds no agents; each is built once when first needed."""
+    orchestrator = ExhibitionOrchestrator()
+    assert orchestrator.agents == []
+
+    research = orchestrator.research
+
+    assert orchestrator.research is research
+    assert orchestrator.agents == [research]
+    assert orchestrator.get_system_stats()["total_executions"] == 0
@@ -0,0 +1,72 @@
+"""Tests for progressive exhibition generation."""
+import asyncio
+import pytest
+from orchestrator import ExhibitionOrchestrator
+
+def test_stream_yields_events_in_pipeline_order(fake_gemini):
+    """Events arrive per item as stages finish, ending with the full result."""
+    events = list(ExhibitionOrchestrator().stream_exhibition("Aztec Astronomy"))
+    types = [e["type"] for e in events]
+
+    assert types[0] == "topic"
+    assert types[-1] == "complete"
+    assert types.count("exhibit") == 8
+    assert types.count("room") == 4
+    assert types.count("narrative") == 4
+    assert types.index("room") < types.index("narrative") < types.index("evaluation")
+    assert all(e["elapsed"] >= 0 for e in events)
+    assert events[-1]["data"]["exhibition_id"] is not None
+
+def test_room_events_arrive_before_generation_finishes(fake_gemini):
+    """The first room is available while later stages are still running."""
+    fake_gemini.latency = 0.02
+    elapsed = {}
+    for event in ExhibitionOrchestrator().stream_exhibition("Aztec Astronomy"):
+        elapsed.setdefault(event["type"], event["elapsed"])
+
+    assert elapsed["room"] < elapsed["evaluation"] < elapsed["complete"]
+
+def test_stream_raises_pipeline_errors(fake_gemini, monkeypatch):
+    """A failing stage surfaces as an exception from the iterator."""
+    orchestrator = ExhibitionOrchestrator()
+    monkeypatch.setattr(orchestrator.exhibit_generator, "execute",
+                        lambda *args: (_ for _ in ()).throw(RuntimeError("boom")))
+
+    with pytest.raises(RuntimeError):
+        list(orchestrator.stream_exhibition("Aztec Astronomy"))
+
+def test_async_stream(fake_gemini):
+    """astream_exhibition yields the same event types on the event loop."""
+    async def collect():
+        return [e["type"] async for e in ExhibitionOrchestrator().astream_exhibition("Aztec Astronomy")]
+
+    types = asyncio.run(collect())
+
+    assert types[0] == "topic"
+    assert types.count("room") == 4
+    assert types[-1] == "complete"
+
+def test_exhibits_are_handed_over_before_the_response_finishes(fake_gemini):
+    """Each exhibit reaches the callback as soon as its object closes in the stream."""
+    from agents.exhibit_generator_agent import ExhibitGeneratorAgent
+    fake_gemini.chunk_latency = 0.002
+    agent = ExhibitGeneratorAgent()
+    seen = []
+
+    exhibits = agent.execute({"topic": "Aztec Astronomy", "on_exhibit": seen.append})
+
+    assert [e["name"] for e in exhibits] == [f"Artifact {i}" for i in range(8)]
+    assert seen == exhibits
+
+    stream = agent.stream_exhibits({"topic": "Aztec Astronomy"})
+    assert next(stream)["name"] == "Artifact 0"  # Served from the cache as one chunk
+
+def test_exhibit_events_stream_during_generation(fake_gemini):
+    """The first exhibit event precedes the timeline, which waits for all exhibits."""
+    fake_gemini.chunk_latency = 0.002
+    events = list(ExhibitionOrchestrator().stream_exhibition("Aztec Astronomy"))
+    exhibit_times = [e["elapsed"] for e in events if e["type"] == "exhibit"]
+    timeline_time = next(e["elapsed"] for e in events if e["type"] == "timeline")
+
+    assert [e["index"] for e in events if e["type"] == "exhibit"] == list(range(8))
+    assert exhibit_times[0] < exhibit_times[-1] <= timeline_time
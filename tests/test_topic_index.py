@@ -0,0 +1,87 @@
+"""Tests for near-duplicate topic reuse."""
+import numpy as np
+import pytest
+import config
+from utils.exhibition_store import ExhibitionRepository
+from utils.blob_store import BlobStore
+from utils.topic_index import TopicIndex, embed
+from orchestrator import ExhibitionOrchestrator
+
+def test_embedding_ignores_word_order_and_plurals():
+    """Rephrasings of a topic embed close together, different topics do not."""
+    vectors = embed(["Aztec Astronomy", "Astronomy of the Aztecs", "Roman Roads", "World War II"])
+
+    assert vectors[0] @ vectors[1] > 0.95
+    assert vectors[0] @ vectors[2] < 0.3
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+
+def test_index_syncs_incrementally_and_persists(tmp_path):
+    """New exhibitions are embedded once and the index is reloaded from disk."""
+    db_path = str(tmp_path / "exhibitions.db")
+    index_path = str(tmp_path / "topic_index.npz")
+    repository = ExhibitionRepository(db_path, BlobStore(str(tmp_path / "blobs")))
+    aztec = repository.store({"topic": "Aztec Astronomy", "overview": "Sky watching in Tenochtitlan."}, {})
+    repository.store({"topic": "Roman Roads"}, {})
+
+    index = TopicIndex(db_path, index_path)
+    assert index.sync() == 2
+    assert index.sync() == 0
+    assert index.find_similar("Astronomy of the Aztecs")[0] == aztec
+    assert index.find_similar("Jazz Age") is None
+
+    repository.store({"topic": "Jazz Age"}, {})
+    reloaded = TopicIndex(db_path, index_path)
+    assert len(reloaded.ids) == 2
+    assert reloaded.sync() == 1
+
+def test_orchestrator_reuses_near_duplicate_topic(fake_gemini):
+    """A rephrased topic returns the stored exhibition without calling Gemini."""
+    orchestrator = ExhibitionOrchestrator()
+    first = orchestrator.generate_exhibition("Aztec Astronomy")
+    calls = fake_gemini.count()
+
+    reused = orchestrator.generate_exhibition("Astronomy of the Aztecs")
+
+    assert fake_gemini.count() == calls
+    assert reused["exhibition_id"] == first["exhibition_id"]
+    assert reused["reused_from"]["requested_topic"] == "Astronomy of the Aztecs"
+    assert reused["exhibition"]["title"] == first["exhibition"]["title"]
+
+def test_reuse_can_be_disabled(fake_gemini, monkeypatch):
+    """Regeneration is forced per call or globally."""
+    orchestrator = ExhibitionOrchestrator()
+    first = orchestrator.generate_exhibition("Aztec Astronomy")
+
+    assert orchestrator.generate_exhibition("Aztec Astronomy", reuse=False)["exhibition_id"] != first["exhibition_id"]
+    monkeypatch.setattr(config, "TOPIC_REUSE_ENABLED", False)
+    assert "reused_from" not in orchestrator.generate_exhibition("Aztec Astronomy")
+
+def test_index_rebuilds_when_database_is_recreated(tmp_path):
+    """A saved index never maps ids onto the rows of a different database."""
+    db_path = tmp_path / "exhibitions.db"
+    index_path = str(tmp_path / "topic_index.npz")
+    repository = ExhibitionRepository(str(db_path), BlobStore(str(tmp_path / "blobs")))
+    repository.store({"topic": "Aztec Astronomy"}, {})
+    TopicIndex(str(db_path), index_path).sync()
+    repository.close()
+
+    db_path.unlink()
+    repository = ExhibitionRepository(str(db_path), BlobStore(str(tmp_path / "blobs")))
+    repository.store({"topic": "Roman Roads"}, {})
+    aztec = repository.store({"topic": "Aztec Astronomy"}, {})
+
+    index = TopicIndex(str(db_path), index_path)
+    assert index.similar("Aztec Astronomy") == [(aztec, pytest.approx(1.0))]
+    assert index.sync() == 0
+    assert TopicIndex(str(db_path), index_path).sync() == 0
+
+def test_reuse_rescores_the_stored_topic(fake_gemini, monkeypatch):
+    """An index match whose stored topic differs is regenerated, not served."""
+    orchestrator = ExhibitionOrchestrator()
+    roman = orchestrator.generate_exhibition("Roman Roads")
+    monkeypatch.setattr(TopicIndex, "similar", lambda self, topic, threshold=None, limit=5: [(roman["exhibition_id"], 1.0)])
+
+    result = orchestrator.generate_exhibition("Aztec Astronomy")
+
+    assert "reused_from" not in result
+    assert result["exhibition_id"] != roman["exhibition_id"]
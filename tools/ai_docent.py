@@ -1,15 +1,17 @@
 """AI Docent - Conversational guide that answers questions about exhibitions."""
-import google.generativeai as genai
+from utils.gemini_client import get_gemini_registry
 import config
 
 class AIDocent:
     """Interactive AI guide for exhibitions."""
     
     def __init__(self):
-        genai.configure(api_key=config.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel(config.MODEL_NAME)
         self.conversation_history = []
     
+    @property
+    def model(self):
+        return get_gemini_registry().model(config.MODEL_NAME)
+    
     def ask_question(self, question: str, exhibition: dict) -> str:
         """Ask the AI docent a question about the exhibition."""
         # Build context from exhibition
@@ -1,15 +1,58 @@
 """Knowledge Graph Generator - Creates visual connections between concepts."""
-import networkx as nx
 from typing import Dict, List
-import matplotlib.pyplot as plt
 import io
 import base64
+from utils.process_pool import Task, get_process_pool
+
+def render_graph_png(G) -> str:
+    """Lay out and draw a knowledge graph; returns the PNG as a base64 string."""
+    # Imported here: matplotlib and networkx take most of a second to import and only graph pages need them
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    
+    plt.figure(figsize=(12, 8))
+    pos = nx.spring_layout(G, k=0.5, iterations=50)
+    
+    # Color nodes by type
+    color_map = {
+        "topic": "#8B4513",
+        "room": "#D4AF37",
+        "exhibit": "#F5F5DC",
+        "concept": "#A0522D"
+    }
+    
+    node_colors = [color_map.get(G.nodes[node].get("node_type", "exhibit"), "#CCCCCC") for node in G.nodes()]
+    node_sizes = [G.nodes[node].get("size", 1000) for node in G.nodes()]
+    
+    nx.draw(G, pos, 
+            node_color=node_colors,
+            node_size=node_sizes,
+            with_labels=True,
+            font_size=8,
+            font_weight='bold',
+            edge_color='#CCCCCC',
+            linewidths=2,
+            alpha=0.9)
+    
+    plt.title("Exhibition Knowledge Graph", fontsize=16, fontweight='bold')
+    plt.axis('off')
+    plt.tight_layout()
+    
+    # Convert to base64 string
+    buf = io.BytesIO()
+    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
+    buf.seek(0)
+    img_str = base64.b64encode(buf.read()).decode()
+    plt.close()
+    
+    return img_str
 
 class KnowledgeGraphGenerator:
     """Tool to generate knowledge graphs from exhibition data."""
     
     def generate_graph(self, exhibition: Dict) -> Dict:
         """Generate a knowledge graph from exhibition."""
+        import networkx as nx
         G = nx.Graph()
         
         # Add central topic node
@@ -44,48 +87,12 @@ class KnowledgeGraphGenerator:
         }
     
     def visualize_graph(self, graph_data: Dict) -> str:
-        """Create a visualization of the knowledge graph."""
-        G = graph_data["graph"]
-        
-        plt.figure(figsize=(12, 8))
-        pos = nx.spring_layout(G, k=0.5, iterations=50)
-        
-        # Color nodes by type
-        color_map = {
-            "topic": "#8B4513",
-            "room": "#D4AF37",
-            "exhibit": "#F5F5DC",
-            "concept": "#A0522D"
-        }
-        
-        node_colors = [color_map.get(G.nodes[node].get("node_type", "exhibit"), "#CCCCCC") for node in G.nodes()]
-        node_sizes = [G.nodes[node].get("size", 1000) for node in G.nodes()]
-        
-        nx.draw(G, pos, 
-                node_color=node_colors,
-                node_size=node_sizes,
-                with_labels=True,
-                font_size=8,
-                font_weight='bold',
-                edge_color='#CCCCCC',
-                linewidths=2,
-                alpha=0.9)
-        
-        plt.title("Exhibition Knowledge Graph", fontsize=16, fontweight='bold')
-        plt.axis('off')
-        plt.tight_layout()
-        
-        # Convert to base64 string
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        img_str = base64.b64encode(buf.read()).decode()
-        plt.close()
-        
-        return img_str
+        """Create a visualization of the knowledge graph (rendered on the process pool)."""
+        return get_process_pool().run(Task(render_graph_png, graph_data["graph"]))
     
     def get_graph_metrics(self, graph_data: Dict) -> Dict:
         """Calculate graph metrics."""
+        import networkx as nx
         G = graph_data["graph"]
         
         return {
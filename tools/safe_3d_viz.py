@@ -1,5 +1,4 @@
 """Safe 3D visualization - optional enhancement that won't break the system."""
-import pandas as pd
 
 def create_timeline_3d(timeline_events):
     """Create optional 3D timeline visualization."""
@@ -1,5 +1,4 @@
 """Google Search Tool for research."""
-import requests
 from typing import List, Dict
 import config
 
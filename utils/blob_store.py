@@ -0,0 +1,158 @@
+"""Content-addressed storage for generated image bytes."""
+import base64
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+import config
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write to a temporary file and rename so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+class BlobStore:
+    """
+    Binary blobs stored once each under their SHA-256 digest.
+
+    Blobs live in files sharded by the first two hex characters of the
+    digest. Writing the same bytes twice stores them once; exhibitions keep
+    only the digest and load the bytes when they are displayed or exported.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or config.BLOB_STORE_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        """
+        Store data if it is not already present.
+
+        Returns:
+            SHA-256 hex digest referencing the blob
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            return digest
+
+        write_atomic(path, data)
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        try:
+            return self.path(digest).read_bytes()
+        except OSError:
+            return None
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def delete(self, digest: str):
+        self.path(digest).unlink(missing_ok=True)
+
+    def iter_digests(self) -> Iterator[str]:
+        """Yield the digest of every stored blob."""
+        for shard in self.root.iterdir():
+            if shard.is_dir() and len(shard.name) == 2:
+                for blob in shard.iterdir():
+                    if not blob.name.startswith(".tmp-"):
+                        yield blob.name
+
+    def gc(self, referenced: Iterable[str], grace_seconds: Optional[float] = None) -> int:
+        """
+        Delete blobs not in referenced.
+
+        Blobs younger than grace_seconds are kept so images written by an
+        exhibition that is still being generated survive.
+
+        Returns:
+            Number of deleted blobs
+        """
+        referenced = set(referenced)
+        grace = config.BLOB_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        cutoff = time.time() - grace
+        deleted = 0
+        for digest in list(self.iter_digests()):
+            if digest in referenced:
+                continue
+            path = self.path(digest)
+            try:
+                if path.stat().st_mtime <= cutoff:
+                    path.unlink()
+                    deleted += 1
+            except OSError:
+                continue
+        return deleted
+
+    def stats(self) -> Dict[str, int]:
+        """Blob count and total size in bytes."""
+        count = size = 0
+        for digest in self.iter_digests():
+            count += 1
+            size += self.path(digest).stat().st_size
+        return {"blobs": count, "bytes": size}
+
+
+def externalize_image(image, store: BlobStore):
+    """
+    Return a copy of an image dict with inline base64 data moved into store.
+
+    Anything that is not a dict with an image_base64 field is returned as is.
+    """
+    if not isinstance(image, dict) or not image.get("image_base64"):
+        return image
+    image = dict(image)
+    image["blob"] = store.put(base64.b64decode(image.pop("image_base64")))
+    return image
+
+
+def load_image_bytes(image: Dict, store: Optional[BlobStore] = None) -> Optional[bytes]:
+    """Image bytes for a blob reference or inline base64 image, read on demand."""
+    if not isinstance(image, dict):
+        return None
+    if image.get("blob"):
+        return (store or get_blob_store()).get(image["blob"])
+    if image.get("image_base64"):
+        return base64.b64decode(image["image_base64"])
+    return None
+
+
+def image_data_uri(image: Dict, store: Optional[BlobStore] = None) -> Optional[str]:
+    """data: URI for embedding an image in exported HTML."""
+    data = load_image_bytes(image, store)
+    if data is None:
+        return None
+    mime_type = image.get("mime_type", "image/jpeg")
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+# Global blob store instance
+_blob_store_instance = None
+_blob_store_lock = threading.Lock()
+
+def get_blob_store() -> BlobStore:
+    """Get or create the blob store for config.BLOB_STORE_DIR."""
+    global _blob_store_instance
+    root = Path(config.BLOB_STORE_DIR)
+    if _blob_store_instance is None or _blob_store_instance.root != root:
+        with _blob_store_lock:
+            if _blob_store_instance is None or _blob_store_instance.root != root:
+                _blob_store_instance = BlobStore(str(root))
+    return _blob_store_instance
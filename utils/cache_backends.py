@@ -0,0 +1,177 @@
+"""Disk storage backends for CacheManager."""
+import atexit
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import config
+
+
+class DirectoryBackend:
+    """One pickle file per entry (the original cache layout)."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        cache_file = self.cache_dir / f"{key}.pkl"
+        try:
+            return cache_file.read_bytes()
+        except OSError:
+            return None
+
+    def set(self, key: str, payload: bytes, expires_at: float):
+        (self.cache_dir / f"{key}.pkl").write_bytes(payload)
+
+    def delete(self, key: str):
+        try:
+            (self.cache_dir / f"{key}.pkl").unlink()
+        except OSError:
+            pass
+
+    def clear(self):
+        for cache_file in self.cache_dir.glob("*.pkl"):
+            try:
+                cache_file.unlink()
+            except Exception:
+                pass
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    """
+    All entries in one indexed SQLite file.
+
+    Writes are buffered and flushed in batches (on size, on a timer, on read
+    of a pending key and at exit). A background thread also deletes expired
+    rows so the file does not grow with dead entries.
+    """
+
+    def __init__(self, db_path: str, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None, compaction_interval: Optional[float] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size or config.CACHE_BATCH_SIZE
+        self.flush_interval = flush_interval or config.CACHE_FLUSH_INTERVAL
+        self.compaction_interval = compaction_interval or config.CACHE_COMPACTION_INTERVAL
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries(expires_at)")
+        self._conn.commit()
+
+        self._lock = threading.RLock()
+        self._pending: Dict[str, Tuple[bytes, float]] = {}
+        self._stop = threading.Event()
+        self._worker = None
+        atexit.register(self.close)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key][0]
+            row = self._conn.execute("SELECT value FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, payload: bytes, expires_at: float):
+        with self._lock:
+            self._pending[key] = (payload, expires_at)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+        self._ensure_worker()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._pending.pop(key, None)
+            self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.commit()
+
+    def flush(self):
+        """Write buffered entries in one transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            rows = [(key, payload, expires_at) for key, (payload, expires_at) in self._pending.items()]
+            self._pending.clear()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def compact(self) -> int:
+        """Delete expired rows; returns how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            self.flush()
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            try:
+                self.flush()
+                self._conn.close()
+            except sqlite3.ProgrammingError:
+                pass  # Already closed
+
+    def _ensure_worker(self):
+        """Start the background flush/compaction thread on first write."""
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run_worker, daemon=True)
+                    self._worker.start()
+
+    def _run_worker(self):
+        last_compaction = time.time()
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                if time.time() - last_compaction >= self.compaction_interval:
+                    self.compact()
+                    last_compaction = time.time()
+            except sqlite3.ProgrammingError:
+                return  # Connection closed
+
+
+def iter_directory_entries(cache_dir: str) -> Iterator[Tuple[str, bytes]]:
+    """Yield (key, payload) for every .pkl entry in a directory cache."""
+    for cache_file in Path(cache_dir).glob("*.pkl"):
+        try:
+            yield cache_file.stem, cache_file.read_bytes()
+        except OSError:
+            continue
+
+
+def create_backend(cache_dir: str, backend: Optional[str] = None):
+    """Create the configured disk backend for a cache directory."""
+    backend = backend or config.CACHE_BACKEND
+    if backend == "directory":
+        return DirectoryBackend(cache_dir)
+    if backend == "sqlite":
+        return SQLiteBackend(str(Path(cache_dir) / "cache.db"))
+    raise ValueError(f"Unknown cache backend: {backend}")
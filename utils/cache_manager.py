@@ -2,80 +2,258 @@
 import hashlib
 import json
 import pickle
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Optional
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
 from functools import wraps
 import time
+import config
+from utils.cache_backends import create_backend, iter_directory_entries
 
 class CacheManager:
     """Manages caching of expensive operations."""
     
-    def __init__(self, cache_dir: str = "data/cache"):
+    def __init__(self, cache_dir: str = "data/cache", max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, backend: Optional[str] = None):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.memory_cache = {}
+        self.backend = create_backend(cache_dir, backend)
         self.cache_ttl = 3600  # 1 hour default TTL
+        self.stale_ttl = config.CACHE_STALE_TTL  # How long an expired value may still be served
+        
+        # LRU memory tier: key -> (value, expires_at, approximate size in bytes)
+        self.memory_cache = OrderedDict()
+        self.max_entries = max_entries or config.CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or config.CACHE_MAX_BYTES
+        self.memory_bytes = 0
+        self._last_sweep = time.time()
+        self._lock = threading.RLock()
+        self._inflight: Dict[str, Future] = {}
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stale_hits": 0,
+            "refreshes": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
     
     def _get_cache_key(self, key: str) -> str:
         """Generate a hash-based cache key."""
         return hashlib.md5(key.encode()).hexdigest()
     
     def get(self, key: str) -> Optional[Any]:
-        """Get value from cache."""
-        # Check memory cache first
-        if key in self.memory_cache:
-            cached_data, timestamp = self.memory_cache[key]
-            if time.time() - timestamp < self.cache_ttl:
-                return cached_data
-            else:
-                del self.memory_cache[key]
+        """Get a fresh value from cache."""
+        entry = self._lookup(key)
+        if entry is None or entry[1] <= time.time():
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        
+        self._count_served(entry, "hits")
+        return entry[0]
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Set value in cache.
+        
+        Args:
+            ttl: Seconds until this entry expires (defaults to cache_ttl)
+        """
+        timestamp = time.time()
+        expires_at = timestamp + (ttl if ttl is not None else self.cache_ttl)
+        
+        try:
+            payload = pickle.dumps((value, timestamp, expires_at))
+        except Exception:
+            return  # Unpicklable values are not cached
+        
+        # Store in memory cache
+        with self._lock:
+            self._sweep_expired()
+            self._store_memory(key, value, expires_at, len(payload))
+        
+        # Store in disk cache; keep the row through the stale window
+        try:
+            self.backend.set(self._get_cache_key(key), payload, expires_at + self.stale_ttl)
+        except Exception:
+            pass  # Fail silently for cache writes
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value for key, computing it at most once concurrently.
+        
+        A fresh entry is returned directly. An expired entry still inside the
+        stale window is returned immediately while one background thread
+        refreshes it. On a miss, concurrent callers for the same key share a
+        single compute() call.
+        """
+        entry = self._lookup(key)
+        now = time.time()
+        
+        if entry is not None and entry[1] > now:
+            self._count_served(entry, "hits")
+            return entry[0]
+        
+        if entry is not None:
+            self._count_served(entry, "stale_hits")
+            self._refresh_in_background(key, compute, ttl)
+            return entry[0]
+        
+        with self._lock:
+            self._counters["misses"] += 1
+        return self._single_flight(key, compute, ttl).result()
+    
+    def _single_flight(self, key: str, compute: Callable[[], Any], ttl: Optional[float]) -> Future:
+        """Join the in-flight computation for key, or start one in this thread."""
+        with self._lock:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self._counters["coalesced"] += 1
+                return flight
+            flight = Future()
+            self._inflight[key] = flight
+        
+        self._compute(key, compute, ttl, flight)
+        return flight
+    
+    def _refresh_in_background(self, key: str, compute: Callable[[], Any], ttl: Optional[float]):
+        """Start one refresh thread for a stale key unless one is already running."""
+        with self._lock:
+            if key in self._inflight:
+                return
+            flight = Future()
+            self._inflight[key] = flight
+            self._counters["refreshes"] += 1
+        
+        threading.Thread(target=self._compute, args=(key, compute, ttl, flight), daemon=True).start()
+    
+    def _compute(self, key: str, compute: Callable[[], Any], ttl: Optional[float], flight: Future):
+        """Run compute, cache a non-None result and resolve the flight."""
+        try:
+            result = compute()
+            if result is not None:
+                self.set(key, result, ttl)
+            flight.set_result(result)
+        except Exception as e:
+            flight.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+    
+    def _count_served(self, entry: Tuple[Any, float, str], counter: str):
+        """Count a served entry once, as a hit or stale hit and against the tier it came from."""
+        with self._lock:
+            self._counters[counter] += 1
+            self._counters[f"{entry[2]}_hits"] += 1
+    
+    def _lookup(self, key: str) -> Optional[Tuple[Any, float, str]]:
+        """
+        Find (value, expires_at, tier) in memory or on disk, including stale entries.
+        
+        Counts nothing; callers decide whether the entry is served.
+        """
+        now = time.time()
+        with self._lock:
+            self._sweep_expired()
+            
+            # Check memory cache first
+            if key in self.memory_cache:
+                cached_data, expires_at, _ = self.memory_cache[key]
+                if now < expires_at + self.stale_ttl:
+                    self.memory_cache.move_to_end(key)
+                    return cached_data, expires_at, "memory"
+                self._remove_memory(key)
+                self._counters["expirations"] += 1
         
         # Check disk cache
         cache_key = self._get_cache_key(key)
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
+        payload = self.backend.get(cache_key)
         
-        if cache_file.exists():
+        if payload is not None:
             try:
-                with open(cache_file, 'rb') as f:
-                    cached_data, timestamp = pickle.load(f)
+                cached_data, expires_at = self._decode(payload)
                 
-                if time.time() - timestamp < self.cache_ttl:
+                if now < expires_at + self.stale_ttl:
                     # Restore to memory cache
-                    self.memory_cache[key] = (cached_data, timestamp)
-                    return cached_data
+                    with self._lock:
+                        self._store_memory(key, cached_data, expires_at, len(payload))
+                    return cached_data, expires_at, "disk"
                 else:
-                    cache_file.unlink()  # Remove expired cache
+                    self.backend.delete(cache_key)  # Remove expired cache
             except Exception:
                 pass
         
         return None
     
-    def set(self, key: str, value: Any):
-        """Set value in cache."""
-        timestamp = time.time()
+    def _decode(self, payload: bytes) -> Tuple[Any, float]:
+        """Unpickle an entry; entries written before per-entry TTLs use cache_ttl."""
+        entry = pickle.loads(payload)
+        if len(entry) == 2:
+            value, timestamp = entry
+            return value, timestamp + self.cache_ttl
+        value, _, expires_at = entry
+        return value, expires_at
+    
+    def stats(self) -> Dict[str, Any]:
+        """Memory tier size and hit, miss, eviction and expiry counters."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({
+                "memory_entries": len(self.memory_cache),
+                "memory_bytes": self.memory_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "inflight": len(self._inflight)
+            })
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        return stats
+    
+    def _store_memory(self, key: str, value: Any, expires_at: float, size: int):
+        """Insert into the memory tier and evict least recently used entries over budget."""
+        if key in self.memory_cache:
+            self._remove_memory(key)
+        if size > self.max_bytes:
+            return  # Too large for the memory tier; disk still has it
         
-        # Store in memory cache
-        self.memory_cache[key] = (value, timestamp)
+        self.memory_cache[key] = (value, expires_at, size)
+        self.memory_bytes += size
         
-        # Store in disk cache
-        cache_key = self._get_cache_key(key)
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
+        while len(self.memory_cache) > self.max_entries or self.memory_bytes > self.max_bytes:
+            oldest = next(iter(self.memory_cache))
+            self._remove_memory(oldest)
+            self._counters["evictions"] += 1
+    
+    def _remove_memory(self, key: str):
+        _, _, size = self.memory_cache.pop(key)
+        self.memory_bytes -= size
+    
+    def _sweep_expired(self):
+        """Drop memory entries past their stale window, at most once per sweep interval."""
+        now = time.time()
+        if now - self._last_sweep < config.CACHE_SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
         
-        try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump((value, timestamp), f)
-        except Exception:
-            pass  # Fail silently for cache writes
+        expired = [k for k, (_, expires_at, _) in self.memory_cache.items()
+                   if now >= expires_at + self.stale_ttl]
+        for key in expired:
+            self._remove_memory(key)
+        self._counters["expirations"] += len(expired)
     
     def clear(self):
         """Clear all caches."""
-        self.memory_cache.clear()
+        with self._lock:
+            self.memory_cache.clear()
+            self.memory_bytes = 0
         
-        for cache_file in self.cache_dir.glob("*.pkl"):
-            try:
-                cache_file.unlink()
-            except Exception:
-                pass
+        self.backend.clear()
     
     def cached(self, ttl: Optional[int] = None):
         """Decorator for caching function results."""
@@ -85,35 +263,64 @@ class CacheManager:
                 # Create cache key from function name and arguments
                 cache_key = f"{func.__name__}:{json.dumps([args, kwargs], sort_keys=True)}"
                 
-                # Try to get from cache
-                cached_result = self.get(cache_key)
-                if cached_result is not None:
-                    return cached_result
-                
-                # Execute function and cache result
-                result = func(*args, **kwargs)
-                
-                # Use custom TTL if provided
-                old_ttl = self.cache_ttl
-                if ttl is not None:
-                    self.cache_ttl = ttl
-                
-                self.set(cache_key, result)
-                
-                # Restore original TTL
-                self.cache_ttl = old_ttl
-                
-                return result
+                return self.get_or_compute(cache_key, lambda: func(*args, **kwargs), ttl=ttl)
             
             return wrapper
         return decorator
 
-# Global cache instance
+def migrate_directory_cache(source_dir: str, target: CacheManager) -> int:
+    """
+    Import .pkl entries from a directory cache into target's backend.
+    
+    Entries keep their original timestamps; ones already expired are skipped.
+    
+    Returns:
+        Number of imported entries
+    """
+    imported = 0
+    now = time.time()
+    for cache_key, payload in iter_directory_entries(source_dir):
+        try:
+            _, expires_at = target._decode(payload)
+        except Exception:
+            continue  # Corrupt or foreign file
+        if expires_at <= now:
+            continue
+        target.backend.set(cache_key, payload, expires_at + target.stale_ttl)
+        imported += 1
+    
+    if hasattr(target.backend, "flush"):
+        target.backend.flush()
+    return imported
+
+def stable_hash(payload: Any) -> str:
+    """Content hash of a JSON-serializable payload, independent of key order."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+# Global cache instances
 _cache_instance = None
+_cache_lock = threading.Lock()
+_response_cache_instance = None
+_response_cache_lock = threading.Lock()
 
 def get_cache() -> CacheManager:
     """Get or create global cache instance."""
     global _cache_instance
     if _cache_instance is None:
-        _cache_instance = CacheManager()
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = CacheManager()
     return _cache_instance
+
+def get_response_cache() -> CacheManager:
+    """Get or create the cache for LLM responses."""
+    global _response_cache_instance
+    if _response_cache_instance is None:
+        with _response_cache_lock:
+            if _response_cache_instance is None:
+                cache = CacheManager(config.LLM_CACHE_DIR)
+                cache.cache_ttl = config.LLM_CACHE_TTL
+                # Published only once configured
+                _response_cache_instance = cache
+    return _response_cache_instance
@@ -0,0 +1,62 @@
+"""Bounded-concurrency fan-out helpers for per-room and per-exhibit calls."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+from utils.logger import get_logger
+import config
+
+
+def fan_out(func: Callable[[Any], Any], items: Sequence[Any], max_workers: Optional[int] = None,
+            fallback: Optional[Callable[[Any, Exception], Any]] = None) -> List[Any]:
+    """
+    Apply func to every item on a bounded thread pool.
+
+    Args:
+        func: Called once per item
+        items: Inputs; results are returned in the same order
+        max_workers: Concurrency bound (defaults to config.FAN_OUT_MAX_WORKERS)
+        fallback: ``fallback(item, error)`` supplies the result for a failed item;
+            without it a failed item yields None. Other items are unaffected.
+
+    Returns:
+        One result per item, in input order
+    """
+    items = list(items)
+    workers = min(len(items), max_workers or config.FAN_OUT_MAX_WORKERS)
+    if workers <= 1:
+        return [_call(func, item, fallback) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_call, func, item, fallback) for item in items]
+        return [future.result() for future in futures]
+
+
+async def afan_out(func: Callable[[Any], Awaitable[Any]], items: Sequence[Any],
+                   max_concurrency: Optional[int] = None,
+                   fallback: Optional[Callable[[Any, Exception], Any]] = None) -> List[Any]:
+    """Async counterpart of fan_out() for coroutine functions."""
+    slots = asyncio.Semaphore(max_concurrency or config.FAN_OUT_MAX_WORKERS)
+
+    async def bounded(item: Any) -> Any:
+        async with slots:
+            try:
+                return await func(item)
+            except Exception as e:
+                return _recover(item, e, fallback)
+
+    return list(await asyncio.gather(*[bounded(item) for item in items]))
+
+
+def _call(func: Callable, item: Any, fallback: Optional[Callable]) -> Any:
+    """Run func on one item, recovering from failures."""
+    try:
+        return func(item)
+    except Exception as e:
+        return _recover(item, e, fallback)
+
+
+def _recover(item: Any, error: Exception, fallback: Optional[Callable]) -> Any:
+    """Log a per-item failure and return its fallback result."""
+    get_logger().logger.warning(f"Fan-out item failed, using fallback: {str(error)}")
+    return fallback(item, error) if fallback else None
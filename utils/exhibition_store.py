@@ -0,0 +1,578 @@
+"""SQLite repository for stored exhibitions."""
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import config
+from utils.blob_store import BlobStore, externalize_image, get_blob_store
+from utils.renditions import prune_renditions
+
+SCHEMA_VERSION = 5
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache reuses the prepared form on every call.
+INSERT_EXHIBITION = """
+    INSERT INTO exhibitions (topic, title, created_at, quality_score, room_count, exhibit_count, profile, data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_ROOM = """
+    INSERT INTO exhibition_rooms (exhibition_id, position, title, theme, exhibit_count, data)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+INSERT_EXHIBIT = """
+    INSERT INTO exhibition_exhibits (exhibition_id, room_position, position, name, time_period, data)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+INSERT_IMAGE = """
+    INSERT INTO exhibition_images (exhibition_id, kind, room_position, exhibit_position, data)
+    VALUES (?, ?, ?, ?, ?)
+"""
+SELECT_EXHIBITION = "SELECT room_count, data FROM exhibitions WHERE id = ?"
+SELECT_ROOMS = """
+    SELECT position, exhibit_count, data FROM exhibition_rooms
+    WHERE exhibition_id = ? ORDER BY position
+"""
+SELECT_EXHIBITS = """
+    SELECT room_position, position, data FROM exhibition_exhibits
+    WHERE exhibition_id = ? ORDER BY room_position, position
+"""
+SELECT_ROOM_EXHIBITS = """
+    SELECT room_position, position, data FROM exhibition_exhibits
+    WHERE exhibition_id = ? AND room_position = ? ORDER BY position
+"""
+SELECT_IMAGES = """
+    SELECT kind, room_position, exhibit_position, data FROM exhibition_images
+    WHERE exhibition_id = ?
+"""
+SELECT_IMAGE_BLOBS = """
+    SELECT DISTINCT json_extract(data, '$.blob') FROM exhibition_images
+    WHERE json_extract(data, '$.blob') IS NOT NULL
+"""
+SELECT_EXHIBIT_IMAGES = """
+    SELECT kind, room_position, exhibit_position, data FROM exhibition_images
+    WHERE exhibition_id = ? AND kind = 'exhibit'
+"""
+SELECT_POSTER_IMAGES = """
+    SELECT exhibition_id, data FROM exhibition_images
+    WHERE kind = 'poster' AND exhibition_id IN (SELECT value FROM json_each(?))
+"""
+INSERT_SEARCH_DOCUMENT = """
+    INSERT INTO exhibitions_fts (rowid, title, topic, curator_notes, narratives, exhibits)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+SUMMARY_COLUMNS = "id, topic, title, created_at, quality_score, room_count, exhibit_count, profile"
+SELECT_SUMMARY = f"SELECT {SUMMARY_COLUMNS} FROM exhibitions WHERE id = ?"
+LIST_EXHIBITIONS = f"""
+    SELECT {SUMMARY_COLUMNS}
+    FROM exhibitions
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+# Every match is ranked by BM25 (the table's configured rank); the snippet
+# is computed only for the returned page.
+SEARCH_EXHIBITIONS = """
+    WITH page AS (
+        SELECT rowid, rank FROM exhibitions_fts
+        WHERE exhibitions_fts MATCH :query
+        ORDER BY rank
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT e.id, e.topic, e.title, e.created_at, e.quality_score, e.room_count, e.exhibit_count, e.profile,
+           snippet(exhibitions_fts, -1, '[', ']', '…', 16), page.rank
+    FROM page
+    JOIN exhibitions_fts ON exhibitions_fts.rowid = page.rowid
+    JOIN exhibitions e ON e.id = page.rowid
+    WHERE exhibitions_fts MATCH :query
+    ORDER BY page.rank
+"""
+
+# Image fields split out of the document, by owner
+POSTER_IMAGE = "poster_image"
+ROOM_IMAGE = "entrance_image"
+EXHIBIT_IMAGE = "generated_image"
+
+
+class ExhibitionRepository:
+    """
+    Thread-safe access to the exhibitions database.
+
+    Each thread reuses one connection for the lifetime of the repository.
+    The database runs in WAL mode so readers (e.g. the app sidebar) never
+    block on a concurrent write.
+
+    Rooms, exhibits and images are stored in child tables; the exhibitions
+    row keeps the indexed summary columns and the rest of the document, so
+    listing and filtering never parse room or image data. Image bytes live
+    in the blob store and rows only hold their digests.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, blob_store: Optional[BlobStore] = None):
+        self.db_path = db_path or config.DATABASE_PATH
+        self.blob_store = blob_store or get_blob_store()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._init_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False,
+                                   cached_statements=config.DB_STATEMENT_CACHE_SIZE)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _init_schema(self):
+        """Apply pending schema migrations, one transaction per version."""
+        conn = self._connection()
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+
+        for version, migrate in MIGRATIONS:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-read inside the write lock so concurrent processes migrate once
+                if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+                    conn.rollback()
+                    continue
+                migrate(conn, self.blob_store)
+                conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def schema_version(self) -> int:
+        """Migration version the database is at."""
+        return self._connection().execute("PRAGMA user_version").fetchone()[0]
+
+    def store(self, exhibition: Dict, evaluation: Dict, profile: Optional[str] = None) -> int:
+        """
+        Insert an exhibition.
+
+        Args:
+            exhibition: Complete exhibition data
+            evaluation: Evaluation results (overall_score is indexed)
+            profile: Execution profile it was generated with
+
+        Returns:
+            New exhibition ID
+        """
+        conn = self._connection()
+        with conn:
+            return _insert(conn, exhibition, evaluation.get("overall_score", 0.0),
+                           datetime.now().isoformat(), blob_store=self.blob_store, profile=profile)
+
+    def get(self, exhibition_id: int) -> Optional[Dict]:
+        """Retrieve exhibition by ID, reassembled from its rooms, exhibits and images."""
+        return _load(self._connection(), exhibition_id)
+
+    def get_exhibits(self, exhibition_id: int, room_index: Optional[int] = None) -> List[Dict]:
+        """
+        Exhibits of one exhibition (optionally one room) with their images,
+        without loading the rest of the document.
+        """
+        conn = self._connection()
+        if room_index is None:
+            rows = conn.execute(SELECT_EXHIBITS, (exhibition_id,)).fetchall()
+        else:
+            rows = conn.execute(SELECT_ROOM_EXHIBITS, (exhibition_id, room_index)).fetchall()
+
+        exhibits = {}
+        for room_position, position, data in rows:
+            exhibits[(room_position, position)] = json.loads(data)
+        for _, room_position, exhibit_position, image_data in conn.execute(SELECT_EXHIBIT_IMAGES, (exhibition_id,)):
+            exhibit = exhibits.get((room_position, exhibit_position))
+            if exhibit is not None:
+                exhibit[EXHIBIT_IMAGE] = json.loads(image_data)
+        return list(exhibits.values())
+
+    def get_poster_images(self, exhibition_ids: List[int]) -> Dict[int, Dict]:
+        """Poster image references of several exhibitions in one query, for list previews."""
+        rows = self._connection().execute(SELECT_POSTER_IMAGES, (json.dumps(exhibition_ids),)).fetchall()
+        return {exhibition_id: json.loads(data) for exhibition_id, data in rows}
+
+    def get_summary(self, exhibition_id: int) -> Optional[Dict]:
+        """Summary columns of one exhibition."""
+        row = self._connection().execute(SELECT_SUMMARY, (exhibition_id,)).fetchone()
+        return _summary(row) if row else None
+
+    def list_recent(self, limit: int = 10) -> List[Dict]:
+        """List recent exhibitions without loading their contents."""
+        rows = self._connection().execute(LIST_EXHIBITIONS, (limit,)).fetchall()
+        return [_summary(row) for row in rows]
+
+    def find_exhibitions(self, topic: Optional[str] = None, min_score: Optional[float] = None,
+                         limit: int = 10, offset: int = 0) -> List[Dict]:
+        """
+        Filter exhibitions by topic (case-insensitive) and minimum quality score.
+
+        Returns:
+            Summaries, newest first
+        """
+        clauses, params = [], []
+        if topic is not None:
+            clauses.append("topic = ? COLLATE NOCASE")
+            params.append(topic)
+        if min_score is not None:
+            clauses.append("quality_score >= ?")
+            params.append(min_score)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        rows = self._connection().execute(f"""
+            SELECT {SUMMARY_COLUMNS}
+            FROM exhibitions
+            {where}
+            ORDER BY created_at DESC
+            LIMIT ? OFFSET ?
+        """, (*params, limit, offset)).fetchall()
+        return [_summary(row) for row in rows]
+
+    def search_exhibitions(self, query: str, limit: int = 10, offset: int = 0) -> List[Dict]:
+        """
+        Full-text search over titles, topics, curator notes, room narratives
+        and exhibit descriptions and facts.
+
+        Args:
+            query: Free text; every word must match (after stemming)
+
+        Returns:
+            Summaries with a highlighted snippet, best BM25 match first
+        """
+        match = _match_expression(query)
+        if not match:
+            return []
+
+        rows = self._connection().execute(SEARCH_EXHIBITIONS, {
+            "query": match,
+            "limit": limit,
+            "offset": offset
+        }).fetchall()
+        results = []
+        for row in rows:
+            summary = _summary(row)
+            summary["snippet"] = row[8]
+            summary["rank"] = row[9]
+            results.append(summary)
+        return results
+
+    def referenced_blobs(self) -> Set[str]:
+        """Digests of every blob referenced by a stored image."""
+        return {row[0] for row in self._connection().execute(SELECT_IMAGE_BLOBS)}
+
+    def collect_garbage(self, grace_seconds: Optional[float] = None) -> int:
+        """
+        Delete blobs no stored exhibition references, and their renditions.
+
+        Returns:
+            Number of deleted blobs
+        """
+        deleted = self.blob_store.gc(self.referenced_blobs(), grace_seconds)
+        prune_renditions(self.blob_store)
+        return deleted
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def _summary(row: Tuple) -> Dict:
+    return {
+        "id": row[0],
+        "topic": row[1],
+        "title": row[2],
+        "created_at": row[3],
+        "quality_score": row[4],
+        "room_count": row[5],
+        "exhibit_count": row[6],
+        "profile": row[7]
+    }
+
+
+def _match_expression(query: str) -> str:
+    """Turn free text into an FTS5 query of quoted terms, so user input is never parsed as syntax."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return ""
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def _search_document(exhibition: Dict) -> Tuple[str, str, str, str, str]:
+    """Text of each indexed column: title, topic, curator notes, narratives, exhibits."""
+    narratives, exhibits = [], []
+    rooms = exhibition.get("rooms")
+    for room in rooms if isinstance(rooms, list) else []:
+        if not isinstance(room, dict):
+            continue
+        narratives.append(str(room.get("narrative") or ""))
+        for exhibit in room.get("exhibits") or []:
+            if isinstance(exhibit, dict):
+                facts = exhibit.get("facts")
+                exhibits.append(" ".join([
+                    str(exhibit.get("name") or ""),
+                    str(exhibit.get("description") or ""),
+                    *(str(fact) for fact in (facts if isinstance(facts, list) else []))
+                ]))
+    return (
+        str(exhibition.get("title") or ""),
+        str(exhibition.get("topic") or ""),
+        str(exhibition.get("curator_notes") or ""),
+        "\n".join(narratives),
+        "\n".join(exhibits)
+    )
+
+
+def _split(exhibition: Dict) -> Tuple[Dict, Optional[List[Tuple[Dict, Optional[List[Dict]]]]], List[Tuple]]:
+    """
+    Split an exhibition into its document shell, rooms and images.
+
+    The input is not modified. Rooms stay in the shell when they are not a
+    list of dicts.
+
+    Returns:
+        (shell, [(room, exhibits or None)] or None, [(kind, room_position, exhibit_position, image)])
+    """
+    shell = dict(exhibition)
+    images = []
+    if POSTER_IMAGE in shell:
+        images.append(("poster", None, None, shell.pop(POSTER_IMAGE)))
+
+    rooms = shell.get("rooms")
+    if not isinstance(rooms, list) or not all(isinstance(r, dict) for r in rooms):
+        return shell, None, images
+    del shell["rooms"]
+
+    split_rooms = []
+    for room_position, room in enumerate(rooms):
+        room = dict(room)
+        if ROOM_IMAGE in room:
+            images.append(("room", room_position, None, room.pop(ROOM_IMAGE)))
+
+        exhibits = room.get("exhibits")
+        if isinstance(exhibits, list) and all(isinstance(e, dict) for e in exhibits):
+            del room["exhibits"]
+            split_exhibits = []
+            for position, exhibit in enumerate(exhibits):
+                exhibit = dict(exhibit)
+                if EXHIBIT_IMAGE in exhibit:
+                    images.append(("exhibit", room_position, position, exhibit.pop(EXHIBIT_IMAGE)))
+                split_exhibits.append(exhibit)
+            split_rooms.append((room, split_exhibits))
+        else:
+            split_rooms.append((room, None))
+
+    return shell, split_rooms, images
+
+
+def _load(conn: sqlite3.Connection, exhibition_id: int) -> Optional[Dict]:
+    """Reassemble one exhibition from its row and child rows."""
+    row = conn.execute(SELECT_EXHIBITION, (exhibition_id,)).fetchone()
+    if not row:
+        return None
+
+    room_count, data = row
+    exhibition = json.loads(data)
+    if room_count is None:
+        return exhibition  # Rooms were not normalizable and stayed in the document
+
+    rooms = []
+    for _, exhibit_count, room_data in conn.execute(SELECT_ROOMS, (exhibition_id,)):
+        room = json.loads(room_data)
+        if exhibit_count is not None:
+            room["exhibits"] = []
+        rooms.append(room)
+    exhibition["rooms"] = rooms
+
+    for room_position, _, exhibit_data in conn.execute(SELECT_EXHIBITS, (exhibition_id,)):
+        rooms[room_position]["exhibits"].append(json.loads(exhibit_data))
+
+    for kind, room_position, exhibit_position, image_data in conn.execute(SELECT_IMAGES, (exhibition_id,)):
+        image = json.loads(image_data)
+        if kind == "poster":
+            exhibition[POSTER_IMAGE] = image
+        elif kind == "room":
+            rooms[room_position][ROOM_IMAGE] = image
+        else:
+            rooms[room_position]["exhibits"][exhibit_position][EXHIBIT_IMAGE] = image
+
+    return exhibition
+
+
+def _insert(conn: sqlite3.Connection, exhibition: Dict, quality_score: float, created_at: str,
+            exhibition_id: Optional[int] = None, blob_store: Optional[BlobStore] = None,
+            profile: Optional[str] = None) -> int:
+    """
+    Write one exhibition and its child rows; the caller owns the transaction.
+
+    Inline base64 images are moved into blob_store first.
+    """
+    shell, rooms, images = _split(exhibition)
+    blob_store = blob_store or get_blob_store()
+    room_count = len(rooms) if rooms is not None else None
+    exhibit_count = sum(len(exhibits or []) for _, exhibits in rooms or [])
+
+    if exhibition_id is None:
+        cursor = conn.execute(INSERT_EXHIBITION, (
+            exhibition.get("topic", ""),
+            exhibition.get("title", ""),
+            created_at,
+            quality_score,
+            room_count,
+            exhibit_count,
+            profile,
+            json.dumps(shell)
+        ))
+        exhibition_id = cursor.lastrowid
+        conn.execute(INSERT_SEARCH_DOCUMENT, (exhibition_id, *_search_document(exhibition)))
+    else:
+        conn.execute("UPDATE exhibitions SET room_count = ?, exhibit_count = ?, data = ? WHERE id = ?",
+                     (room_count, exhibit_count, json.dumps(shell), exhibition_id))
+
+    for room_position, (room, exhibits) in enumerate(rooms or []):
+        conn.execute(INSERT_ROOM, (
+            exhibition_id, room_position, room.get("title"), room.get("theme"),
+            len(exhibits) if exhibits is not None else None, json.dumps(room)
+        ))
+        conn.executemany(INSERT_EXHIBIT, [
+            (exhibition_id, room_position, position, exhibit.get("name"),
+             exhibit.get("time_period"), json.dumps(exhibit))
+            for position, exhibit in enumerate(exhibits or [])
+        ])
+
+    conn.executemany(INSERT_IMAGE, [
+        (exhibition_id, kind, room_position, exhibit_position, json.dumps(externalize_image(image, blob_store)))
+        for kind, room_position, exhibit_position, image in images
+    ])
+    return exhibition_id
+
+
+def _migrate_v1(conn: sqlite3.Connection, blob_store: BlobStore):
+    """Original single-table layout."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS exhibitions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            topic TEXT NOT NULL,
+            title TEXT,
+            created_at TEXT,
+            quality_score REAL,
+            data TEXT NOT NULL
+        )
+    """)
+
+
+def _migrate_v2(conn: sqlite3.Connection, blob_store: BlobStore):
+    """Indexes on the summary columns and child tables for rooms, exhibits and images."""
+    conn.execute("ALTER TABLE exhibitions ADD COLUMN room_count INTEGER")
+    conn.execute("ALTER TABLE exhibitions ADD COLUMN exhibit_count INTEGER NOT NULL DEFAULT 0")
+    conn.execute("CREATE INDEX idx_exhibitions_created_at ON exhibitions(created_at)")
+    conn.execute("CREATE INDEX idx_exhibitions_topic ON exhibitions(topic COLLATE NOCASE, created_at)")
+    conn.execute("CREATE INDEX idx_exhibitions_quality ON exhibitions(quality_score)")
+    conn.execute("""
+        CREATE TABLE exhibition_rooms (
+            exhibition_id INTEGER NOT NULL REFERENCES exhibitions(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            title TEXT,
+            theme TEXT,
+            exhibit_count INTEGER,
+            data TEXT NOT NULL,
+            PRIMARY KEY (exhibition_id, position)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE exhibition_exhibits (
+            exhibition_id INTEGER NOT NULL REFERENCES exhibitions(id) ON DELETE CASCADE,
+            room_position INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            name TEXT,
+            time_period TEXT,
+            data TEXT NOT NULL,
+            PRIMARY KEY (exhibition_id, room_position, position)
+        )
+    """)
+    conn.execute("CREATE INDEX idx_exhibits_name ON exhibition_exhibits(name)")
+    conn.execute("""
+        CREATE TABLE exhibition_images (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            exhibition_id INTEGER NOT NULL REFERENCES exhibitions(id) ON DELETE CASCADE,
+            kind TEXT NOT NULL,
+            room_position INTEGER,
+            exhibit_position INTEGER,
+            data TEXT NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX idx_images_exhibition ON exhibition_images(exhibition_id, kind)")
+
+    # Split documents stored by the single-table layout
+    rows = conn.execute("SELECT id, data FROM exhibitions").fetchall()
+    for exhibition_id, data in rows:
+        _insert(conn, json.loads(data), 0.0, "", exhibition_id=exhibition_id, blob_store=blob_store)
+
+
+def _migrate_v3(conn: sqlite3.Connection, blob_store: BlobStore):
+    """Move inline base64 images into the blob store and index blob references."""
+    rows = conn.execute("SELECT id, data FROM exhibition_images").fetchall()
+    for image_id, data in rows:
+        image = json.loads(data)
+        externalized = externalize_image(image, blob_store)
+        if externalized is not image:
+            conn.execute("UPDATE exhibition_images SET data = ? WHERE id = ?", (json.dumps(externalized), image_id))
+    conn.execute("CREATE INDEX idx_images_blob ON exhibition_images(json_extract(data, '$.blob'))")
+
+
+def _migrate_v4(conn: sqlite3.Connection, blob_store: BlobStore):
+    """Full-text index over exhibition text, ranked by BM25 with title and topic weighted highest."""
+    conn.execute("""
+        CREATE VIRTUAL TABLE exhibitions_fts USING fts5(
+            title, topic, curator_notes, narratives, exhibits,
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute("INSERT INTO exhibitions_fts (exhibitions_fts, rank) VALUES ('rank', 'bm25(10.0, 8.0, 2.0, 1.0, 1.0)')")
+
+    ids = [row[0] for row in conn.execute("SELECT id FROM exhibitions")]
+    for exhibition_id in ids:
+        conn.execute(INSERT_SEARCH_DOCUMENT, (exhibition_id, *_search_document(_load(conn, exhibition_id))))
+
+
+def _migrate_v5(conn: sqlite3.Connection, blob_store: BlobStore):
+    """Record the execution profile; existing exhibitions keep NULL (unknown)."""
+    conn.execute("ALTER TABLE exhibitions ADD COLUMN profile TEXT")
+
+
+MIGRATIONS = [
+    (1, _migrate_v1),
+    (2, _migrate_v2),
+    (3, _migrate_v3),
+    (4, _migrate_v4),
+    (5, _migrate_v5)
+]
+
+
+# Global repository instance
+_repository_instance = None
+_repository_lock = threading.Lock()
+
+def get_exhibition_repository() -> ExhibitionRepository:
+    """Get or create the repository for config.DATABASE_PATH."""
+    global _repository_instance
+    if _repository_instance is None or _repository_instance.db_path != config.DATABASE_PATH:
+        with _repository_lock:
+            if _repository_instance is None or _repository_instance.db_path != config.DATABASE_PATH:
+                _repository_instance = ExhibitionRepository(config.DATABASE_PATH)
+    return _repository_instance
@@ -0,0 +1,62 @@
+"""Process-wide registry of Gemini model clients."""
+import threading
+from typing import Any, Dict, Optional
+
+import config
+
+
+class GeminiClientRegistry:
+    """
+    Configures the Gemini SDK once and shares one model handle per model name.
+
+    Nothing is imported, configured or created until the first model is
+    requested, so importing and constructing agents, orchestrators and
+    docents costs no SDK work (the SDK import alone takes about half a second).
+    Model handles are stateless between calls and safe to share across
+    threads and sessions.
+    """
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or config.GOOGLE_API_KEY
+        self._configured = False
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def model(self, name: Optional[str] = None):
+        """Shared handle for a model, created on first request (default config.MODEL_NAME)."""
+        name = name or config.MODEL_NAME
+        model = self._models.get(name)
+        if model is None:
+            with self._lock:
+                model = self._models.get(name)
+                if model is None:
+                    import google.generativeai as genai
+                    if not self._configured:
+                        genai.configure(api_key=self.api_key)
+                        self._configured = True
+                    model = self._models[name] = genai.GenerativeModel(name)
+        return model
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"configured": self._configured, "models": sorted(self._models)}
+
+
+def make_generation_config(**params):
+    """genai.types.GenerationConfig, importing the SDK on first use."""
+    import google.generativeai as genai
+    return genai.types.GenerationConfig(**params)
+
+
+# Global registry instance
+_registry_instance = None
+_registry_lock = threading.Lock()
+
+def get_gemini_registry() -> GeminiClientRegistry:
+    """Get or create the registry shared by all agents and tools."""
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = GeminiClientRegistry()
+    return _registry_instance
@@ -0,0 +1,196 @@
+"""Persistent cache of generated images keyed on the normalized prompt."""
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import config
+from utils.cache_manager import stable_hash
+
+CREATE_IMAGE_CACHE = """
+    CREATE TABLE IF NOT EXISTS image_cache (
+        key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        prompt TEXT NOT NULL,
+        data BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL
+    )
+"""
+CREATE_LAST_USED_INDEX = "CREATE INDEX IF NOT EXISTS idx_image_cache_last_used ON image_cache (last_used)"
+SELECT_IMAGE = "SELECT data FROM image_cache WHERE key = ?"
+TOUCH_IMAGE = "UPDATE image_cache SET last_used = ? WHERE key = ?"
+UPSERT_IMAGE = """
+    INSERT OR REPLACE INTO image_cache (key, model, prompt, data, size, created_at, last_used)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+SELECT_LRU = "SELECT key, size FROM image_cache ORDER BY last_used"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-, whitespace- and quote-insensitive form of an image prompt."""
+    prompt = re.sub(r"\s+", " ", prompt.casefold())
+    return prompt.strip(" \"'.,:;")
+
+
+class ImageCache:
+    """
+    Generated image bytes keyed on (model, normalized prompt).
+
+    Entries live in one SQLite file and are evicted least recently used
+    first once their total size exceeds max_bytes. Concurrent requests for
+    the same prompt are coalesced so the image is generated once.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.db_path = db_path or config.IMAGE_CACHE_PATH
+        self.max_bytes = max_bytes or config.IMAGE_CACHE_MAX_BYTES
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+        conn = self._connection()
+        conn.execute(CREATE_IMAGE_CACHE)
+        conn.execute(CREATE_LAST_USED_INDEX)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def key(self, prompt: str, model: str) -> str:
+        return stable_hash({"model": model, "prompt": normalize_prompt(prompt)})
+
+    def get(self, prompt: str, model: str) -> Optional[bytes]:
+        """Cached image bytes, refreshing the entry's recency on a hit."""
+        key = self.key(prompt, model)
+        conn = self._connection()
+        row = conn.execute(SELECT_IMAGE, (key,)).fetchone()
+        with self._lock:
+            self._counters["hits" if row else "misses"] += 1
+        if not row:
+            return None
+        conn.execute(TOUCH_IMAGE, (time.time(), key))
+        return row[0]
+
+    def put(self, prompt: str, model: str, data: bytes):
+        """Store image bytes and evict the least recently used entries over max_bytes."""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(UPSERT_IMAGE, (self.key(prompt, model), model, normalize_prompt(prompt),
+                                        sqlite3.Binary(data), len(data), now, now))
+            evicted = self._evict(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if evicted:
+            with self._lock:
+                self._counters["evictions"] += evicted
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """Delete the oldest entries until the total size fits; returns how many."""
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM image_cache").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return 0
+        victims = []
+        for key, size in conn.execute(SELECT_LRU):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM image_cache WHERE key = ?", victims)
+        return len(victims)
+
+    def get_or_generate(self, prompt: str, model: str, generate: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """
+        Cached bytes for prompt, or the result of generate(), which is then cached.
+
+        Callers asking for a prompt that is already being generated wait for
+        that result instead of generating it again. None results are not cached.
+        """
+        data = self.get(prompt, model)
+        if data is not None:
+            return data
+
+        key = self.key(prompt, model)
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+            else:
+                self._counters["coalesced"] += 1
+        if not leader:
+            return flight.result()
+
+        try:
+            data = generate()
+            if data is not None:
+                self.put(prompt, model, data)
+            flight.set_result(data)
+            return data
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, total bytes and hit, miss and eviction counters."""
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM image_cache"
+        ).fetchone()
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            # Coalesced lookups missed the cache but did not generate either
+            "hit_rate": (stats["hits"] + stats["coalesced"]) / lookups if lookups else 0.0
+        })
+        return stats
+
+    def clear(self):
+        self._connection().execute("DELETE FROM image_cache")
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+# Global image cache instance
+_image_cache_instance = None
+_image_cache_lock = threading.Lock()
+
+def get_image_cache() -> ImageCache:
+    """Get or create the image cache for config.IMAGE_CACHE_PATH."""
+    global _image_cache_instance
+    if _image_cache_instance is None or _image_cache_instance.db_path != config.IMAGE_CACHE_PATH:
+        with _image_cache_lock:
+            if _image_cache_instance is None or _image_cache_instance.db_path != config.IMAGE_CACHE_PATH:
+                _image_cache_instance = ImageCache()
+    return _image_cache_instance
@@ -0,0 +1,53 @@
+"""CPU-bound image transforms, run on the process pool."""
+from io import BytesIO
+from typing import Optional, Tuple
+
+from PIL import Image
+
+MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+
+def compress_image(image_data: bytes, max_width: int, max_height: int, quality: int = 70,
+                   format: str = "JPEG") -> bytes:
+    """
+    Downscale an image to fit max_width x max_height and re-encode it.
+
+    Args:
+        format: "JPEG" or "WEBP"; transparent and palette images are flattened onto white
+    """
+    image = Image.open(BytesIO(image_data))
+    image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+    
+    # Convert to RGB if necessary
+    if image.mode in ('RGBA', 'LA', 'P'):
+        rgb_image = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        rgb_image.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
+        image = rgb_image
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    output = BytesIO()
+    if format == "WEBP":
+        image.save(output, format=format, quality=quality, method=4)
+    else:
+        image.save(output, format=format, quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def sniff_mime_type(data: bytes) -> Optional[str]:
+    """MIME type of encoded image bytes, from their signature."""
+    if data.startswith(b"\xff\xd8"):
+        return MIME_TYPES["JPEG"]
+    if data.startswith(b"\x89PNG"):
+        return MIME_TYPES["PNG"]
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return MIME_TYPES["WEBP"]
+    return None
+
+
+def image_dimensions(image_data: bytes) -> Tuple[int, int]:
+    """(width, height) read from the image header without decoding the pixels."""
+    with Image.open(BytesIO(image_data)) as image:
+        return image.size
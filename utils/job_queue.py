@@ -0,0 +1,180 @@
+"""Persistent SQLite job queue for batch exhibition generation."""
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import config
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+CREATE_JOBS = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        topic TEXT NOT NULL UNIQUE,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        exhibition_id INTEGER,
+        reused INTEGER NOT NULL DEFAULT 0,
+        api_calls INTEGER NOT NULL DEFAULT 0,
+        duration REAL,
+        error TEXT,
+        created_at TEXT NOT NULL,
+        started_at TEXT,
+        finished_at TEXT
+    )
+"""
+CREATE_STATUS_INDEX = "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)"
+INSERT_JOB = "INSERT OR IGNORE INTO jobs (topic, created_at) VALUES (?, ?)"
+SELECT_NEXT = "SELECT id, topic, attempts FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1"
+MARK_RUNNING = "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ? WHERE id = ?"
+MARK_DONE = """
+    UPDATE jobs SET status = 'done', exhibition_id = ?, reused = ?, api_calls = api_calls + ?,
+        duration = ?, error = NULL, finished_at = ?
+    WHERE id = ?
+"""
+MARK_FAILED = """
+    UPDATE jobs SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END,
+        api_calls = api_calls + ?, duration = ?, error = ?, finished_at = ?
+    WHERE id = ?
+"""
+JOB_COLUMNS = ("id, topic, status, attempts, exhibition_id, reused, api_calls, duration, error, "
+               "created_at, started_at, finished_at")
+
+
+class JobQueue:
+    """
+    Topics waiting to be generated, persisted so a batch can resume after a crash.
+
+    Each topic is queued once; enqueueing the same topics file again only
+    adds new lines. Workers claim jobs atomically, so several threads (or
+    processes) can drain one queue.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_attempts: Optional[int] = None):
+        self.db_path = db_path or config.BATCH_QUEUE_PATH
+        self.max_attempts = max_attempts or config.BATCH_MAX_ATTEMPTS
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute(CREATE_JOBS)
+        conn.execute(CREATE_STATUS_INDEX)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; claim() opens its own write transaction
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def enqueue(self, topics: Iterable[str]) -> int:
+        """
+        Queue topics that are not queued yet.
+
+        Returns:
+            Number of new jobs
+        """
+        topics = [t.strip() for t in topics if t and t.strip()]
+        now = datetime.now().isoformat()
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            before = conn.total_changes
+            conn.executemany(INSERT_JOB, [(topic, now) for topic in topics])
+            added = conn.total_changes - before
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def claim(self) -> Optional[Dict]:
+        """
+        Mark the oldest pending job as running and return it.
+
+        Returns:
+            {"id", "topic", "attempts"} or None when nothing is pending
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(SELECT_NEXT).fetchone()
+            if row:
+                conn.execute(MARK_RUNNING, (datetime.now().isoformat(), row[0]))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if not row:
+            return None
+        return {"id": row[0], "topic": row[1], "attempts": row[2] + 1}
+
+    def complete(self, job_id: int, exhibition_id: Optional[int], api_calls: int = 0,
+                 duration: float = 0.0, reused: bool = False):
+        """Record a finished job."""
+        self._connection().execute(MARK_DONE, (exhibition_id, int(reused), api_calls, duration,
+                                               datetime.now().isoformat(), job_id))
+
+    def fail(self, job_id: int, error: str, api_calls: int = 0, duration: float = 0.0):
+        """Record a failed attempt; the job goes back to pending until max_attempts is reached."""
+        self._connection().execute(MARK_FAILED, (self.max_attempts, api_calls, duration, error,
+                                                 datetime.now().isoformat(), job_id))
+
+    def recover(self) -> int:
+        """
+        Return jobs left running by a crashed process to pending.
+
+        Only call this while no other process is working on the queue.
+
+        Returns:
+            Number of recovered jobs
+        """
+        return self._connection().execute(
+            "UPDATE jobs SET status = 'pending' WHERE status = 'running'"
+        ).rowcount
+
+    def retry_failed(self) -> int:
+        """Give failed jobs a fresh set of attempts."""
+        return self._connection().execute(
+            "UPDATE jobs SET status = 'pending', attempts = 0 WHERE status = 'failed'"
+        ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for status, count in self._connection().execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        return counts
+
+    def jobs(self, status: Optional[str] = None) -> List[Dict]:
+        """All jobs, optionally filtered by status, in queue order."""
+        sql = f"SELECT {JOB_COLUMNS} FROM jobs"
+        params = ()
+        if status:
+            sql += " WHERE status = ?"
+            params = (status,)
+        cursor = self._connection().execute(sql + " ORDER BY id", params)
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
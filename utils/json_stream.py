@@ -0,0 +1,257 @@
+"""Tolerant, incremental extraction of JSON from model responses."""
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+
+WHITESPACE = " \t\r\n"
+FENCE = "```"
+SALVAGE_ATTEMPTS = 8  # Cut points tried when closing a truncated object
+
+
+class JSONArrayParser:
+    """
+    Yields the elements of a top-level JSON array as soon as each one closes.
+
+    Text before the opening bracket (prose, a ```json fence) is skipped, as
+    is anything after the closing bracket; a bracketed group that yields no
+    element, like "[as requested]" in prose, is skipped too. Trailing commas
+    inside an element are tolerated; an element that is still not valid JSON
+    is dropped rather than failing the whole array, and a truncated array
+    keeps every element that closed before the text ran out.
+
+    Example:
+        parser = JSONArrayParser()
+        for chunk in chunks:
+            for item in parser.feed(chunk):
+                handle(item)
+    """
+
+    def __init__(self):
+        self.started = False
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._in_item = False
+        self._pending = ""  # Text of the open element carried over from earlier chunks
+        self._emitted = 0
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Consume the next chunk of text.
+
+        Returns:
+            Elements completed by this chunk, in order
+        """
+        items = []
+        item_start = 0
+        for i, ch in enumerate(text):
+            if self.done:
+                break
+            if not self.started:
+                if ch == "[":
+                    self.started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch in WHITESPACE:
+                continue
+            if ch == "," and self._depth == 1:
+                # End of a scalar element; containers were emitted on close
+                self._finish(text, item_start, i, items)
+                continue
+            if ch in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    self._finish(text, item_start, i + 1, items)
+                elif self._depth == 0:
+                    self._finish(text, item_start, i, items)
+                    if self._emitted:
+                        self.done = True
+                    else:
+                        # Bracketed prose such as "[as requested]"; keep looking for the array
+                        self.started = False
+                continue
+
+            if self._depth == 1 and not self._in_item:
+                self._in_item = True
+                self._pending = ""
+                item_start = i
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+
+        if self._in_item:
+            self._pending += text[item_start:]
+        return items
+
+    def _finish(self, text: str, start: int, end: int, items: List[Any]):
+        """Parse the open element ending at text[end] and append it to items."""
+        if not self._in_item:
+            return
+        self._in_item = False
+        raw = self._pending + text[start:end]
+        self._pending = ""
+        try:
+            items.append(loads_tolerant(raw))
+        except json.JSONDecodeError:
+            return
+        self._emitted += 1
+
+
+def iter_json_array(chunks: Iterable[str]) -> Iterator[Any]:
+    """Yield the elements of a JSON array spread over text chunks as each one closes."""
+    parser = JSONArrayParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            break
+
+
+def strip_code_fence(text: str) -> str:
+    """Contents of the first ``` fenced block (to the end if unclosed), or text if there is none."""
+    start = text.find(FENCE)
+    if start == -1:
+        return text
+    body = text.find("\n", start)
+    if body == -1:
+        return ""
+    end = text.find(FENCE, body)
+    return text[body + 1:end if end != -1 else len(text)]
+
+
+def remove_trailing_commas(text: str) -> str:
+    """Drop commas directly before a closing bracket or brace, outside strings."""
+    out = []
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "}]":
+            j = len(out) - 1
+            while j >= 0 and out[j] in WHITESPACE:
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+        out.append(ch)
+    return "".join(out)
+
+
+def loads_tolerant(raw: str) -> Any:
+    """json.loads, retried without trailing commas; raises json.JSONDecodeError if both fail."""
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return json.loads(remove_trailing_commas(raw))
+
+
+def _loads_slice(text: str, opener: str, closer: str) -> Any:
+    """Fast path for well-formed responses: json.loads from the first opener to the last closer."""
+    start, end = text.find(opener), text.rfind(closer)
+    if start == -1 or end < start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+def extract_json_array(text: str) -> List[Any]:
+    """
+    Elements of the first JSON array in a model response.
+
+    Handles code fences, prose around the array, trailing commas and
+    truncation; malformed elements are dropped. Returns [] if nothing
+    could be read.
+    """
+    text = strip_code_fence(text)
+    value = _loads_slice(text, "[", "]")
+    if isinstance(value, list):
+        return value
+    return JSONArrayParser().feed(text)
+
+
+def extract_json_object(text: str) -> Dict[str, Any]:
+    """
+    The first JSON object in a model response.
+
+    Handles code fences, prose around the object (braces in prose such as
+    "{5 questions}" are skipped) and trailing commas. A truncated or
+    malformed object is cut back to its last complete member and closed, so
+    the members that did arrive are kept. Returns {} if nothing could be read.
+    """
+    text = strip_code_fence(text)
+    value = _loads_slice(text, "{", "}")
+    if isinstance(value, dict):
+        return value
+    
+    start = text.find("{")
+    while start != -1:
+        value, end = _object_at(text, start)
+        if value:
+            return value
+        if end is None:
+            break  # Runs to the end of the text; nothing after it to try
+        start = text.find("{", end)
+    return {}
+
+
+def _object_at(text: str, start: int):
+    """
+    Parse the object opening at text[start].
+
+    Returns:
+        (dict or {}, index after its closing brace or None if it never closes)
+    """
+    stack = []
+    cuts = []  # (end, closers) where text[start:end] + closers is a complete prefix
+    in_string = escape = False
+    end = None
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            stack.pop()
+            if not stack:
+                end = i + 1
+                break
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif ch == ",":
+            cuts.append((i, "".join(reversed(stack))))
+    
+    candidates = [text[start:end]] if end is not None else []
+    candidates += [text[start:cut] + closers for cut, closers in reversed(cuts[-SALVAGE_ATTEMPTS:])]
+    for raw in candidates:
+        try:
+            value = loads_tolerant(raw)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value, end
+    return {}, end
@@ -6,12 +6,13 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
 from functools import lru_cache
+import config
 
 class JSONLLogger:
     """Logger that writes structured logs in JSONL format."""
     
-    def __init__(self, log_dir: str = "logs"):
-        self.log_dir = Path(log_dir)
+    def __init__(self, log_dir: str = None):
+        self.log_dir = Path(log_dir or config.LOGS_DIR)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
         # Create timestamped log file
@@ -1,17 +1,30 @@
 """PDF Generator for Museum Exhibitions using HTML."""
 from io import BytesIO
 from datetime import datetime
+from utils.blob_store import BlobStore
+from utils.renditions import rendition_data_uri
+from utils.process_pool import Task, get_process_pool
+import config
+
+def render_exhibition_html(exhibition: dict, metrics: dict = None, include_images: bool = True,
+                           blob_store_dir: str = None) -> str:
+    """Build the export HTML; a process pool task, so images are read from blob_store_dir."""
+    generator = ExhibitionPDFGenerator(include_images, blob_store_dir)
+    return generator._generate_html(exhibition, metrics)
 
 class ExhibitionPDFGenerator:
     """Generate professional HTML-based PDF documents for exhibitions."""
     
-    def __init__(self):
-        pass
+    def __init__(self, include_images: bool = True, blob_store_dir: str = None):
+        self.include_images = include_images
+        self.blob_store_dir = blob_store_dir or config.BLOB_STORE_DIR
+        self._blob_store = None
     
     def generate_pdf(self, exhibition: dict, metrics: dict = None) -> str:
-        """Generate HTML content that can be printed as PDF."""
-        html = self._generate_html(exhibition, metrics)
-        return html
+        """Generate HTML content that can be printed as PDF, built on the process pool."""
+        return get_process_pool().run(
+            Task(render_exhibition_html, exhibition, metrics, self.include_images, self.blob_store_dir)
+        )
     
     def _generate_html(self, exhibition: dict, metrics: dict = None) -> str:
         """Generate styled HTML for PDF export."""
@@ -150,6 +163,12 @@ class ExhibitionPDFGenerator:
             margin-bottom: 30px;
             text-align: center;
         }}
+        .exhibition-image {{
+            display: block;
+            max-width: 100%;
+            margin: 15px auto;
+            border-radius: 8px;
+        }}
         .timeline-event {{
             margin: 20px 0;
             padding-left: 30px;
@@ -184,6 +203,7 @@ class ExhibitionPDFGenerator:
         <div style="font-size: 48px;">🏛️</div>
         <h1 class="title">{title}</h1>
         <p class="subtitle">{exhibition.get('overview', '')}</p>
+        {self._generate_image_html(exhibition.get('poster_image'), title)}
         
         {self._generate_metrics_html(metrics) if metrics else ''}
         
@@ -248,6 +268,7 @@ class ExhibitionPDFGenerator:
             <div class="room">
                 <h2 class="room-title">Room {i}: {room.get('title', 'Untitled')}</h2>
                 <div class="room-theme">Theme: {room.get('theme', 'N/A')}</div>
+                {self._generate_image_html(room.get('entrance_image'), room.get('title', ''))}
                 <div class="room-description">{room.get('description', '')}</div>
                 {f'<p><em>{room.get("narrative", "")}</em></p>' if room.get('narrative') else ''}
                 
@@ -271,6 +292,7 @@ class ExhibitionPDFGenerator:
             <div class="exhibit">
                 <div class="exhibit-title">Exhibit {j}: {exhibit.get('name', 'Untitled')}</div>
                 {f'<div class="exhibit-period">Time Period: {exhibit.get("time_period", "")}</div>' if exhibit.get('time_period') else ''}
+                {self._generate_image_html(exhibit.get('generated_image'), exhibit.get('name', ''))}
                 <div class="exhibit-description">{exhibit.get('description', '')}</div>
                 {f'<div class="significance"><strong>Cultural Significance:</strong> {exhibit.get("cultural_significance", "")}</div>' if exhibit.get('cultural_significance') else ''}
                 {facts_html}
@@ -278,6 +300,17 @@ class ExhibitionPDFGenerator:
             """
         return html
     
+    def _generate_image_html(self, image, alt: str) -> str:
+        """Embed the print rendition of an image, derived from the stored original on first export."""
+        if not self.include_images:
+            return ''
+        if self._blob_store is None:
+            self._blob_store = BlobStore(self.blob_store_dir)
+        uri = rendition_data_uri(image, 'print', self._blob_store)
+        if not uri:
+            return ''
+        return f'<img class="exhibition-image" src="{uri}" alt="{alt}">'
+    
     def _generate_timeline_html(self, exhibition: dict) -> str:
         """Generate timeline HTML."""
         timeline = exhibition.get('timeline', [])
@@ -0,0 +1,144 @@
+"""Reusable process pool for CPU-bound post-processing."""
+import asyncio
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+import config
+from utils.logger import get_logger
+
+_in_worker = False
+
+
+def _mark_worker():
+    """Pool initializer: tasks that submit tasks run them inline instead of nesting pools."""
+    global _in_worker
+    _in_worker = True
+
+
+class Task:
+    """
+    Picklable description of CPU-bound work: a function and its arguments.
+
+    The function is pickled by reference, so it must be defined at module
+    level (no lambdas, closures or bound methods), and the arguments must be
+    picklable. Tasks carry everything they need; workers do not see runtime
+    changes to config made in the parent process.
+    """
+
+    def __init__(self, func: Callable, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self) -> Any:
+        return self.func(*self.args, **self.kwargs)
+
+    def __repr__(self) -> str:
+        return f"Task({self.func.__module__}.{self.func.__qualname__})"
+
+
+class ProcessPool:
+    """
+    Runs Tasks on worker processes so CPU-bound work escapes the GIL.
+
+    Workers are started on first use and reused for the life of the process.
+    They are spawned rather than forked because the pipeline is
+    multi-threaded, and forking while another thread holds a lock can
+    deadlock the child. With max_workers 0, tasks run inline on the calling
+    thread. If a worker dies, the pool is restarted and the task is run
+    inline so the exhibition still completes.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = config.PROCESS_POOL_WORKERS if max_workers is None else max_workers
+        self.logger = get_logger()
+        self._executor = None
+        self._lock = threading.Lock()
+        self._counters = {"submitted": 0, "inline": 0, "restarts": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_mark_worker)
+            return self._executor
+
+    def _restart(self, error: Exception):
+        """Drop a broken executor; the next submit starts fresh workers."""
+        self.logger.logger.warning(f"Process pool broken, restarting: {error}")
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self._counters["restarts"] += 1
+
+    def _run_inline(self, task: Task) -> Future:
+        with self._lock:
+            self._counters["inline"] += 1
+        future = Future()
+        try:
+            future.set_result(task())
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def submit(self, task: Task) -> Future:
+        """Schedule task and return a Future for its result."""
+        if self.max_workers <= 0:
+            return self._run_inline(task)
+        try:
+            future = self._get_executor().submit(task)
+        except (BrokenProcessPool, RuntimeError) as e:
+            # RuntimeError: the executor was shut down by another thread's restart
+            self._restart(e)
+            return self._run_inline(task)
+        with self._lock:
+            self._counters["submitted"] += 1
+        return future
+
+    def run(self, task: Task) -> Any:
+        """Run task on a worker and wait for its result."""
+        try:
+            return self.submit(task).result()
+        except BrokenProcessPool as e:
+            self._restart(e)
+            return self._run_inline(task).result()
+
+    async def arun(self, task: Task) -> Any:
+        """Await task without blocking the event loop."""
+        try:
+            return await asyncio.wrap_future(self.submit(task))
+        except BrokenProcessPool as e:
+            self._restart(e)
+            return self._run_inline(task).result()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"max_workers": self.max_workers, **self._counters}
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+# Global process pool instance
+_process_pool_instance = None
+_process_pool_lock = threading.Lock()
+
+def get_process_pool() -> ProcessPool:
+    """Get or create the process pool shared by all agents and tools."""
+    global _process_pool_instance
+    if _process_pool_instance is None:
+        with _process_pool_lock:
+            if _process_pool_instance is None:
+                _process_pool_instance = ProcessPool(max_workers=0 if _in_worker else None)
+                atexit.register(_process_pool_instance.shutdown)
+    return _process_pool_instance
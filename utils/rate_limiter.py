@@ -0,0 +1,218 @@
+"""Token-bucket rate limiting for Gemini API calls."""
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-process limiting is unavailable
+    fcntl = None
+
+import config
+
+
+class TokenBucket:
+    """A bucket refilled continuously up to its capacity."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = float(capacity)
+        self.updated = time.time()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Take amount tokens, letting the balance go negative.
+
+        Returns:
+            Seconds the caller must wait before its reservation is covered
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+        self.tokens -= min(amount, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.refill_per_second
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"tokens": self.tokens, "updated": self.updated}
+
+    def load(self, state: Dict[str, float]):
+        self.tokens = state.get("tokens", self.tokens)
+        self.updated = state.get("updated", self.updated)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter shared by all agents.
+
+    Callers reserve quota up front and sleep only for the deficit, so requests
+    go out immediately while below quota. With a state_file the buckets live
+    in a file guarded by an exclusive lock and are shared across processes.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float,
+                 state_file: Optional[str] = None):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.blocked_until = 0.0
+        self.state_file = Path(state_file) if state_file and fcntl else None
+        if self.state_file:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counters = {
+            "acquired": 0,
+            "throttled": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "rate_limit_errors": 0,
+            "backoff_seconds": 0.0
+        }
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Block until one request carrying tokens is allowed; returns seconds waited."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, tokens: int = 1) -> float:
+        """Async counterpart of acquire()."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Correct the token bucket once the real usage of a request is known."""
+        if actual_tokens != estimated_tokens:
+            self._update(lambda now: self.tokens.reserve(actual_tokens - estimated_tokens, now))
+
+    def backoff_delay(self, error: Exception, attempt: int) -> float:
+        """
+        Delay before retrying after error.
+
+        Honors a retry-after hint in the error when present, otherwise uses
+        exponential backoff with full jitter. Rate-limit errors also pause
+        every other caller sharing this limiter.
+        """
+        hint = retry_after_hint(error)
+        if hint is not None:
+            delay = hint + random.uniform(0, config.RETRY_BASE_DELAY)
+        else:
+            delay = random.uniform(0, min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * 2 ** (attempt + 1)))
+
+        with self._lock:
+            self._counters["backoff_seconds"] += delay
+            if is_rate_limit_error(error):
+                self._counters["rate_limit_errors"] += 1
+
+        if is_rate_limit_error(error):
+            self._update(lambda now: self._block(now + delay))
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """Limiter counters, including total time callers spent waiting."""
+        with self._lock:
+            stats = dict(self._counters)
+        stats["avg_wait_seconds"] = stats["wait_seconds"] / stats["acquired"] if stats["acquired"] else 0.0
+        return stats
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve quota for one request and return the required wait."""
+        def reserve(now: float) -> float:
+            blocked = max(0.0, self.blocked_until - now)
+            return max(blocked, self.requests.reserve(1, now), self.tokens.reserve(tokens, now))
+
+        wait = self._update(reserve)
+        with self._lock:
+            self._counters["acquired"] += 1
+            if wait > 0:
+                self._counters["throttled"] += 1
+                self._counters["wait_seconds"] += wait
+                self._counters["max_wait_seconds"] = max(self._counters["max_wait_seconds"], wait)
+        return wait
+
+    def _block(self, until: float) -> float:
+        self.blocked_until = max(self.blocked_until, until)
+        return 0.0
+
+    def _update(self, change) -> float:
+        """Apply change(now) to the buckets, synchronizing through the state file if configured."""
+        with self._lock:
+            if not self.state_file:
+                return change(time.time())
+
+            with open(self.state_file, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    content = f.read()
+                    if content:
+                        state = json.loads(content)
+                        self.requests.load(state.get("requests", {}))
+                        self.tokens.load(state.get("tokens", {}))
+                        self.blocked_until = state.get("blocked_until", 0.0)
+
+                    result = change(time.time())
+
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps({
+                        "requests": self.requests.to_dict(),
+                        "tokens": self.tokens.to_dict(),
+                        "blocked_until": self.blocked_until
+                    }))
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+            return result
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether error is a quota / 429 response."""
+    error_str = str(error)
+    return "429" in error_str or "quota" in error_str.lower()
+
+
+def retry_after_hint(error: Exception) -> Optional[float]:
+    """Extract a server-provided retry delay in seconds from error, if any."""
+    error_str = str(error)
+    patterns = [
+        r"retry_delay\s*\{\s*seconds:\s*(\d+(?:\.\d+)?)",
+        r"retry in\s*(\d+(?:\.\d+)?)\s*s",
+        r"retry-after:?\s*(\d+(?:\.\d+)?)"
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, error_str, re.IGNORECASE)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt token estimate (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+# Global limiter instance
+_limiter_instance = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Get or create the process-wide rate limiter."""
+    global _limiter_instance
+    if _limiter_instance is None:
+        with _limiter_lock:
+            if _limiter_instance is None:
+                _limiter_instance = RateLimiter(
+                    config.REQUESTS_PER_MINUTE,
+                    config.TOKENS_PER_MINUTE,
+                    config.RATE_LIMIT_STATE_FILE
+                )
+    return _limiter_instance
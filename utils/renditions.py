@@ -0,0 +1,104 @@
+"""Named image renditions derived lazily from the originals in the blob store."""
+import base64
+import shutil
+from pathlib import Path
+from typing import Dict, Optional
+
+import config
+from utils.blob_store import BlobStore, get_blob_store, load_image_bytes, write_atomic
+from utils.image_processing import MIME_TYPES, compress_image
+from utils.logger import get_logger
+from utils.process_pool import Task, get_process_pool
+
+EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp"}
+RENDITIONS_DIR = "renditions"
+
+
+def _spec(name: str):
+    """(max_width, max_height, format, quality) of a rendition."""
+    try:
+        return config.IMAGE_RENDITIONS[name]
+    except KeyError:
+        raise ValueError(f"Unknown image rendition '{name}'; expected one of {sorted(config.IMAGE_RENDITIONS)}")
+
+
+def rendition_path(store: BlobStore, digest: str, name: str) -> Path:
+    """
+    Where a rendition of an original blob is cached.
+
+    The directory encodes the rendition's size, format and quality, so
+    changing its spec in config produces new files instead of serving stale ones.
+    """
+    width, height, fmt, quality = _spec(name)
+    variant = f"{name}-{width}x{height}-q{quality}"
+    return store.root / RENDITIONS_DIR / variant / digest[:2] / f"{digest}.{EXTENSIONS[fmt]}"
+
+
+def get_rendition(image: Dict, name: str, store: Optional[BlobStore] = None) -> Optional[bytes]:
+    """
+    Bytes of the named rendition (see config.IMAGE_RENDITIONS) of an image.
+
+    Renditions of stored blobs are produced on first request on the process
+    pool and cached next to the blobs; inline legacy images are converted
+    on every call.
+    """
+    width, height, fmt, quality = _spec(name)
+    if not isinstance(image, dict):
+        return None
+    store = store or get_blob_store()
+
+    if image.get("blob"):
+        path = rendition_path(store, image["blob"], name)
+        try:
+            return path.read_bytes()
+        except OSError:
+            pass
+
+    original = load_image_bytes(image, store)
+    if original is None:
+        return None
+    try:
+        data = get_process_pool().run(Task(compress_image, original, width, height, quality, fmt))
+    except (OSError, ValueError) as e:
+        get_logger().logger.warning(f"Cannot render '{name}' image rendition: {e}")
+        return None
+    if image.get("blob"):
+        write_atomic(path, data)
+    return data
+
+
+def rendition_mime_type(name: str) -> str:
+    return MIME_TYPES[_spec(name)[2]]
+
+
+def rendition_data_uri(image: Dict, name: str, store: Optional[BlobStore] = None) -> Optional[str]:
+    """data: URI of the named rendition for embedding in exported HTML."""
+    data = get_rendition(image, name, store)
+    if data is None:
+        return None
+    return f"data:{rendition_mime_type(name)};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def prune_renditions(store: BlobStore) -> int:
+    """
+    Delete cached renditions whose original blob is gone, and variants no
+    longer configured. Run after BlobStore.gc().
+
+    Returns:
+        Number of deleted files
+    """
+    root = store.root / RENDITIONS_DIR
+    if not root.exists():
+        return 0
+    current = {rendition_path(store, "00", name).parent.parent.name for name in config.IMAGE_RENDITIONS}
+    deleted = 0
+    for variant in root.iterdir():
+        if variant.name not in current:
+            deleted += sum(1 for p in variant.rglob("*") if p.is_file())
+            shutil.rmtree(variant, ignore_errors=True)
+            continue
+        for path in variant.glob("*/*"):
+            if not path.name.startswith(".tmp-") and not store.exists(path.stem):
+                path.unlink(missing_ok=True)
+                deleted += 1
+    return deleted
@@ -0,0 +1,270 @@
+"""Dependency-graph scheduler for multi-stage pipelines."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from utils.logger import get_logger
+
+
+class Stage:
+    """A pipeline stage: a callable with named inputs and a single named output."""
+
+    def __init__(self, name: str, func: Callable, inputs: Iterable[str] = (),
+                 output: Optional[str] = None, fallback: Optional[Callable] = None):
+        """
+        Args:
+            name: Unique stage name (used in reports and logs)
+            func: Called with the stage inputs as keyword arguments; may be a
+                coroutine function when the pipeline is run with arun()
+            inputs: Names of values this stage needs before it can start
+            output: Name under which the return value is published (defaults to name)
+            fallback: Optional ``fallback(error, **inputs)`` used instead of failing the run
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.output = output or name
+        self.fallback = fallback
+
+
+class DAGScheduler:
+    """Runs stages as soon as their inputs are ready on a bounded worker pool."""
+
+    def __init__(self, stages: List[Stage], max_workers: int = 4):
+        self.stages = list(stages)
+        self.max_workers = max(1, max_workers)
+        self.logger = get_logger()
+        self.last_report: Dict[str, Any] = {}
+        self._validate()
+
+    def _validate(self):
+        """Check for duplicate outputs and dependency cycles."""
+        producers = {}
+        for stage in self.stages:
+            if stage.output in producers:
+                raise ValueError(f"Output '{stage.output}' produced by both "
+                                 f"'{producers[stage.output]}' and '{stage.name}'")
+            producers[stage.output] = stage.name
+
+        # Kahn's algorithm over stage-to-stage edges; external inputs are ignored
+        remaining = {s.name: {i for i in s.inputs if i in producers} for s in self.stages}
+        done = set()
+        while remaining:
+            ready = [name for name, deps in remaining.items()
+                     if all(producers[d] in done for d in deps)]
+            if not ready:
+                raise ValueError(f"Dependency cycle between stages: {sorted(remaining)}")
+            for name in ready:
+                done.add(name)
+                del remaining[name]
+
+    def run(self, initial: Optional[Dict[str, Any]] = None,
+            on_complete: Optional[Callable[[Stage, Any], None]] = None) -> Dict[str, Any]:
+        """
+        Execute the pipeline.
+
+        Args:
+            initial: Values available before any stage runs (e.g. the topic)
+            on_complete: Called with (stage, output) as each stage's output is published
+
+        Returns:
+            Mapping of every input and stage output name to its value
+        """
+        values = dict(initial or {})
+        pending = list(self.stages)
+        missing = {i for s in pending for i in s.inputs} - {s.output for s in pending} - set(values)
+        if missing:
+            raise ValueError(f"No stage or initial value provides: {sorted(missing)}")
+
+        timings: Dict[str, Dict[str, float]] = {}
+        running = {}
+        run_start = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while pending or running:
+                    for stage in [s for s in pending if all(i in values for i in s.inputs)]:
+                        pending.remove(stage)
+                        kwargs = {i: values[i] for i in stage.inputs}
+                        future = executor.submit(self._run_stage, stage, kwargs, timings)
+                        running[future] = stage
+
+                    finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        stage = running.pop(future)
+                        values[stage.output] = future.result()
+                        if on_complete:
+                            on_complete(stage, values[stage.output])
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+
+        self.last_report = self._build_report(timings, time.time() - run_start)
+        self.logger.log_event("schedule_report", self.last_report)
+        return values
+
+    async def arun(self, initial: Optional[Dict[str, Any]] = None,
+                   on_complete: Optional[Callable[[Stage, Any], None]] = None) -> Dict[str, Any]:
+        """
+        Execute the pipeline on the running event loop.
+
+        Coroutine stages are awaited directly; plain functions run in a worker
+        thread. At most max_workers stages are in flight at once.
+
+        Args:
+            initial: Values available before any stage runs (e.g. the topic)
+            on_complete: Called with (stage, output) as each stage's output is published
+
+        Returns:
+            Mapping of every input and stage output name to its value
+        """
+        values = dict(initial or {})
+        pending = list(self.stages)
+        missing = {i for s in pending for i in s.inputs} - {s.output for s in pending} - set(values)
+        if missing:
+            raise ValueError(f"No stage or initial value provides: {sorted(missing)}")
+
+        timings: Dict[str, Dict[str, float]] = {}
+        running = {}
+        slots = asyncio.Semaphore(self.max_workers)
+        run_start = time.time()
+
+        async def bounded(stage: Stage, kwargs: Dict[str, Any]) -> Any:
+            async with slots:
+                return await self._arun_stage(stage, kwargs, timings)
+
+        try:
+            while pending or running:
+                for stage in [s for s in pending if all(i in values for i in s.inputs)]:
+                    pending.remove(stage)
+                    kwargs = {i: values[i] for i in stage.inputs}
+                    running[asyncio.ensure_future(bounded(stage, kwargs))] = stage
+
+                finished, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    stage = running.pop(task)
+                    values[stage.output] = task.result()
+                    if on_complete:
+                        on_complete(stage, values[stage.output])
+        except BaseException:
+            for task in running:
+                task.cancel()
+            raise
+
+        self.last_report = self._build_report(timings, time.time() - run_start)
+        self.logger.log_event("schedule_report", self.last_report)
+        return values
+
+    async def _arun_stage(self, stage: Stage, kwargs: Dict[str, Any], timings: Dict) -> Any:
+        """Async counterpart of _run_stage."""
+        start = time.time()
+        try:
+            if asyncio.iscoroutinefunction(stage.func):
+                return await stage.func(**kwargs)
+            return await asyncio.to_thread(stage.func, **kwargs)
+        except Exception as e:
+            if stage.fallback is None:
+                raise
+            self.logger.logger.warning(f"Stage {stage.name} failed, using fallback: {str(e)}")
+            return stage.fallback(e, **kwargs)
+        finally:
+            timings[stage.name] = {"start": start, "end": time.time()}
+
+    def _run_stage(self, stage: Stage, kwargs: Dict[str, Any], timings: Dict) -> Any:
+        """Run one stage, recording timings and applying its fallback on error."""
+        start = time.time()
+        try:
+            return stage.func(**kwargs)
+        except Exception as e:
+            if stage.fallback is None:
+                raise
+            self.logger.logger.warning(f"Stage {stage.name} failed, using fallback: {str(e)}")
+            return stage.fallback(e, **kwargs)
+        finally:
+            timings[stage.name] = {"start": start, "end": time.time()}
+
+    def _build_report(self, timings: Dict[str, Dict[str, float]], wall_time: float) -> Dict[str, Any]:
+        """Build a per-stage timing report including the critical path."""
+        producers = {s.output: s.name for s in self.stages}
+        origin = min((t["start"] for t in timings.values()), default=0.0)
+
+        # Longest path by measured duration gives the pipeline's inherent critical path
+        finish: Dict[str, float] = {}
+        via: Dict[str, Optional[str]] = {}
+        for stage in self._topological_order():
+            if stage.name not in timings:
+                continue
+            duration = timings[stage.name]["end"] - timings[stage.name]["start"]
+            deps = [producers[i] for i in stage.inputs if i in producers and producers[i] in finish]
+            parent = max(deps, key=lambda d: finish[d]) if deps else None
+            finish[stage.name] = (finish[parent] if parent else 0.0) + duration
+            via[stage.name] = parent
+
+        critical_path = []
+        node = max(finish, key=finish.get) if finish else None
+        while node:
+            critical_path.append(node)
+            node = via[node]
+        critical_path.reverse()
+
+        stages = []
+        for stage in self.stages:
+            if stage.name not in timings:
+                continue
+            t = timings[stage.name]
+            stages.append({
+                "name": stage.name,
+                "depends_on": sorted({producers[i] for i in stage.inputs if i in producers}),
+                "start_offset": t["start"] - origin,
+                "duration": t["end"] - t["start"],
+                "on_critical_path": stage.name in critical_path
+            })
+
+        total_stage_time = sum(s["duration"] for s in stages)
+        critical = [s for s in stages if s["on_critical_path"]]
+        return {
+            "wall_time": wall_time,
+            "total_stage_time": total_stage_time,
+            "parallelism": total_stage_time / wall_time if wall_time > 0 else 0.0,
+            "critical_path": critical_path,
+            "critical_path_duration": max(finish.values(), default=0.0),
+            "bottleneck": max(critical, key=lambda s: s["duration"])["name"] if critical else None,
+            "stages": stages
+        }
+
+    def _topological_order(self) -> List[Stage]:
+        """Return stages ordered so every producer precedes its consumers."""
+        producers = {s.output: s for s in self.stages}
+        ordered, seen = [], set()
+
+        def visit(stage: Stage):
+            if stage.name in seen:
+                return
+            seen.add(stage.name)
+            for i in stage.inputs:
+                if i in producers:
+                    visit(producers[i])
+            ordered.append(stage)
+
+        for stage in self.stages:
+            visit(stage)
+        return ordered
+
+
+def format_critical_path_report(report: Dict[str, Any]) -> str:
+    """Format a scheduler report as readable text."""
+    if not report:
+        return "No schedule report available."
+
+    text = "STAGE SCHEDULE\n" + "=" * 50 + "\n\n"
+    for stage in sorted(report["stages"], key=lambda s: s["start_offset"]):
+        marker = "*" if stage["on_critical_path"] else " "
+        text += f"{marker} {stage['name']:<22} start +{stage['start_offset']:6.2f}s  {stage['duration']:6.2f}s\n"
+
+    text += f"\nCritical path: {' -> '.join(report['critical_path'])}\n"
+    text += f"Critical path duration: {report['critical_path_duration']:.2f}s\n"
+    text += f"Wall time: {report['wall_time']:.2f}s (parallelism {report['parallelism']:.2f}x)\n"
+    text += f"Bottleneck: {report['bottleneck']}\n"
+    return text
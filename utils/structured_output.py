@@ -0,0 +1,75 @@
+"""Parsing and validation of JSON-schema-constrained model responses."""
+from typing import Any, Dict
+
+from utils.json_stream import extract_json_object
+
+# Schema types use Gemini's names (OBJECT, ARRAY, ...); matching is case-insensitive.
+_SCALARS = {
+    "STRING": lambda v: isinstance(v, str) and v.strip() != "",
+    "INTEGER": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "NUMBER": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "BOOLEAN": lambda v: isinstance(v, bool),
+}
+
+
+class _Invalid(Exception):
+    """A value does not match its schema."""
+
+
+def _conform(value: Any, schema: Dict) -> Any:
+    """
+    Value restricted to what schema allows.
+
+    Object properties and array items that do not match are dropped rather
+    than invalidating their parent, so one bad field costs only that field.
+    Raises _Invalid when value itself has the wrong type.
+    """
+    kind = schema.get("type", "").upper()
+    if kind == "OBJECT":
+        if not isinstance(value, dict):
+            raise _Invalid
+        result = {}
+        for name, field_schema in schema.get("properties", {}).items():
+            if name in value:
+                try:
+                    result[name] = _conform(value[name], field_schema)
+                except _Invalid:
+                    pass
+        missing = [name for name in schema.get("required", []) if name not in result]
+        if missing:
+            raise _Invalid
+        return result
+    if kind == "ARRAY":
+        if not isinstance(value, list):
+            raise _Invalid
+        items = []
+        for item in value:
+            try:
+                items.append(_conform(item, schema.get("items", {})))
+            except _Invalid:
+                pass
+        return items
+    check = _SCALARS.get(kind)
+    if check is None:
+        return value
+    if not check(value):
+        raise _Invalid
+    if "enum" in schema and value not in schema["enum"]:
+        raise _Invalid
+    return value.strip() if isinstance(value, str) else value
+
+
+def parse_structured(text: str, schema: Dict) -> Dict[str, Any]:
+    """
+    Top-level fields of a JSON object response that match schema.
+
+    Tolerates code fences, prose around the object, trailing commas and
+    truncation (see extract_json_object). Fields that are missing or invalid
+    are left out, so callers fill them with per-field fallbacks; unparseable
+    text yields {}.
+    """
+    value = extract_json_object(text)
+    try:
+        return _conform(value, {**schema, "required": []})
+    except _Invalid:
+        return {}
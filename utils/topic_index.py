@@ -0,0 +1,223 @@
+"""Local embedding index for finding stored exhibitions on near-identical topics."""
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import config
+
+STOPWORDS = {
+    "a", "an", "and", "at", "by", "for", "from", "in", "into", "of", "on", "or",
+    "the", "their", "to", "with"
+}
+
+
+def _normalize_word(word: str) -> str:
+    """Fold simple plural and possessive forms so "Aztecs" and "Aztec's" match "Aztec"."""
+    if word.endswith("'s"):
+        word = word[:-2]
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _features(text: str) -> List[str]:
+    """Word and character trigram features, independent of word order."""
+    words = [_normalize_word(w) for w in re.findall(r"[\w']+", text.lower())]
+    words = [w for w in words if w not in STOPWORDS]
+    features = [f"w:{w}" for w in words]
+    for word in words:
+        padded = f"<{word}>"
+        features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+def topic_checksum(topic: Optional[str]) -> int:
+    """Fingerprint of a stored topic, used to tie index rows to database rows."""
+    return zlib.crc32((topic or "").encode("utf-8"))
+
+
+def topic_similarity(a: str, b: str) -> float:
+    """Cosine similarity of two topics alone, without their overviews."""
+    vectors = embed([a, b])
+    return float(vectors[0] @ vectors[1])
+
+
+def embed(texts: Iterable[str], dim: Optional[int] = None) -> np.ndarray:
+    """
+    Hash texts into L2-normalized vectors (signed feature hashing, no vocabulary).
+
+    Returns:
+        float32 array of shape (len(texts), dim)
+    """
+    dim = dim or config.TOPIC_INDEX_DIM
+    texts = list(texts)
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for feature in _features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            # Whole words carry more signal than any single trigram
+            weight = 2.0 if feature.startswith("w:") else 1.0
+            vectors[row, h % dim] += weight if h & 0x80000000 else -weight
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+class TopicIndex:
+    """
+    Embeddings of stored exhibition topics and overviews.
+
+    The matrix is persisted next to the database and brought up to date on
+    each lookup by embedding only exhibitions added since it was saved, so
+    startup costs one file read. A checksum of each row's topic is saved with
+    the vectors; if the database no longer matches (deleted, recreated or
+    restored) the index is rebuilt rather than pointing ids at other rows.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, index_path: Optional[str] = None,
+                 dim: Optional[int] = None):
+        self.db_path = db_path or config.DATABASE_PATH
+        self.index_path = Path(index_path or config.TOPIC_INDEX_PATH)
+        self.dim = dim or config.TOPIC_INDEX_DIM
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self.checksums = np.zeros(0, dtype=np.uint32)
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Read the persisted index, ignoring it if it was built with another dimension."""
+        try:
+            with np.load(self.index_path) as data:
+                if data["vectors"].shape[1] == self.dim:
+                    self.ids = data["ids"]
+                    self.vectors = data["vectors"]
+                    self.checksums = data["checksums"]
+        except (OSError, KeyError, ValueError):
+            pass
+
+    def save(self):
+        """Write the index atomically."""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_path.parent, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, ids=self.ids, vectors=self.vectors, checksums=self.checksums)
+            os.replace(tmp_path, self.index_path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def sync(self) -> int:
+        """
+        Embed exhibitions stored since the last sync and persist the index.
+
+        Rows already indexed are checked against the database first; any
+        mismatch in ids or topics rebuilds the whole index.
+
+        Returns:
+            Number of exhibitions added
+        """
+        with self._lock:
+            indexed, rows, stale = [], [], False
+            if Path(self.db_path).exists():
+                conn = sqlite3.connect(self.db_path, timeout=30)
+                try:
+                    last_id = int(self.ids.max()) if len(self.ids) else 0
+                    indexed = conn.execute(
+                        "SELECT id, topic FROM exhibitions WHERE id <= ? ORDER BY id", (last_id,)
+                    ).fetchall()
+                    if not self._matches(indexed):
+                        stale, last_id = True, 0
+                        self._reset()
+                    rows = conn.execute("""
+                        SELECT id, topic, json_extract(data, '$.overview')
+                        FROM exhibitions WHERE id > ? ORDER BY id
+                    """, (last_id,)).fetchall()
+                except sqlite3.OperationalError:
+                    pass  # No exhibitions table yet
+                finally:
+                    conn.close()
+            if not indexed and len(self.ids):
+                # Database or its table is gone
+                stale = True
+                self._reset()
+
+            if rows:
+                self._append([row[0] for row in rows], [row[1] or "" for row in rows], [row[2] or "" for row in rows])
+            if rows or stale:
+                self.save()
+            return len(rows)
+
+    def _matches(self, indexed: List[Tuple[int, str]]) -> bool:
+        """Whether the indexed rows are exactly these (id, topic) database rows."""
+        ids = np.fromiter((row[0] for row in indexed), dtype=np.int64, count=len(indexed))
+        checksums = np.fromiter((topic_checksum(row[1]) for row in indexed), dtype=np.uint32, count=len(indexed))
+        return np.array_equal(ids, self.ids) and np.array_equal(checksums, self.checksums)
+
+    def _reset(self):
+        """Drop every indexed row."""
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self.checksums = np.zeros(0, dtype=np.uint32)
+
+    def _append(self, ids: List[int], topics: List[str], overviews: List[str]):
+        """Add documents; the topic dominates, the overview adds context."""
+        vectors = config.TOPIC_INDEX_TOPIC_WEIGHT * embed(topics, self.dim) + embed(overviews, self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)])
+        self.vectors = np.vstack([self.vectors, vectors.astype(np.float32)])
+        self.checksums = np.concatenate([self.checksums, np.array([topic_checksum(t) for t in topics], dtype=np.uint32)])
+
+    def search(self, topic: str, limit: int = 5) -> List[Tuple[int, float]]:
+        """
+        Most similar stored exhibitions to topic.
+
+        Returns:
+            (exhibition_id, cosine similarity) pairs, best first
+        """
+        self.sync()
+        with self._lock:
+            # sync() replaces both arrays; score one consistent pair
+            ids, vectors = self.ids, self.vectors
+        if not len(ids):
+            return []
+        scores = vectors @ embed([topic], self.dim)[0]
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def find_similar(self, topic: str, threshold: Optional[float] = None) -> Optional[Tuple[int, float]]:
+        """Best match at or above threshold, if any."""
+        matches = self.similar(topic, threshold, limit=1)
+        return matches[0] if matches else None
+
+    def similar(self, topic: str, threshold: Optional[float] = None, limit: int = 5) -> List[Tuple[int, float]]:
+        """Matches at or above threshold, best first."""
+        threshold = config.TOPIC_REUSE_THRESHOLD if threshold is None else threshold
+        return [match for match in self.search(topic, limit) if match[1] >= threshold]
+
+
+# Global index instance
+_topic_index_instance = None
+_topic_index_lock = threading.Lock()
+
+def get_topic_index() -> TopicIndex:
+    """Get or create the topic index for config.DATABASE_PATH."""
+    global _topic_index_instance
+    if _topic_index_instance is None or _topic_index_instance.db_path != config.DATABASE_PATH:
+        with _topic_index_lock:
+            if _topic_index_instance is None or _topic_index_instance.db_path != config.DATABASE_PATH:
+                _topic_index_instance = TopicIndex()
+    return _topic_index_instance